@@ -6,6 +6,8 @@ from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
 
+from parsing import parse_currency, parse_number, parse_percentage
+
 # Configuração da página
 st.set_page_config(
     page_title="Dashboard de Campanha - Voo de Balão",
@@ -45,39 +47,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Função para limpar valores monetários
-def clean_currency_value(value):
-    if isinstance(value, str):
-        # Remove R$, espaços não quebráveis (\xa0) e pontos de milhar
-        cleaned = value.replace('R$', '').replace('\xa0', '').replace(' ', '').replace('.', '')
-        # Substitui vírgula decimal por ponto
-        cleaned = cleaned.replace(',', '.')
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return float(value) if pd.notna(value) else 0.0
-
-# Função para limpar porcentagens
-def clean_percentage(value):
-    if isinstance(value, str):
-        cleaned = value.replace('%', '').replace(',', '.')
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return float(value) if pd.notna(value) else 0.0
-
-# Função para limpar números com separadores de milhar
-def clean_number(value):
-    if isinstance(value, str):
-        cleaned = value.replace('.', '').replace(',', '.')
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return float(value) if pd.notna(value) else 0.0
-
 # Carregar dados
 @st.cache_data
 def load_data():
@@ -97,51 +66,51 @@ def load_data():
     
     # Limpar dados monetários e numéricos
     # Campanhas
-    campanhas['Custo_num'] = campanhas['Custo'].apply(clean_currency_value)
-    campanhas['Cliques_num'] = campanhas['Cliques'].apply(clean_number)
-    campanhas['CTR_num'] = campanhas['CTR'].apply(clean_percentage)
+    campanhas['Custo_num'] = parse_currency(campanhas['Custo'])
+    campanhas['Cliques_num'] = parse_number(campanhas['Cliques'])
+    campanhas['CTR_num'] = parse_percentage(campanhas['CTR'])
     
     # Dispositivos
-    dispositivos['Custo_num'] = dispositivos['Custo'].apply(clean_currency_value)
-    dispositivos['Impressões_num'] = dispositivos['Impressões'].apply(clean_number)
-    dispositivos['Cliques_num'] = dispositivos['Cliques'].apply(clean_number)
+    dispositivos['Custo_num'] = parse_currency(dispositivos['Custo'])
+    dispositivos['Impressões_num'] = parse_number(dispositivos['Impressões'])
+    dispositivos['Cliques_num'] = parse_number(dispositivos['Cliques'])
     
     # Palavras-chave
-    palavras_chave['Custo_num'] = palavras_chave['Custo'].apply(clean_currency_value)
-    palavras_chave['Cliques_num'] = palavras_chave['Cliques'].apply(clean_number)
-    palavras_chave['CTR_num'] = palavras_chave['CTR'].apply(clean_percentage)
+    palavras_chave['Custo_num'] = parse_currency(palavras_chave['Custo'])
+    palavras_chave['Cliques_num'] = parse_number(palavras_chave['Cliques'])
+    palavras_chave['CTR_num'] = parse_percentage(palavras_chave['CTR'])
     
     # Pesquisas
-    pesquisas['Custo_num'] = pesquisas['Custo'].apply(clean_currency_value)
-    pesquisas['Cliques_num'] = pesquisas['Cliques'].apply(clean_number)
-    pesquisas['Impressões_num'] = pesquisas['Impressões'].apply(clean_number)
-    pesquisas['Conversões_num'] = pesquisas['Conversões'].apply(clean_number)
+    pesquisas['Custo_num'] = parse_currency(pesquisas['Custo'])
+    pesquisas['Cliques_num'] = parse_number(pesquisas['Cliques'])
+    pesquisas['Impressões_num'] = parse_number(pesquisas['Impressões'])
+    pesquisas['Conversões_num'] = parse_number(pesquisas['Conversões'])
     
     # Série temporal
-    serie_temporal['Custo_num'] = serie_temporal['Custo'].apply(clean_currency_value)
-    serie_temporal['Cliques_num'] = serie_temporal['Cliques'].apply(clean_number)
-    serie_temporal['Impressões_num'] = serie_temporal['Impressões'].apply(clean_number)
-    serie_temporal['CPC_num'] = serie_temporal['CPC méd.'].apply(clean_currency_value)
+    serie_temporal['Custo_num'] = parse_currency(serie_temporal['Custo'])
+    serie_temporal['Cliques_num'] = parse_number(serie_temporal['Cliques'])
+    serie_temporal['Impressões_num'] = parse_number(serie_temporal['Impressões'])
+    serie_temporal['CPC_num'] = parse_currency(serie_temporal['CPC méd.'])
     
     # Redes
-    redes['Custo_num'] = redes['Custo'].apply(clean_currency_value)
-    redes['Cliques_num'] = redes['Cliques'].apply(clean_number)
-    redes['CPC_num'] = redes['CPC méd.'].apply(clean_currency_value)
+    redes['Custo_num'] = parse_currency(redes['Custo'])
+    redes['Cliques_num'] = parse_number(redes['Cliques'])
+    redes['CPC_num'] = parse_currency(redes['CPC méd.'])
     
     # Dia e hora
-    dia_hora['Impressões_num'] = dia_hora['Impressões'].apply(clean_number)
-    hora['Impressões_num'] = hora['Impressões'].apply(clean_number)
-    dia_hora_detalhado['Impressões_num'] = dia_hora_detalhado['Impressões'].apply(clean_number)
+    dia_hora['Impressões_num'] = parse_number(dia_hora['Impressões'])
+    hora['Impressões_num'] = parse_number(hora['Impressões'])
+    dia_hora_detalhado['Impressões_num'] = parse_number(dia_hora_detalhado['Impressões'])
     
     # Limpar dados demográficos
-    idade['Impressões_num'] = idade['Impressões'].apply(clean_number)
-    idade['Porcentagem_num'] = idade['Porcentagem do total conhecido'].apply(clean_percentage)
+    idade['Impressões_num'] = parse_number(idade['Impressões'])
+    idade['Porcentagem_num'] = parse_percentage(idade['Porcentagem do total conhecido'])
     
-    sexo['Impressões_num'] = sexo['Impressões'].apply(clean_number)
-    sexo['Porcentagem_num'] = sexo['Porcentagem do total conhecido'].apply(clean_percentage)
+    sexo['Impressões_num'] = parse_number(sexo['Impressões'])
+    sexo['Porcentagem_num'] = parse_percentage(sexo['Porcentagem do total conhecido'])
     
-    sexo_idade['Impressões_num'] = sexo_idade['Impressões'].apply(clean_number)
-    sexo_idade['Porcentagem_num'] = sexo_idade['Porcentagem do total conhecido'].apply(clean_percentage)
+    sexo_idade['Impressões_num'] = parse_number(sexo_idade['Impressões'])
+    sexo_idade['Porcentagem_num'] = parse_percentage(sexo_idade['Porcentagem do total conhecido'])
     
     return {
         'campanhas': campanhas,
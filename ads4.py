@@ -1,11 +1,30 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
+import os
+import time
 from datetime import datetime
 
+import allocation
+import clients
+import discovery
+import figures
+import filters
+import heatmap
+import instrumentation
+import keyword_match
+import kpis
+import metrics
+import montecarlo
+import negatives
+import query_index
+import scenarios
+import schema
+import streaming
+import text_search
+import timeseries
+
 # Configuração da página
 st.set_page_config(
     page_title="Dashboard de Campanha - Voo de Balão",
@@ -52,150 +71,184 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Função para limpar valores monetários
-def clean_currency_value(value):
-    if isinstance(value, str):
-        # Remove R$, espaços não quebráveis (\xa0) e pontos de milhar
-        cleaned = value.replace('R$', '').replace('\xa0', '').replace(' ', '').replace('.', '')
-        # Substitui vírgula decimal por ponto
-        cleaned = cleaned.replace(',', '.')
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return float(value) if pd.notna(value) else 0.0
-
-# Função para limpar porcentagens
-def clean_percentage(value):
-    if isinstance(value, str):
-        cleaned = value.replace('%', '').replace(',', '.')
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return float(value) if pd.notna(value) else 0.0
-
-# Função para limpar números com separadores de milhar
-def clean_number(value):
-    if isinstance(value, str):
-        cleaned = value.replace('.', '').replace(',', '.')
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
-    return float(value) if pd.notna(value) else 0.0
-
-# Carregar dados
-@st.cache_data
-def load_data():
-    # Dados principais
-    campanhas = pd.read_csv('Campanhas(2025.04.10-2025.10.17).csv')
-    dispositivos = pd.read_csv('Dispositivos(2025.04.10-2025.10.17).csv')
-    idade = pd.read_csv('Informações_demográficas(Idade_2025.04.10-2025.10.17).csv')
-    sexo = pd.read_csv('Informações_demográficas(Sexo_2025.04.10-2025.10.17).csv')
-    sexo_idade = pd.read_csv('Informações_demográficas(Sexo_Idade_2025.04.10-2025.10.17).csv')
-    palavras_chave = pd.read_csv('Palavras-chave_de_pesquisa(2025.04.10-2025.10.17).csv')
-    pesquisas = pd.read_csv('Pesquisas(Pesquisar_2025.04.10-2025.10.17).csv')
-    serie_temporal = pd.read_csv('Série_temporal(2025.04.07-2025.10.17).csv')
-    redes = pd.read_csv('Redes(2025.04.10-2025.10.17).csv')
-    dia_hora = pd.read_csv('Dia_e_hora(Dia_2025.04.10-2025.10.17).csv')
-    hora = pd.read_csv('Dia_e_hora(Hora_2025.04.10-2025.10.17).csv')
-    dia_hora_detalhado = pd.read_csv('Dia_e_hora(Dia_Hora_2025.04.10-2025.10.17).csv')
-    
-    # Limpar dados monetários e numéricos
-    # Campanhas
-    campanhas['Custo_num'] = campanhas['Custo'].apply(clean_currency_value)
-    campanhas['Cliques_num'] = campanhas['Cliques'].apply(clean_number)
-    campanhas['CTR_num'] = campanhas['CTR'].apply(clean_percentage)
-    
-    # Dispositivos
-    dispositivos['Custo_num'] = dispositivos['Custo'].apply(clean_currency_value)
-    dispositivos['Impressões_num'] = dispositivos['Impressões'].apply(clean_number)
-    dispositivos['Cliques_num'] = dispositivos['Cliques'].apply(clean_number)
-    
-    # Palavras-chave
-    palavras_chave['Custo_num'] = palavras_chave['Custo'].apply(clean_currency_value)
-    palavras_chave['Cliques_num'] = palavras_chave['Cliques'].apply(clean_number)
-    palavras_chave['CTR_num'] = palavras_chave['CTR'].apply(clean_percentage)
-    
-    # Pesquisas
-    pesquisas['Custo_num'] = pesquisas['Custo'].apply(clean_currency_value)
-    pesquisas['Cliques_num'] = pesquisas['Cliques'].apply(clean_number)
-    pesquisas['Impressões_num'] = pesquisas['Impressões'].apply(clean_number)
-    pesquisas['Conversões_num'] = pesquisas['Conversões'].apply(clean_number)
-    
-    # Série temporal
-    serie_temporal['Custo_num'] = serie_temporal['Custo'].apply(clean_currency_value)
-    serie_temporal['Cliques_num'] = serie_temporal['Cliques'].apply(clean_number)
-    serie_temporal['Impressões_num'] = serie_temporal['Impressões'].apply(clean_number)
-    serie_temporal['CPC_num'] = serie_temporal['CPC méd.'].apply(clean_currency_value)
-    
-    # Redes
-    redes['Custo_num'] = redes['Custo'].apply(clean_currency_value)
-    redes['Cliques_num'] = redes['Cliques'].apply(clean_number)
-    redes['CPC_num'] = redes['CPC méd.'].apply(clean_currency_value)
-    
-    # Dia e hora
-    dia_hora['Impressões_num'] = dia_hora['Impressões'].apply(clean_number)
-    hora['Impressões_num'] = hora['Impressões'].apply(clean_number)
-    dia_hora_detalhado['Impressões_num'] = dia_hora_detalhado['Impressões'].apply(clean_number)
-    
-    # Limpar dados demográficos
-    idade['Impressões_num'] = idade['Impressões'].apply(clean_number)
-    idade['Porcentagem_num'] = idade['Porcentagem do total conhecido'].apply(clean_percentage)
-    
-    sexo['Impressões_num'] = sexo['Impressões'].apply(clean_number)
-    sexo['Porcentagem_num'] = sexo['Porcentagem do total conhecido'].apply(clean_percentage)
-    
-    sexo_idade['Impressões_num'] = sexo_idade['Impressões'].apply(clean_number)
-    sexo_idade['Porcentagem_num'] = sexo_idade['Porcentagem do total conhecido'].apply(clean_percentage)
-    
-    return {
-        'campanhas': campanhas,
-        'dispositivos': dispositivos,
-        'idade': idade,
-        'sexo': sexo,
-        'sexo_idade': sexo_idade,
-        'palavras_chave': palavras_chave,
-        'pesquisas': pesquisas,
-        'serie_temporal': serie_temporal,
-        'redes': redes,
-        'dia_hora': dia_hora,
-        'hora': hora,
-        'dia_hora_detalhado': dia_hora_detalhado
-    }
+# Instrumentação: tempos e caches desta execução vão para o painel de
+# depuração e para o arquivo de métricas (ADS_ARQUIVO_METRICAS). O perfil
+# (cProfile) só é ligado na execução pedida pelo botão do painel.
+execucao = instrumentation.start_run()
+perfil = instrumentation.start_profile() if st.session_state.pop('perfilar', False) else None
+
+# Carregar dados: as exportações são descobertas pelo nome do arquivo e cada
+# relatório é consolidado (e cacheado) separadamente, só quando alguma aba
+# acessa a chave correspondente em `data`. Os hashes dos CSVs entram na chave
+# do cache para que uma nova exportação invalide a memória, e o cache em disco
+# evita refazer a limpeza em novos processos.
+# O cache é compartilhado entre as sessões e limitado a MAX_CLIENTES_EM_CACHE
+# clientes: os relatórios usados há mais tempo são descartados primeiro.
+@instrumentation.cached(st.cache_data(max_entries=clients.MAX_CLIENTES_EM_CACHE * len(schema.REPORTS)), 'relatorios')
+def load_report(nome, exportacoes, versao):
+    with instrumentation.timer(nome, 'carga'):
+        return discovery.load_consolidated(nome, exportacoes)
+
+def load_data(base_dir='.'):
+    with instrumentation.timer(base_dir, 'load_data'):
+        return discovery.load_dataset(base_dir, load_report)
+
+# Índices dos filtros: montados uma vez por versão de cada relatório e
+# compartilhados (somente leitura) entre as sessões
+@instrumentation.cached(st.cache_resource(max_entries=clients.MAX_CLIENTES_EM_CACHE * len(schema.REPORTS)), 'indices_filtros')
+def load_index(nome, versao, _df):
+    return filters.build_index(nome, _df)
+
+# Índice invertido dos termos de pesquisa: montado uma vez por versão e
+# compartilhado (somente leitura) entre as sessões
+@instrumentation.cached(st.cache_resource(max_entries=clients.MAX_CLIENTES_EM_CACHE), 'indice_pesquisas')
+def load_query_index(versao, _df):
+    return query_index.build_index(_df)
+
+# Índice de trigramas para a caixa de busca da aba Palavras-chave
+@instrumentation.cached(st.cache_resource(max_entries=clients.MAX_CLIENTES_EM_CACHE * 2), 'busca')
+def load_text_search(versao, _df, coluna):
+    return text_search.build_trigram_index(_df, coluna)
+
+# Correspondência palavras-chave x pesquisas: recalculada só quando um dos dois muda
+@instrumentation.cached(st.cache_resource(max_entries=clients.MAX_CLIENTES_EM_CACHE), 'correspondencia')
+def load_keyword_match(versao_palavras, versao_pesquisas, _palavras_chave, _pesquisas, _indice):
+    return keyword_match.match_keywords(_palavras_chave, _pesquisas, _indice)
+
+# Candidatas a negativas: recalculadas só quando pesquisas ou palavras-chave mudam.
+# Os filtros restringem as pesquisas mineradas, mas todas as palavras-chave da
+# conta continuam protegidas (nunca são sugeridas como negativas).
+@instrumentation.cached(st.cache_resource(max_entries=clients.MAX_CLIENTES_EM_CACHE), 'negativas')
+def load_negatives(versao_pesquisas, versao_palavras, _pesquisas, _palavras_chave, _indice):
+    return negatives.mine_negatives(_pesquisas, _indice, _palavras_chave)
+
+# Agregados semanais da atualização incremental: o estado só é consultado
+# quando a versão da Série temporal muda
+@instrumentation.cached(st.cache_data(max_entries=clients.MAX_CLIENTES_EM_CACHE), 'agregados_semanais')
+def load_week_aggregates(base_dir, versao):
+    return discovery.week_aggregates(base_dir)
+
+# KPIs de cabeçalho: calculados uma vez por versão dos dados e lidos por todas as abas
+@instrumentation.cached(st.cache_data(max_entries=clients.MAX_CLIENTES_EM_CACHE), 'kpis')
+def load_kpis(versao, _data, _semanas=None):
+    return kpis.compute_kpis(_data, _semanas)
 
-data = load_data()
+# Monte Carlo da aba Recomendações: só os percentis e histogramas ficam no
+# cache, um resultado por versão dos dados (com filtros) e conjunto de parâmetros
+@instrumentation.cached(st.cache_data(max_entries=clients.MAX_CLIENTES_EM_CACHE * 8), 'monte_carlo')
+def load_monte_carlo(versao, parametros, _data):
+    conversoes = ()
+    if 'pesquisas' in _data:
+        conversoes = (_data['pesquisas']['Conversões_num'].sum(), _data['pesquisas']['Cliques_num'].sum())
+    ajuste = montecarlo.fit_history(_data['serie_temporal'], *conversoes)
+    return montecarlo.simulate(ajuste, **dict(parametros))
+
+# Gráficos: cada figura é construída uma vez por (versão dos dados, parâmetros)
+# e o mesmo objeto é compartilhado entre todas as sessões que veem o cliente.
+# st.plotly_chart só lê a figura (to_dict), então o compartilhamento é seguro.
+@instrumentation.cached(st.cache_resource(max_entries=clients.MAX_CLIENTES_EM_CACHE * len(figures.FIGURES)), 'graficos')
+def cached_figure(nome, versao, params, _data, _kpi):
+    with instrumentation.timer(nome, 'construcao_grafico'):
+        return figures.build(nome, _data, _kpi, **dict(params))
+
+# O tempo do gráfico inclui o st.plotly_chart (serialização da figura)
+def show_figure(nome, **params):
+    with instrumentation.timer(nome, 'grafico'):
+        fig = cached_figure(nome, data.versao, tuple(sorted(params.items())), data, kpi)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
 
 # Sidebar
 st.sidebar.title("📊 Filtros")
+
+# Seleção do cliente: só a partição do cliente escolhido é carregada
+clientes = clients.list_clients()
+if clientes:
+    cliente = st.sidebar.selectbox("Cliente", clientes)
+    nome_campanha = cliente
+    base_dir = clients.client_dir(cliente)
+else:
+    nome_campanha = clients.CLIENTE_PADRAO
+    base_dir = '.'
+execucao['cliente'] = nome_campanha
+data = load_data(base_dir)
+# Termos de pesquisa cortados pelo limite ADS_MAX_TERMOS, avisados nas abas que os usam
+limitados = discovery.capped_reports(base_dir)
+# Exportações somadas descartadas por sobrepor um período mais recente
+ignoradas = discovery.ignored_exports(base_dir)
+
+# Filtros: valem para todas as abas, nos relatórios que têm a dimensão filtrada
+versoes = dict(data.versao)
+dados_completos = data
+
+def indice(nome):
+    return load_index(nome, versoes[nome], dados_completos[nome])
+
+selecao = {}
+for filtro, (relatorio, _, rotulo) in filters.FILTROS.items():
+    if relatorio in data:
+        selecao[filtro] = st.sidebar.multiselect(rotulo, filters.options(indice(relatorio), filtro),
+                                                 placeholder="Todos")
+
+relatorio_datas = filters.FILTRO_DATAS[0]
+limites = filters.date_bounds(indice(relatorio_datas)) if relatorio_datas in data else None
+if limites:
+    periodo = st.sidebar.date_input("Período (semanas)", value=limites,
+                                    min_value=limites[0], max_value=limites[1], format="DD/MM/YYYY")
+    # Enquanto o usuário escolhe o intervalo, o widget devolve só uma data
+    if len(periodo) == 2 and tuple(periodo) != limites:
+        selecao['periodo'] = tuple(periodo)
+
+with instrumentation.timer('filter_reports', 'filtros'):
+    data = filters.filter_reports(data, selecao, indice)
+versoes_filtradas = {nome: filters.report_version(nome, versao, selecao) for nome, versao in versoes.items()}
+
 st.sidebar.markdown("---")
 
 # Métricas principais na sidebar
-total_impressoes = data['dia_hora']['Impressões_num'].sum()
-total_cliques = data['campanhas']['Cliques_num'].sum()
-total_custo = data['campanhas']['Custo_num'].sum()
-ctr_medio = (total_cliques / total_impressoes * 100) if total_impressoes > 0 else 0
-cpc_medio = total_custo / total_cliques if total_cliques > 0 else 0
+# Sem filtro, as métricas semanais vêm dos agregados mantidos incrementalmente
+semanas = load_week_aggregates(base_dir, versoes.get('serie_temporal')) if data is dados_completos else None
+kpi = load_kpis(data.versao, data, semanas)
+total_impressoes = kpi['total_impressoes']
+total_cliques = kpi['total_cliques']
+total_custo = kpi['total_custo']
+ctr_medio = kpi['ctr_medio']
+cpc_medio = kpi['cpc_medio']
+smartphones = kpis.device(kpi, 'Smartphones')
 
 st.sidebar.metric("Total de Impressões", f"{total_impressoes:,.0f}")
 st.sidebar.metric("Total de Cliques", f"{total_cliques:,.0f}")
 st.sidebar.metric("CTR Médio", f"{ctr_medio:.2f}%")
 st.sidebar.metric("Custo Total", f"R$ {total_custo:,.2f}")
 
-# Layout principal - ADICIONANDO A NOVA ABA DE COMPARATIVO
-tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-    "📈 Visão Geral", 
-    "🎯 Público-Alvo", 
-    "🔍 Palavras-chave", 
-    "📱 Dispositivos & Redes",
-    "🔄 Conversões",
-    "📊 Comparativo",
-    "💡 Recomendações"
-])
+# Conversões ainda não são rastreadas na conta
+taxa_conversao = 0
+custo_por_conversao = total_custo if taxa_conversao == 0 else 0
 
-with tab1:
-    st.subheader("📊 Performance Geral da Campanha (Abril - Outubro 2025)")
+# Desempenho da renderização: por padrão só a aba aberta é executada
+with st.sidebar.expander("⏱️ Desempenho"):
+    renderizacao_preguicosa = st.toggle("Renderizar só a aba aberta", value=True)
+    st.toggle("Mostrar tempo por aba", value=False, key='mostrar_tempos')
+    painel_tempos = st.empty()
+    st.toggle("Painel de depuração", value=False, key='painel_depuracao',
+              help="Tempos da carga, das abas e dos gráficos e acertos dos caches nesta execução")
+    painel_depuracao = st.empty()
+    # Memória de cada relatório como fica no cache (forma compacta); carrega todos
+    if st.toggle("Mostrar memória por relatório", value=False):
+        memoria = schema.memory_report({
+            nome: load_report(nome, exps, versoes[nome])
+            for nome, exps in discovery.discover(base_dir).items()
+        })
+        st.dataframe(memoria, hide_index=True)
+        st.caption(f"Total em cache: {memoria['Memória (KB)'].sum():,.1f} KB")
+
+# Cada aba é uma função renderizada como fragmento: widgets dentro dela
+# reexecutam só a própria aba, não o dashboard inteiro.
+def render_visao_geral():
+    if kpi['inicio_serie'] is not None:
+        st.subheader(f"📊 Performance Geral da Campanha ({timeseries.format_period(kpi['inicio_serie'], kpi['fim_serie'])})")
+    else:
+        st.subheader("📊 Performance Geral da Campanha")
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -220,47 +273,31 @@ with tab1:
         st.markdown('</div>', unsafe_allow_html=True)
     
     # Gráficos de série temporal
+    agrupamento = st.radio("Agrupar por", list(timeseries.AGRUPAMENTOS), horizontal=True, key='agrupamento_serie')
     col1, col2 = st.columns(2)
     
     with col1:
         # Performance semanal
-        semanas_ativas = data['serie_temporal'][data['serie_temporal']['Cliques_num'] > 0]
-        if not semanas_ativas.empty:
-            fig = px.line(semanas_ativas, x='Semana', y='Cliques_num',
-                         title='Evolução de Cliques por Semana',
-                         markers=True)
-            fig.update_layout(xaxis_title='Semana', yaxis_title='Cliques', xaxis_tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
+        show_figure('cliques_semana', agrupamento=agrupamento)
     
     with col2:
         # Custo semanal
-        if not semanas_ativas.empty:
-            fig = px.bar(semanas_ativas, x='Semana', y='Custo_num',
-                        title='Custo por Semana (R$)',
-                        color='Custo_num',
-                        color_continuous_scale='reds')
-            fig.update_layout(xaxis_title='Semana', yaxis_title='Custo (R$)', xaxis_tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
+        show_figure('custo_semana', agrupamento=agrupamento)
     
     # Gráficos de distribuição temporal
     col1, col2 = st.columns(2)
     
     with col1:
         # Impressões por hora
-        fig = px.bar(data['hora'], x='Hora de início', y='Impressões_num', 
-                    title='Distribuição de Impressões por Hora do Dia',
-                    color='Impressões_num',
-                    color_continuous_scale='blues')
-        fig.update_layout(xaxis_title='Hora', yaxis_title='Impressões')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('impressoes_hora')
     
     with col2:
         # Impressões por dia da semana
-        fig = px.bar(data['dia_hora'], x='Dia', y='Impressões_num',
-                    title='Impressões por Dia da Semana',
-                    color='Impressões_num',
-                    color_continuous_scale='greens')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('impressoes_dia')
+    
+    # Mapa de calor dia x hora
+    if kpi['matriz_dia_hora'] is not None:
+        render_mapa_calor()
     
     # Análise de sazonalidade
     st.subheader("📈 Análise de Sazonalidade")
@@ -268,40 +305,62 @@ with tab1:
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Período Ativo", f"{len(semanas_ativas)} semanas")
-        st.metric("Primeira Semana Ativa", "14 de Julho 2025")
-        st.metric("Média Cliques/Semana", f"{semanas_ativas['Cliques_num'].mean():.0f}")
+        st.metric("Período Ativo", f"{kpi['semanas_ativas']} semanas")
+        primeira = kpi['primeira_semana_ativa']
+        st.metric("Primeira Semana Ativa", timeseries.format_date(primeira) if primeira is not None else "-")
+        st.metric("Média Cliques/Semana", f"{kpi['media_cliques_semana']:.0f}")
     
     with col2:
-        st.metric("Total de Semanas", f"{len(data['serie_temporal'])}")
-        st.metric("Semanas sem Dados", f"{len(data['serie_temporal']) - len(semanas_ativas)}")
-        st.metric("Pico de Cliques", f"{semanas_ativas['Cliques_num'].max():.0f}")
+        st.metric("Total de Semanas", f"{kpi['total_semanas']}")
+        st.metric("Semanas sem Dados", f"{kpi['semanas_sem_dados']}")
+        st.metric("Pico de Cliques", f"{kpi['pico_cliques']:.0f}")
+
+def render_mapa_calor():
+    st.subheader("🗓️ Impressões por Dia e Hora")
+    col1, col2 = st.columns(2)
+    with col1:
+        rotulo = st.radio("Normalização", list(heatmap.NORMALIZACOES), horizontal=True, key='normalizacao_mapa')
+    normalizacao = heatmap.NORMALIZACOES[rotulo]
+    with col2:
+        # Soma das matrizes de outros clientes, já pivotadas nos KPIs de cada um
+        outros = st.multiselect("Somar clientes", [c for c in clientes if c != nome_campanha],
+                                placeholder="Só o cliente atual") if clientes else []
+
+    dia = st.selectbox("Detalhar dia", heatmap.DIAS, index=None, placeholder="Escolha um dia", key='dia_mapa')
+
+    if not outros:
+        show_figure('heatmap_dia_hora', normalizacao=normalizacao)
+        if dia:
+            show_figure('horas_do_dia', dia=dia, normalizacao=normalizacao)
+        return
 
-with tab2:
+    matrizes = [kpi['matriz_dia_hora']]
+    for outro in outros:
+        dados_outro = load_data(clients.client_dir(outro))
+        matriz = load_kpis(dados_outro.versao, dados_outro)['matriz_dia_hora']
+        if matriz is not None:
+            matrizes.append(matriz)
+    total = heatmap.combine(matrizes)
+    titulo = f"Impressões por Dia da Semana e Hora ({len(matrizes)} clientes)"
+    st.plotly_chart(figures.heatmap_figure(total, normalizacao, titulo), use_container_width=True)
+    if dia:
+        st.plotly_chart(figures.day_profile_figure(total, dia, normalizacao), use_container_width=True)
+
+def render_publico():
     st.subheader("🎯 Análise Demográfica Detalhada")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Distribuição por Idade
-        fig = px.pie(data['idade'], values='Impressões_num', names='Faixa de idade',
-                    title='Distribuição por Faixa Etária',
-                    hole=0.4)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('distribuicao_idade')
         
         # Distribuição por Sexo
-        fig = px.pie(data['sexo'], values='Impressões_num', names='Sexo',
-                    title='Distribuição por Sexo',
-                    hole=0.4)
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('distribuicao_sexo')
     
     with col2:
         # Sexo e Idade combinados
-        fig = px.bar(data['sexo_idade'], x='Faixa de idade', y='Impressões_num', color='Sexo',
-                    title='Impressões por Sexo e Faixa Etária',
-                    barmode='group')
-        fig.update_layout(xaxis_title='Faixa Etária', yaxis_title='Impressões')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('impressoes_sexo_idade')
         
         # Métricas demográficas
         st.subheader("📋 Insights Demográficos")
@@ -340,123 +399,152 @@ with tab2:
         ]['Impressões_num'].iloc[0]
         st.metric("Mulheres 18-24", f"{mulheres_18_24:,}", "19.11%")
 
-with tab3:
+def aviso_termos_limitados():
+    if limitados:
+        st.warning(f"Exportações grandes de termos de pesquisa ({', '.join(limitados)}) foram limitadas aos "
+                   f"{streaming.MAX_TERMOS:,} termos de maior custo (ADS_MAX_TERMOS): top termos, cobertura "
+                   "e negativas não incluem a cauda, e os totais desses relatórios ficam subestimados.")
+
+def render_palavras_chave():
     st.subheader("🔍 Análise de Palavras-chave e Pesquisas")
-    
-    # Palavras-chave com desempenho
-    palavras_ativas = data['palavras_chave'][data['palavras_chave']['Cliques_num'] > 0]
-    palavras_sem_cliques = data['palavras_chave'][data['palavras_chave']['Cliques_num'] == 0]
+    aviso_termos_limitados()
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total de Palavras-chave", len(data['palavras_chave']))
+        st.metric("Total de Palavras-chave", kpi['total_palavras'])
     
     with col2:
-        st.metric("Com Cliques", len(palavras_ativas))
+        st.metric("Com Cliques", kpi['palavras_com_cliques'])
     
     with col3:
-        st.metric("Sem Cliques", len(palavras_sem_cliques))
+        st.metric("Sem Cliques", kpi['palavras_sem_cliques'])
     
     with col4:
-        taxa_sem_cliques = (len(palavras_sem_cliques) / len(data['palavras_chave'])) * 100
-        st.metric("Taxa Ineficientes", f"{taxa_sem_cliques:.1f}%")
+        st.metric("Taxa Ineficientes", f"{kpi['taxa_sem_cliques']:.1f}%")
+    
+    # Busca por trecho, início de palavra ou com erro de digitação
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        busca = st.text_input("🔎 Buscar", placeholder="ex.: balonismo, passeio pantanal", key='busca_palavras')
+    
+    with col2:
+        fonte = st.radio("Em", ["Palavras-chave", "Pesquisas"], horizontal=True, key='fonte_busca')
+    
+    if busca:
+        nome = {"Palavras-chave": 'palavras_chave', "Pesquisas": 'pesquisas'}[fonte]
+        coluna = schema.REPORTS[nome]['chave'][0]
+        indice_busca = load_text_search(versoes_filtradas[nome], data[nome], coluna)
+        encontradas = metrics.add_derived_metrics(text_search.search(indice_busca, data[nome], busca))
+        colunas = list(schema.REPORTS[nome]['chave']) + ['Custo_num', 'Cliques_num', 'CTR_num', 'Correspondência']
+        st.caption(f"{len(encontradas)} resultados")
+        st.dataframe(encontradas[colunas], hide_index=True, use_container_width=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Top palavras-chave por CTR
-        if not palavras_ativas.empty:
-            top_ctr = palavras_ativas.nlargest(10, 'CTR_num')
-            fig = px.bar(top_ctr, 
-                        x='Palavra-chave da rede de pesquisa', y='CTR_num',
-                        title='Top 10 Palavras-chave por CTR (%)',
-                        color='CTR_num',
-                        color_continuous_scale='viridis')
-            fig.update_layout(yaxis_title='CTR (%)', xaxis_tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
+        show_figure('top_palavras_ctr', n=10)
     
     with col2:
         # Top palavras-chave por cliques
-        if not palavras_ativas.empty:
-            top_cliques = palavras_ativas.nlargest(10, 'Cliques_num')
-            fig = px.bar(top_cliques, 
-                        x='Palavra-chave da rede de pesquisa', y='Cliques_num',
-                        title='Top 10 Palavras-chave por Cliques',
-                        color='Cliques_num',
-                        color_continuous_scale='blues')
-            fig.update_layout(yaxis_title='Cliques', xaxis_tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
+        show_figure('top_palavras_cliques', n=10)
     
     # Análise de eficiência
     st.subheader("💰 Análise de Eficiência por Palavra-chave")
     
-    if not palavras_ativas.empty:
-        palavras_ativas['Custo_por_Clique'] = palavras_ativas['Custo_num'] / palavras_ativas['Cliques_num']
-        
-        fig = px.scatter(palavras_ativas, x='Custo_por_Clique', y='CTR_num',
-                        size='Cliques_num', color='Custo_num',
-                        hover_name='Palavra-chave da rede de pesquisa',
-                        title='Relação Custo/Clique vs CTR',
-                        labels={'Custo_por_Clique': 'Custo por Clique (R$)', 'CTR_num': 'CTR (%)'})
-        st.plotly_chart(fig, use_container_width=True)
+    show_figure('eficiencia_palavras')
     
     # Top pesquisas reais
     st.subheader("🔎 Top Pesquisas dos Usuários")
     
-    if 'Cliques_num' in data['pesquisas'].columns:
-        top_pesquisas = data['pesquisas'].nlargest(10, 'Cliques_num')
-        fig = px.bar(top_pesquisas, x='Pesquisar', y='Cliques_num',
-                    title='Top 10 Pesquisas por Cliques',
-                    color='Cliques_num',
-                    color_continuous_scale='purples')
-        fig.update_layout(xaxis_tickangle=45)
-        st.plotly_chart(fig, use_container_width=True)
+    show_figure('top_pesquisas', n=10)
+    
+    # Palavras das pesquisas: relatório do Google e índice sobre todas as consultas
+    st.subheader("🧩 Palavras que Puxam o Custo")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        show_figure('custo_palavras_pesquisa', n=15)
+    
+    with col2:
+        indice_pesquisas = load_query_index(versoes_filtradas['pesquisas'], data['pesquisas'])
+        ngrama = st.radio("Termos", list(query_index.NGRAMAS), format_func=query_index.NGRAMAS.get,
+                          horizontal=True, key='ngrama_pesquisas')
+        st.dataframe(query_index.top_terms(indice_pesquisas, n=15, ngrama=ngrama),
+                     hide_index=True, use_container_width=True)
+    
+    termo = st.text_input("Pesquisas contendo", placeholder="ex.: balonismo", key='termo_pesquisas')
+    if termo:
+        # Razões só das pesquisas encontradas; a participação é sobre o custo de todas
+        encontradas = metrics.add_derived_metrics(
+            query_index.queries_containing(indice_pesquisas, data['pesquisas'], termo),
+            totais={'Custo_num': data['pesquisas']['Custo_num'].sum()},
+        )
+        st.caption(f"{len(encontradas)} pesquisas · R$ {encontradas['Custo_num'].sum():,.2f} · "
+                   f"{encontradas['Cliques_num'].sum():,.0f} cliques")
+        st.dataframe(encontradas[['Pesquisar', 'Custo_num', 'Cliques_num', 'Impressões_num', 'Conversões_num',
+                                  'CTR_num', 'CPC_num', 'Participacao_custo_num']],
+                     hide_index=True, use_container_width=True)
+    
+    # Quais palavras-chave poderiam ter acionado cada pesquisa
+    st.subheader("🔗 Pesquisas x Palavras-chave")
+    
+    correspondencia = load_keyword_match(versoes_filtradas['palavras_chave'], versoes_filtradas['pesquisas'],
+                                         data['palavras_chave'], data['pesquisas'], indice_pesquisas)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Pesquisas Cobertas", f"{correspondencia['cobertura_pesquisas']:.1f}%")
+    
+    with col2:
+        st.metric("Custo Coberto", f"{correspondencia['cobertura_custo']:.1f}%")
+    
+    with col3:
+        st.metric("Pesquisas com Mais de uma Palavra-chave", f"{correspondencia['pesquisas_sobrepostas']:,}")
+    
+    st.caption("Correspondência pelo texto: variações próximas (plural, sinônimos) e a correspondência ampla "
+               "do Google podem acionar pesquisas que não aparecem aqui.")
+    
+    st.dataframe(correspondencia['palavras_chave'], hide_index=True, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Palavras-chave que disputam as mesmas pesquisas**")
+        st.dataframe(correspondencia['sobreposicao'].head(50), hide_index=True, use_container_width=True)
+    
+    with col2:
+        st.write("**Pesquisas sem palavra-chave correspondente**")
+        st.dataframe(correspondencia['sem_palavra_chave'][['Pesquisar', 'Custo_num', 'Cliques_num']].head(50),
+                     hide_index=True, use_container_width=True)
 
-with tab4:
+def render_dispositivos():
     st.subheader("📱 Análise por Dispositivos e Redes")
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Dispositivos - Impressões
-        fig = px.pie(data['dispositivos'], values='Impressões_num', names='Dispositivo',
-                    title='Distribuição por Dispositivo - Impressões')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('impressoes_dispositivo')
         
         # Dispositivos - Custo
-        fig = px.bar(data['dispositivos'], x='Dispositivo', y='Custo_num',
-                    title='Custo por Dispositivo (R$)',
-                    color='Custo_num',
-                    color_continuous_scale='greens')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('custo_dispositivo')
     
     with col2:
         # Redes - Cliques
-        fig = px.bar(data['redes'], x='Rede', y='Cliques_num',
-                    title='Cliques por Rede',
-                    color='Cliques_num',
-                    color_continuous_scale='purples')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('cliques_rede')
         
         # CPC por rede
-        fig = px.bar(data['redes'], x='Rede', y='CPC_num',
-                    title='CPC Médio por Rede (R$)',
-                    color='CPC_num',
-                    color_continuous_scale='oranges')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('cpc_rede')
     
     # Análise de eficiência por dispositivo
     st.subheader("📊 Eficiência por Dispositivo")
     
-    data['dispositivos']['CTR'] = (data['dispositivos']['Cliques_num'] / data['dispositivos']['Impressões_num'] * 100).fillna(0)
-    data['dispositivos']['Custo_por_Clique'] = data['dispositivos']['Custo_num'] / data['dispositivos']['Cliques_num'].replace(0, 1)
-    
-    fig = px.scatter(data['dispositivos'], x='Custo_por_Clique', y='CTR',
-                    size='Impressões_num', color='Dispositivo',
-                    title='Eficiência: Custo por Clique vs CTR por Dispositivo',
-                    labels={'Custo_por_Clique': 'Custo por Clique (R$)', 'CTR': 'CTR (%)'})
-    st.plotly_chart(fig, use_container_width=True)
+    show_figure('eficiencia_dispositivo')
     
     # Insights de dispositivos
     st.subheader("💡 Insights de Dispositivos")
@@ -464,19 +552,54 @@ with tab4:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        smartphone_impressoes = data['dispositivos'][data['dispositivos']['Dispositivo'] == 'Smartphones']['Impressões_num'].iloc[0]
-        smartphone_percentual = (smartphone_impressoes / total_impressoes) * 100
-        st.metric("Smartphones", f"{smartphone_percentual:.1f}%", "96.8% das impressões")
+        st.metric("Smartphones", f"{smartphones['participacao_impressoes_total']:.1f}%", "96.8% das impressões")
     
     with col2:
-        smartphone_custo = data['dispositivos'][data['dispositivos']['Dispositivo'] == 'Smartphones']['Custo_num'].iloc[0]
-        st.metric("Custo Smartphones", f"R$ {smartphone_custo:,.2f}", f"{(smartphone_custo/total_custo*100):.1f}% do total")
+        st.metric("Custo Smartphones", f"R$ {smartphones['Custo_num']:,.2f}", f"{smartphones['participacao_custo_total']:.1f}% do total")
     
     with col3:
-        ctr_smartphones = (data['dispositivos'][data['dispositivos']['Dispositivo'] == 'Smartphones']['Cliques_num'].iloc[0] / smartphone_impressoes) * 100
-        st.metric("CTR Smartphones", f"{ctr_smartphones:.2f}%")
+        st.metric("CTR Smartphones", f"{smartphones['ctr']:.2f}%")
+    
+    # Onde colocar o orçamento: curvas de retornos decrescentes por segmento
+    # (allocation.optimize), resolvidas em milissegundos a cada mudança
+    st.subheader("💸 Distribuição Sugerida do Orçamento")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        orcamento = st.number_input("Orçamento total (R$)", min_value=0.0, value=float(round(total_custo, 2)),
+                                    step=100.0, key='orcamento_alocacao')
+    
+    with col2:
+        variacao_maxima = st.slider("Variação máxima por segmento (%)", 10, 100,
+                                    int(allocation.VARIACAO_MAXIMA * 100), step=10, key='variacao_alocacao')
+    
+    with instrumentation.timer('alocacao_orcamento', 'grafico'):
+        alocacao = allocation.optimize(data, orcamento, variacao_maxima / 100)
+        fig = figures.allocation_figure(alocacao)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+    
+    if abs(alocacao['orcamento_efetivo'] - alocacao['orcamento']) >= 0.01:
+        minimo, maximo = alocacao['faixa_orcamento']
+        st.warning(f"Com variação máxima de {variacao_maxima}% por segmento, o orçamento possível vai de "
+                   f"R$ {minimo:,.2f} a R$ {maximo:,.2f}: a divisão usa R$ {alocacao['orcamento_efetivo']:,.2f}. "
+                   "Aumente a variação máxima para distribuir o valor informado.")
+    
+    col1, col2 = st.columns(2)
+    for coluna_tela, dimensao in zip((col1, col2), allocation.DIMENSOES):
+        if dimensao not in alocacao:
+            continue
+        with coluna_tela:
+            st.metric(f"Cliques a mais ({dimensao.lower()})", f"{alocacao[f'ganho_{dimensao}']:+.1f}%")
+            st.dataframe(alocacao[dimensao], hide_index=True, use_container_width=True)
+    st.caption(f"Elasticidade dos cliques ao custo ajustada à Série temporal: {alocacao['elasticidade']:.2f} "
+               "(1 = sem retornos decrescentes). Cada segmento fica entre ± a variação máxima do custo atual.")
+    if 'Hora' in alocacao:
+        with st.expander("Orçamento por hora (proporcional às impressões de cada hora)"):
+            st.dataframe(alocacao['Hora'], hide_index=True, use_container_width=True)
 
-with tab5:
+def render_conversoes():
     st.header("🔄 Análise de Conversões")
     
     # Métricas de conversão
@@ -488,13 +611,11 @@ with tab5:
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
-        taxa_conversao = 0
         st.markdown('<div class="metric-card negative-metric">', unsafe_allow_html=True)
         st.metric("Taxa de Conversão", f"{taxa_conversao:.2f}%")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
-        custo_por_conversao = total_custo if taxa_conversao == 0 else 0
         st.markdown('<div class="metric-card negative-metric">', unsafe_allow_html=True)
         st.metric("Custo por Conversão", f"R$ {custo_por_conversao:,.2f}")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -507,34 +628,25 @@ with tab5:
     # Funnel de conversão atual
     st.subheader("📊 Funil de Conversão Atual")
     
-    funnel_data = pd.DataFrame({
-        'Estágio': ['Impressões', 'Cliques', 'Visitantes Site', 'Leads', 'Clientes'],
-        'Quantidade': [total_impressoes, total_cliques, 0, 0, 0],
-        'Taxa Conversão': [100, (total_cliques/total_impressoes*100), 0, 0, 0]
-    })
-    
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.funnel(funnel_data, x='Quantidade', y='Estágio', 
-                       title='Funil de Conversão - Quantidade',
-                       color='Estágio')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('funil_quantidade')
     
     with col2:
-        fig = px.bar(funnel_data, x='Taxa Conversão', y='Estágio',
-                    title='Taxa de Conversão por Estágio (%)',
-                    orientation='h',
-                    color='Estágio')
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('funil_taxa')
     
     # Análise de potencial de conversão
     st.subheader("🎯 Análise de Potencial de Conversão")
     
     col1, col2 = st.columns(2)
     
+    # Projeções sobre os cliques e o custo reais (com os filtros), ticket médio de R$ 600
+    potencial = scenarios.project(total_cliques, total_custo, scenarios.FAIXA_TAXAS, scenarios.TICKET_MEDIO)
+    cenarios = scenarios.scenario_table(total_cliques, total_custo)
+    
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         ### 📈 Projeção com Taxas de Indústria
         
         **Turismo/Experiências:**
@@ -543,29 +655,60 @@ with tab5:
         - ROAS esperado: 300-500%
         
         **Potencial com tráfego atual:**
-        - Cliques: 2.260
-        - Conversões esperadas: 45-113
-        - Faturamento potencial: R$ 27.000-67.500
-        """)
+        - Cliques: {total_cliques:,.0f}
+        - Conversões esperadas: {potencial['conversoes'].min():,.0f}-{potencial['conversoes'].max():,.0f}
+        - Faturamento potencial: R$ {potencial['faturamento'].min():,.0f}-{potencial['faturamento'].max():,.0f}
+        """.replace(',', '.'))
     
     with col2:
-        # Simulação de cenários
-        st.markdown("""
+        # Cenários nomeados com as taxas de scenarios.CENARIOS
+        linhas = "\n".join(
+            f"""
+        **Cenário {c['Cenário']} ({c['Taxa de conversão (%)']:.0f}%):**
+        - Conversões: {c['Conversões']:,.0f}
+        - Faturamento: R$ {c['Faturamento']:,.0f}
+        - ROAS: {c['ROAS (%)']:,.0f}%
+        """.replace(',', '.')
+            for c in cenarios.to_dict('records')
+        )
+        st.markdown(f"""
         ### 🔄 Cenários com Melhorias
-        
-        **Cenário Conservador (1%):**
-        - Conversões: 23
-        - Faturamento: R$ 13.800
-        
-        **Cenário Realista (2%):**
-        - Conversões: 45
-        - Faturamento: R$ 27.000
-        
-        **Cenário Otimista (5%):**
-        - Conversões: 113
-        - Faturamento: R$ 67.800
+        {linhas}
         """)
     
+    # Simulador: a grade de cenários é refeita a cada movimento dos sliders (leva
+    # milissegundos) e só esta aba é reexecutada. O gráfico não passa pelo cache
+    # de figuras para não ocupar uma entrada por posição dos sliders.
+    st.subheader("🧮 Simulador de Cenários")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        faixa_taxas = st.slider("Taxa de conversão (%)", 0.5, 10.0, scenarios.FAIXA_TAXAS, step=0.5,
+                                key='faixa_conversao')
+    
+    with col2:
+        ticket = st.number_input("Ticket médio (R$)", min_value=1.0, value=scenarios.TICKET_MEDIO, step=50.0,
+                                 key='ticket_medio')
+    
+    with col3:
+        variacao = st.slider("Variação do orçamento (%)", -50, 200, 0, step=5, key='variacao_orcamento')
+    
+    with col4:
+        metrica = st.radio("Colorir por", list(scenarios.METRICAS), format_func=lambda m: scenarios.METRICAS[m][0],
+                           key='metrica_cenarios')
+    
+    with instrumentation.timer('cenarios', 'grafico'):
+        fig = figures.build('cenarios', data, kpi, metrica=metrica, faixa_taxas=faixa_taxas, ticket=ticket,
+                            variacao=variacao)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(scenarios.scenario_table(total_cliques, total_custo, ticket, variacao, {
+        'Mínimo da faixa': faixa_taxas[0],
+        **scenarios.CENARIOS,
+        'Máximo da faixa': faixa_taxas[1],
+    }), hide_index=True, use_container_width=True)
+    
     # Diagnóstico de problemas de conversão
     st.subheader("🔍 Diagnóstico de Problemas de Conversão")
     
@@ -595,55 +738,16 @@ with tab5:
         - Falta de remarketing
         """)
 
-# NOVA ABA - COMPARATIVO DE CAMPANHAS
-with tab6:
+def render_comparativo():
     st.header("📊 Comparativo de Performance")
     
-    # Dados para comparação (benchmarks da indústria)
-    benchmarks = {
-        'Métrica': ['CTR', 'CPC (R$)', 'Taxa de Conversão', 'Custo por Conversão (R$)', 'ROAS'],
-        'Nossa Campanha': [3.41, cpc_medio, 0, custo_por_conversao, 0],
-        'Média do Setor': [2.5, 1.20, 3.0, 80, 350],
-        'Top Performers': [5.0, 0.80, 8.0, 40, 600]
-    }
-    
-    df_benchmarks = pd.DataFrame(benchmarks)
-    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("📈 Comparativo com Benchmarks")
         
-        # Gráfico de radar para comparação
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatterpolar(
-            r=df_benchmarks['Nossa Campanha'].tolist(),
-            theta=df_benchmarks['Métrica'].tolist(),
-            fill='toself',
-            name='Nossa Campanha',
-            line_color='blue'
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=df_benchmarks['Média do Setor'].tolist(),
-            theta=df_benchmarks['Métrica'].tolist(),
-            fill='toself',
-            name='Média do Setor',
-            line_color='orange'
-        ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, max(df_benchmarks[['Nossa Campanha', 'Média do Setor']].max().max(), 600)]
-                )),
-            showlegend=True,
-            title="Comparativo de Performance vs Benchmarks"
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        # Gráfico de radar para comparação com benchmarks da indústria
+        show_figure('radar_benchmarks', custo_por_conversao=custo_por_conversao)
     
     with col2:
         st.subheader("🎯 Análise Competitiva")
@@ -705,46 +809,13 @@ with tab6:
     # Comparativo por canal
     st.subheader("📊 Comparativo por Canal de Aquisição")
     
-    if not data['redes'].empty:
-        fig = px.bar(data['redes'], x='Rede', y=['Cliques_num', 'Custo_num'],
-                    title='Comparativo: Cliques vs Custo por Rede',
-                    barmode='group',
-                    labels={'value': 'Quantidade', 'variable': 'Métrica'})
-        fig.update_layout(xaxis_title='Rede', yaxis_title='Quantidade')
-        st.plotly_chart(fig, use_container_width=True)
+    show_figure('cliques_custo_rede')
     
     # Comparativo temporal
     st.subheader("📅 Evolução Temporal vs Metas")
     
-    if not semanas_ativas.empty:
-        # Adicionando metas fictícias para comparação
-        semanas_ativas['Meta_Cliques'] = semanas_ativas['Cliques_num'] * 1.2  # Meta 20% maior
-        semanas_ativas['Meta_Custo'] = semanas_ativas['Custo_num'] * 0.9     # Meta 10% menor custo
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=semanas_ativas['Semana'],
-            y=semanas_ativas['Cliques_num'],
-            name='Cliques Reais',
-            line=dict(color='blue', width=3)
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=semanas_ativas['Semana'],
-            y=semanas_ativas['Meta_Cliques'],
-            name='Meta Cliques',
-            line=dict(color='green', width=2, dash='dash')
-        ))
-        
-        fig.update_layout(
-            title='Evolução de Cliques vs Metas',
-            xaxis_title='Semana',
-            yaxis_title='Cliques',
-            xaxis_tickangle=45
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+    # Meta fictícia para comparação: 20% mais cliques
+    show_figure('cliques_vs_metas', meta_cliques=1.2)
     
     # KPIs de performance comparativa
     st.subheader("🎯 KPIs de Performance Comparativa")
@@ -767,13 +838,9 @@ with tab6:
         performance_geral = (eficiencia_ctr + eficiencia_cpc) / 2
         st.metric("Performance Geral", f"{performance_geral:+.1f}%")
 
-with tab7:
+def render_recomendacoes():
     st.header("💡 Análise e Recomendações")
-    
-    # Métricas calculadas para análise
-    taxa_sem_cliques = (len(palavras_sem_cliques) / len(data['palavras_chave'])) * 100
-    custo_smartphones = data['dispositivos'][data['dispositivos']['Dispositivo'] == 'Smartphones']['Custo_num'].iloc[0]
-    percentual_smartphones = (data['dispositivos'][data['dispositivos']['Dispositivo'] == 'Smartphones']['Impressões_num'].iloc[0] / total_impressoes) * 100
+    aviso_termos_limitados()
     
     col1, col2 = st.columns(2)
     
@@ -802,8 +869,8 @@ with tab7:
         
         st.warning(f"""
         **💰 Otimização de custo:**
-        - {len(palavras_sem_cliques)} palavras-chave sem cliques
-        - Custo em smartphones: R$ {custo_smartphones:,.2f}
+        - {kpi['palavras_sem_cliques']} palavras-chave sem cliques
+        - Custo em smartphones: R$ {smartphones['Custo_num']:,.2f}
         - Rede de Display com CPC baixo mas muitas impressões
         
         **📅 Sazonalidade:**
@@ -826,7 +893,7 @@ with tab7:
         - Computadores subutilizados
         
         **🔍 Palavras-chave ineficientes:**
-        - {taxa_sem_cliques:.1f}% das palavras-chave sem cliques
+        - {kpi['taxa_sem_cliques']:.1f}% das palavras-chave sem cliques
         - Termos muito específicos sem performance
         """)
         
@@ -842,6 +909,44 @@ with tab7:
         7. **IMPLEMENTAR REMARKETING** - Recuperar visitantes
         """)
     
+    # Termos que gastam sem converter
+    st.subheader("🚫 Candidatas a Palavras-chave Negativas")
+    
+    negativas = load_negatives(
+        versoes_filtradas['pesquisas'], versoes['palavras_chave'], data['pesquisas'], dados_completos['palavras_chave'],
+        load_query_index(versoes_filtradas['pesquisas'], data['pesquisas']),
+    )
+    
+    if negativas['conta_sem_conversoes']:
+        st.warning("Nenhuma conversão registrada: todo termo com custo aparece como candidato. "
+                   "Confirme o rastreamento de conversões antes de negativar.")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Custo sem Conversão", f"R$ {negativas['custo_desperdicado']:,.2f}")
+    
+    with col2:
+        taxa = negativas['custo_desperdicado'] / negativas['custo_total'] * 100 if negativas['custo_total'] > 0 else 0
+        st.metric("% do Custo das Pesquisas", f"{taxa:.1f}%")
+    
+    with col3:
+        st.metric("Termos Candidatos", f"{len(negativas['termos']):,}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Termos de pesquisa (correspondência exata)**")
+        st.dataframe(negativas['termos'].head(50), hide_index=True, use_container_width=True)
+    
+    with col2:
+        st.write("**Palavras e pares de palavras (ampla / frase)**")
+        st.dataframe(negativas['palavras'].head(50), hide_index=True, use_container_width=True)
+    
+    # O CSV só é montado quando o botão é clicado
+    st.download_button("📥 Exportar negativas (CSV)", data=lambda: negatives.export_csv(negativas),
+                       file_name="negativas.csv", mime="text/csv")
+    
     # Plano de ação detalhado
     st.subheader("📋 Plano de Ação Detalhado")
     
@@ -885,14 +990,145 @@ with tab7:
     with col2:
         st.metric("Cliques Gerados", f"{total_cliques:,.0f}")
     
+    # Cenário realista do simulador, com ticket médio de R$ 600
+    realista = scenarios.scenario_table(total_cliques, total_custo).set_index('Cenário').loc['Realista']
+    
+    with col3:
+        st.metric(f"Conversões Potenciais ({realista['Taxa de conversão (%)']:.0f}%)",
+                  f"{realista['Conversões']:,.0f}")
+    
+    with col4:
+        st.metric("Faturamento Potencial", f"R$ {realista['Faturamento']:,.2f}")
+    
+    # Incerteza da projeção: CPC, taxa de conversão e ticket sorteados de
+    # distribuições ajustadas à conta (montecarlo.simulate)
+    st.subheader("🎲 Incerteza da Projeção (Monte Carlo)")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        faixa_taxas = st.slider("Taxa de conversão (%)", 0.5, 10.0, scenarios.FAIXA_TAXAS, step=0.5,
+                                key='faixa_conversao_mc')
+    
+    with col2:
+        ticket = st.number_input("Ticket médio (R$)", min_value=1.0, value=scenarios.TICKET_MEDIO, step=50.0,
+                                 key='ticket_mc')
+    
+    with col3:
+        semanas_mc = st.slider("Horizonte (semanas)", 1, 26, montecarlo.SEMANAS, key='semanas_mc')
+    
+    with col4:
+        variacao = st.slider("Variação do orçamento (%)", -50, 200, 0, step=5, key='variacao_mc')
+    
+    parametros = (('faixa_taxas', tuple(faixa_taxas)), ('ticket', ticket), ('semanas', semanas_mc),
+                  ('variacao', variacao))
+    simulacao = load_monte_carlo(data.versao, parametros, data)
+    percentis = simulacao['percentis']
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Orçamento do Horizonte", f"R$ {simulacao['orcamento']:,.2f}")
+    
+    with col2:
+        st.metric("Faturamento Mediano", f"R$ {percentis.loc['Faturamento (R$)', 'P50']:,.0f}",
+                  help=f"P5-P95: R$ {percentis.loc['Faturamento (R$)', 'P5']:,.0f} - "
+                       f"R$ {percentis.loc['Faturamento (R$)', 'P95']:,.0f}")
+    
     with col3:
-        st.metric("Conversões Potenciais (2%)", "45")
+        st.metric("ROAS Mediano", f"{percentis.loc['ROAS (%)', 'P50']:,.0f}%",
+                  help=f"P5-P95: {percentis.loc['ROAS (%)', 'P5']:,.0f}% - {percentis.loc['ROAS (%)', 'P95']:,.0f}%")
     
     with col4:
-        faturamento_potencial = 45 * 600  # Considerando ticket médio de R$ 600
-        st.metric("Faturamento Potencial", f"R$ {faturamento_potencial:,.2f}")
+        st.metric("Chance de Retorno (ROAS ≥ 100%)", f"{simulacao['prob_retorno']:.1f}%")
+    
+    metrica_mc = st.radio("Distribuição", ['roas', 'faturamento'], horizontal=True, key='metrica_mc',
+                          format_func={'roas': 'ROAS', 'faturamento': 'Faturamento'}.get)
+    st.plotly_chart(figures.monte_carlo_figure(simulacao, metrica_mc), use_container_width=True)
+    st.dataframe(percentis, use_container_width=True)
+    if simulacao['taxa_rastreada']:
+        st.caption("Taxa de conversão ajustada às conversões rastreadas da conta.")
+    else:
+        st.caption("Sem conversões rastreadas: a taxa de conversão é sorteada dentro da faixa informada. "
+                   "O CPC vem do histórico semanal da Série temporal.")
+
+# Um widget dentro da aba reexecuta só o fragmento, sem passar pelo início do
+# script: nesse caso a aba abre e fecha a própria execução instrumentada
+@st.fragment
+def render_tab(titulo, render):
+    fragmento = instrumentation.current() is None
+    if fragmento:
+        instrumentation.start_run(cliente=nome_campanha, fragmento=titulo)
+    inicio = time.perf_counter()
+    with instrumentation.timer(titulo, 'aba'):
+        render()
+    decorrido = time.perf_counter() - inicio
+    if fragmento:
+        instrumentation.finish_run()
+    st.session_state.setdefault('tempos_abas', {})[titulo] = decorrido
+    if st.session_state.get('mostrar_tempos'):
+        st.caption(f"⏱️ Renderização da aba: {decorrido * 1000:.0f} ms")
+
+ABAS = [
+    ("📈 Visão Geral", render_visao_geral),
+    ("🎯 Público-Alvo", render_publico),
+    ("🔍 Palavras-chave", render_palavras_chave),
+    ("📱 Dispositivos & Redes", render_dispositivos),
+    ("🔄 Conversões", render_conversoes),
+    ("📊 Comparativo", render_comparativo),
+    ("💡 Recomendações", render_recomendacoes),
+]
+
+# Layout principal
+if ignoradas:
+    def _periodos(dias):
+        return ', '.join(f"{i:%d/%m/%Y}" if i == f else f"{i:%d/%m/%Y} a {f:%d/%m/%Y}" for i, f in dias)
+    st.warning("Exportações com períodos sobrepostos: como trazem totais do período, a sobreposição não pode ser "
+               "separada e a exportação mais antiga foi ignorada. Reexporte esses dias sem sobreposição.\n\n"
+               + '\n'.join(f"- {nome}: {os.path.basename(exp.path)} — sem dados em {_periodos(dias)}"
+                            for nome, exp, dias in ignoradas))
+abas = st.tabs([titulo for titulo, _ in ABAS], key='aba_atual', on_change='rerun')
+renderizadas = []
+for aba, (titulo, render) in zip(abas, ABAS):
+    if renderizacao_preguicosa and not aba.open:
+        continue
+    with aba:
+        render_tab(titulo, render)
+    renderizadas.append(titulo)
+
+# Painel de tempos: custo da última renderização de cada aba nesta sessão
+if st.session_state.get('mostrar_tempos'):
+    tempos = st.session_state.get('tempos_abas', {})
+    painel_tempos.dataframe(
+        pd.DataFrame({
+            'Aba': [titulo for titulo, _ in ABAS],
+            'Última renderização (ms)': [tempos.get(titulo, np.nan) * 1000 for titulo, _ in ABAS],
+            'Nesta execução': [titulo in renderizadas for titulo, _ in ABAS],
+        }),
+        hide_index=True,
+    )
+
+# Painel de depuração: etapas mais lentas e caches desta execução, e o perfil
+# (cProfile) da execução pedida pelo botão
+if perfil is not None:
+    st.session_state['perfil'] = instrumentation.stop_profile(perfil)
+registro = instrumentation.finish_run()
+if st.session_state.get('painel_depuracao'):
+    with painel_depuracao.container():
+        tempos_execucao, caches_execucao = instrumentation.summary(registro)
+        st.caption(f"Execução: {registro['total_ms']:,.0f} ms")
+        st.dataframe(tempos_execucao, hide_index=True)
+        st.dataframe(caches_execucao, hide_index=True)
+        if instrumentation.ARQUIVO_METRICAS:
+            st.caption(f"Métricas gravadas em {instrumentation.ARQUIVO_METRICAS}")
+        st.button("🔬 Perfilar a próxima execução", key='botao_perfilar',
+                  on_click=lambda: st.session_state.update(perfilar=True))
+        if 'perfil' in st.session_state:
+            st.code(st.session_state['perfil']['resumo'], language=None)
+            st.download_button("⬇️ Baixar perfil (.prof)", data=st.session_state['perfil']['arquivo'],
+                               file_name="perfil.prof", mime="application/octet-stream")
 
 # Footer
 st.markdown("---")
-st.markdown("**Dashboard criado para análise da campanha 'Voo de Balão em Aquidauana'**")
+st.markdown(f"**Dashboard criado para análise da campanha '{nome_campanha}'**")
 st.markdown("*Período: Abril a Outubro 2025* | *Desenvolvido com Streamlit*")
\ No newline at end of file
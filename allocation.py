@@ -0,0 +1,188 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Distribuição do orçamento entre segmentos (dispositivos, redes) com retornos
+# decrescentes: cada segmento segue cliques = a * custo^b. A elasticidade b é
+# ajustada à conta pela relação custo x cliques das semanas da Série temporal
+# (regressão log-log) e cada `a` passa pelo ponto observado do segmento. O
+# ótimo iguala o clique marginal a*b*x^(b-1) entre os segmentos; com limites
+# de variação por segmento, o multiplicador é achado por bisseção, vetorizada
+# sobre várias contas de uma vez.
+# O relatório Dia_e_hora só traz impressões: sem custo e cliques por hora, a
+# divisão por hora segue o volume de impressões (o mesmo ótimo da curva com
+# CTR e CPM iguais em todas as horas).
+
+# Usada quando a Série temporal não tem semanas suficientes para o ajuste
+ELASTICIDADE_PADRAO = 0.6
+LIMITES_ELASTICIDADE = (0.2, 0.95)
+SEMANAS_MINIMAS = 4
+
+# Cada segmento pode variar até esta fração do custo atual
+VARIACAO_MAXIMA = 0.5
+
+ITERACOES = 60
+
+# Contas resolvidas juntas (vetorizadas) em cada processo
+CONTAS_POR_LOTE = 256
+
+# Dimensão -> (relatório, coluna do segmento)
+DIMENSOES = {
+    'Dispositivo': ('dispositivos', 'Dispositivo'),
+    'Rede': ('redes', 'Rede'),
+}
+
+
+# b de cliques = a * custo^b pelas semanas com custo e cliques
+def fit_elasticity(serie):
+    custo = serie['Custo_num'].to_numpy(dtype='float64')
+    cliques = serie['Cliques_num'].to_numpy(dtype='float64')
+    validas = (custo > 0) & (cliques > 0)
+    if validas.sum() < SEMANAS_MINIMAS or np.ptp(np.log(custo[validas])) == 0:
+        return ELASTICIDADE_PADRAO
+    b = np.polyfit(np.log(custo[validas]), np.log(cliques[validas]), 1)[0]
+    return float(np.clip(b, *LIMITES_ELASTICIDADE))
+
+
+# Custo de cada segmento que iguala o clique marginal ao multiplicador `lam`,
+# dentro dos limites. Arrays (contas, segmentos); b e lam por conta.
+def _spend(a, b, lam, minimo, maximo):
+    b = b[:, None]
+    with np.errstate(divide='ignore', over='ignore'):
+        x = (a * b / lam[:, None]) ** (1 / (1 - b))
+    return np.clip(x, minimo, maximo)
+
+
+# Ótimo de várias contas de uma vez: a, minimo, maximo (contas, segmentos),
+# b e orcamento (contas). Segmentos sem curva (a = 0) ficam no mínimo.
+def solve(a, b, orcamento, minimo, maximo, iteracoes=ITERACOES):
+    a, minimo, maximo = (np.atleast_2d(np.asarray(v, dtype='float64')) for v in (a, minimo, maximo))
+    b = np.atleast_1d(np.asarray(b, dtype='float64'))
+    orcamento = np.clip(np.atleast_1d(np.asarray(orcamento, dtype='float64')), minimo.sum(1), maximo.sum(1))
+    # Bisseção no log do multiplicador: o gasto total cai quando ele sobe
+    baixo = np.full(len(a), -30.0)
+    alto = np.full(len(a), 30.0)
+    for _ in range(iteracoes):
+        meio = (baixo + alto) / 2
+        acima = _spend(a, b, np.exp(meio), minimo, maximo).sum(1) > orcamento
+        baixo = np.where(acima, meio, baixo)
+        alto = np.where(acima, alto, meio)
+    return _spend(a, b, np.exp((baixo + alto) / 2), minimo, maximo)
+
+
+def _clicks(a, b, custo):
+    return a * custo ** b
+
+
+# Limites de cada segmento: até variacao_maxima do custo atual; segmentos sem
+# custo não têm curva e ficam de fora da divisão
+def _bounds(custo, variacao_maxima):
+    pagos = custo > 0
+    return custo * (1 - variacao_maxima) * pagos, np.where(pagos, custo * (1 + variacao_maxima), 0.0)
+
+
+# Segmentos de uma dimensão: custo e cliques atuais e a curva calibrada
+def _segments(df, coluna, b):
+    segmentos = df.groupby(coluna, sort=False, observed=True)[['Custo_num', 'Cliques_num']].sum()
+    custo = segmentos['Custo_num'].to_numpy(dtype='float64')
+    cliques = segmentos['Cliques_num'].to_numpy(dtype='float64')
+    a = np.divide(cliques, custo ** b, out=np.zeros(len(custo)), where=custo > 0)
+    return segmentos.index.astype(str), custo, cliques, a
+
+
+# Tabela da divisão sugerida de uma dimensão para o orçamento total
+def allocate(df, coluna, b, orcamento=None, variacao_maxima=VARIACAO_MAXIMA):
+    nomes, custo, cliques, a = _segments(df, coluna, b)
+    orcamento = custo.sum() if orcamento is None else orcamento
+    minimo, maximo = _bounds(custo, variacao_maxima)
+    sugerido = solve(a, b, orcamento, minimo, maximo)[0]
+    projetados = _clicks(a, b, sugerido)
+    return pd.DataFrame({
+        coluna: nomes,
+        'Custo atual': custo,
+        'Cliques atuais': cliques,
+        'CPC atual': np.divide(custo, cliques, out=np.zeros(len(custo)), where=cliques > 0),
+        'Custo sugerido': sugerido,
+        'Variação (%)': np.divide(sugerido - custo, custo, out=np.zeros(len(custo)), where=custo > 0) * 100,
+        'Cliques projetados': projetados,
+    })
+
+
+# Divisão do orçamento por hora proporcional às impressões de cada hora
+def allocate_hours(horas, orcamento):
+    impressoes = horas['Impressões_num'].to_numpy(dtype='float64')
+    total = impressoes.sum()
+    return pd.DataFrame({
+        'Hora de início': horas['Hora de início'].to_numpy(),
+        'Impressões': impressoes,
+        'Custo sugerido': impressoes / total * orcamento if total > 0 else impressoes * 0.0,
+    })
+
+
+# Faixa de orçamento que uma dimensão comporta com os limites por segmento
+def budget_range(df, coluna, variacao_maxima=VARIACAO_MAXIMA):
+    custo = df.groupby(coluna, sort=False, observed=True)['Custo_num'].sum().to_numpy(dtype='float64')
+    minimo, maximo = _bounds(custo, variacao_maxima)
+    return float(minimo.sum()), float(maximo.sum()), float(custo.sum())
+
+
+# Divisão sugerida por dispositivo, por rede e por hora para o orçamento
+# (padrão: o custo total da conta). O orçamento é trazido para a faixa que
+# todas as dimensões comportam ('orcamento_efetivo'), e as três divisões
+# distribuem esse mesmo valor. data: relatórios carregados (LazyReports).
+def optimize(data, orcamento=None, variacao_maxima=VARIACAO_MAXIMA):
+    b = fit_elasticity(data['serie_temporal']) if 'serie_temporal' in data else ELASTICIDADE_PADRAO
+    dimensoes = {dimensao: (data[relatorio], coluna) for dimensao, (relatorio, coluna) in DIMENSOES.items()
+                 if relatorio in data and not data[relatorio].empty}
+    faixas = [budget_range(df, coluna, variacao_maxima) for df, coluna in dimensoes.values()]
+    if orcamento is None:
+        orcamento = faixas[0][2] if faixas else 0.0
+    minimo = max((faixa[0] for faixa in faixas), default=0.0)
+    maximo = min((faixa[1] for faixa in faixas), default=orcamento)
+    efetivo = float(np.clip(orcamento, minimo, max(minimo, maximo)))
+
+    resultado = {'elasticidade': b, 'orcamento': orcamento, 'orcamento_efetivo': efetivo,
+                 'faixa_orcamento': (minimo, maximo)}
+    for dimensao, (df, coluna) in dimensoes.items():
+        tabela = allocate(df, coluna, b, efetivo, variacao_maxima)
+        resultado[dimensao] = tabela
+        resultado[f'ganho_{dimensao}'] = _gain(tabela)
+    if 'hora' in data:
+        resultado['Hora'] = allocate_hours(data['hora'], efetivo)
+    return resultado
+
+
+# Cliques a mais (%) da divisão sugerida sobre a curva da divisão atual
+def _gain(tabela):
+    atuais = tabela['Cliques atuais'].sum()
+    return float((tabela['Cliques projetados'].sum() / atuais - 1) * 100) if atuais > 0 else 0.0
+
+
+# Várias contas de uma vez. custos e cliques: (contas, segmentos), com zeros
+# onde a conta não tem o segmento; b por conta; orcamentos por conta (padrão:
+# o custo atual). Devolve o custo sugerido de cada segmento.
+def allocate_batch(custos, cliques, b, orcamentos=None, variacao_maxima=VARIACAO_MAXIMA):
+    custos = np.asarray(custos, dtype='float64')
+    b = np.broadcast_to(np.asarray(b, dtype='float64'), (len(custos),))
+    a = np.divide(cliques, custos ** b[:, None], out=np.zeros(custos.shape), where=custos > 0)
+    orcamentos = custos.sum(1) if orcamentos is None else orcamentos
+    minimo, maximo = _bounds(custos, variacao_maxima)
+    return solve(a, b, orcamentos, minimo, maximo)
+
+
+# allocate_batch para centenas de contas: lotes de CONTAS_POR_LOTE contas
+# resolvidos em paralelo (cada lote continua vetorizado dentro do processo)
+def allocate_accounts(custos, cliques, b, orcamentos=None, variacao_maxima=VARIACAO_MAXIMA, processos=None):
+    custos = np.asarray(custos, dtype='float64')
+    cliques = np.asarray(cliques, dtype='float64')
+    b = np.broadcast_to(np.asarray(b, dtype='float64'), (len(custos),))
+    orcamentos = custos.sum(1) if orcamentos is None else np.broadcast_to(orcamentos, (len(custos),))
+    if processos == 1 or len(custos) <= CONTAS_POR_LOTE:
+        return allocate_batch(custos, cliques, b, orcamentos, variacao_maxima)
+    lotes = [slice(i, i + CONTAS_POR_LOTE) for i in range(0, len(custos), CONTAS_POR_LOTE)]
+    with ProcessPoolExecutor(processos) as pool:
+        resultados = pool.map(allocate_batch, [custos[l] for l in lotes], [cliques[l] for l in lotes],
+                              [b[l] for l in lotes], [orcamentos[l] for l in lotes],
+                              [variacao_maxima] * len(lotes))
+        return np.concatenate(list(resultados))
@@ -0,0 +1,175 @@
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import clients
+import discovery
+import figures
+import kpis
+import negatives
+
+# Gerador de relatórios estáticos (HTML e, opcionalmente, PNG) sem Streamlit.
+# Usa o mesmo carregamento, KPIs e gráficos do dashboard e processa vários
+# clientes em paralelo.
+# Uso: python batch_report.py --clientes-dir clientes --saida relatorios --processos 8
+
+# Mesma ordem e agrupamento das abas do dashboard
+SECOES = [
+    ("📈 Visão Geral", ['cliques_semana', 'custo_semana', 'impressoes_hora', 'impressoes_dia', 'heatmap_dia_hora']),
+    ("🎯 Público-Alvo", ['distribuicao_idade', 'distribuicao_sexo', 'impressoes_sexo_idade']),
+    ("🔍 Palavras-chave", ['top_palavras_ctr', 'top_palavras_cliques', 'eficiencia_palavras', 'top_pesquisas',
+                            'custo_palavras_pesquisa']),
+    ("📱 Dispositivos & Redes", ['impressoes_dispositivo', 'custo_dispositivo', 'cliques_rede', 'cpc_rede',
+                                'eficiencia_dispositivo', 'alocacao_orcamento']),
+    ("🔄 Conversões", ['funil_quantidade', 'funil_taxa', 'cenarios']),
+    ("📊 Comparativo", ['radar_benchmarks', 'cliques_custo_rede', 'cliques_vs_metas']),
+]
+
+_PARAMETROS = {
+    'cliques_vs_metas': {'meta_cliques': 1.2},
+}
+
+
+def _metricas_html(kpi):
+    linhas = [
+        ("Total de Impressões", f"{kpi['total_impressoes']:,.0f}"),
+        ("Total de Cliques", f"{kpi['total_cliques']:,.0f}"),
+        ("CTR Médio", f"{kpi['ctr_medio']:.2f}%"),
+        ("Custo Total", f"R$ {kpi['total_custo']:,.2f}"),
+        ("Custo por Clique (CPC)", f"R$ {kpi['cpc_medio']:.2f}"),
+        ("Semanas Ativas", f"{kpi['semanas_ativas']} de {kpi['total_semanas']}"),
+        ("Pico de Cliques", f"{kpi['pico_cliques']:.0f}"),
+        ("Palavras-chave sem Cliques", f"{kpi['palavras_sem_cliques']} ({kpi['taxa_sem_cliques']:.1f}%)"),
+    ]
+    celulas = ''.join(f"<div class='metrica'><span>{html.escape(rotulo)}</span><b>{valor}</b></div>"
+                      for rotulo, valor in linhas)
+    return f"<div class='metricas'>{celulas}</div>"
+
+
+# Gera o relatório de um cliente; devolve (cliente, caminho do HTML, segundos)
+def render_client(cliente, base_dir, saida, imagens=False, plotlyjs='cdn'):
+    inicio = time.perf_counter()
+    data = discovery.load_dataset(base_dir)
+    kpi = kpis.compute_kpis(data, discovery.week_aggregates(base_dir))
+    # Sem conversões rastreadas, o custo por conversão é o investimento total
+    parametros = dict(_PARAMETROS, radar_benchmarks={'custo_por_conversao': kpi['total_custo']})
+
+    pasta = os.path.join(saida, cliente)
+    os.makedirs(pasta, exist_ok=True)
+    partes = [_metricas_html(kpi)]
+    incluir_js = plotlyjs
+    for titulo, nomes in SECOES:
+        partes.append(f"<h2>{html.escape(titulo)}</h2><div class='graficos'>")
+        for nome in nomes:
+            fig = figures.build(nome, data, kpi, **parametros.get(nome, {}))
+            if fig is None:
+                continue
+            # O plotly.js só é incluído no primeiro gráfico da página
+            partes.append(fig.to_html(full_html=False, include_plotlyjs=incluir_js))
+            incluir_js = False
+            if imagens:
+                # Exportação de imagens depende do pacote opcional kaleido
+                fig.write_image(os.path.join(pasta, f"{nome}.png"))
+        partes.append("</div>")
+
+    # Lista de negativas ao lado do HTML, no mesmo formato da exportação do dashboard
+    with open(os.path.join(pasta, 'negativas.csv'), 'wb') as f:
+        f.write(negatives.export_csv(negatives.mine_negatives(data['pesquisas'], palavras_chave=data['palavras_chave'])))
+
+    caminho = os.path.join(pasta, 'relatorio.html')
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(_PAGINA.format(titulo=html.escape(cliente), corpo='\n'.join(partes)))
+    return cliente, caminho, time.perf_counter() - inicio
+
+
+_PAGINA = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Relatório de Campanha - {titulo}</title>
+<style>
+    body {{ font-family: sans-serif; margin: 2rem; }}
+    h1 {{ color: #1f77b4; text-align: center; }}
+    .metricas {{ display: flex; flex-wrap: wrap; gap: 1rem; }}
+    .metrica {{ background-color: #f0f2f6; padding: 1rem; border-radius: 10px;
+               border-left: 4px solid #1f77b4; min-width: 180px; }}
+    .metrica span {{ display: block; font-size: 0.85rem; color: #555; }}
+    .metrica b {{ font-size: 1.4rem; }}
+    .graficos {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(480px, 1fr)); }}
+</style>
+</head>
+<body>
+<h1>🎈 Relatório de Campanha - {titulo}</h1>
+{corpo}
+</body>
+</html>
+"""
+
+
+# Gera os relatórios de vários clientes em um pool de processos.
+# clientes: lista de (nome, diretório). Devolve [(cliente, caminho, segundos)] e os erros.
+def render_batch(clientes, saida, processos=None, imagens=False, plotlyjs='cdn'):
+    resultados, erros = [], []
+    if processos == 1:
+        for cliente, base_dir in clientes:
+            try:
+                resultados.append(render_client(cliente, base_dir, saida, imagens, plotlyjs))
+            except Exception as e:
+                erros.append((cliente, e))
+        return resultados, erros
+
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        tarefas = {
+            pool.submit(render_client, cliente, base_dir, saida, imagens, plotlyjs): cliente
+            for cliente, base_dir in clientes
+        }
+        for tarefa in as_completed(tarefas):
+            try:
+                resultados.append(tarefa.result())
+            except Exception as e:
+                erros.append((tarefas[tarefa], e))
+    return resultados, erros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera relatórios estáticos das campanhas por cliente')
+    parser.add_argument('clientes', nargs='*', help='clientes a processar (padrão: todos)')
+    parser.add_argument('--clientes-dir', default=clients.CLIENTES_DIR)
+    parser.add_argument('--saida', default='relatorios')
+    parser.add_argument('--processos', type=int, default=None, help='padrão: número de CPUs')
+    parser.add_argument('--imagens', action='store_true', help='também exporta cada gráfico em PNG (requer kaleido)')
+    parser.add_argument('--embutir-plotlyjs', action='store_true',
+                        help='inclui o plotly.js no HTML (funciona offline, arquivo maior)')
+    args = parser.parse_args(argv)
+
+    disponiveis = clients.list_clients(args.clientes_dir)
+    if not disponiveis:
+        # Sem diretório de clientes: relatório único das exportações da raiz
+        selecionados = [(clients.CLIENTE_PADRAO, '.')]
+    else:
+        nomes = args.clientes or disponiveis
+        desconhecidos = sorted(set(nomes) - set(disponiveis))
+        if desconhecidos:
+            parser.error(f"cliente desconhecido: {', '.join(desconhecidos)}")
+        selecionados = [(nome, os.path.join(args.clientes_dir, nome)) for nome in nomes]
+
+    inicio = time.perf_counter()
+    resultados, erros = render_batch(
+        selecionados, args.saida, args.processos, args.imagens,
+        plotlyjs=True if args.embutir_plotlyjs else 'cdn',
+    )
+    decorrido = time.perf_counter() - inicio
+
+    for cliente, caminho, segundos in sorted(resultados):
+        print(f"  {cliente}: {caminho} ({segundos:.2f}s)")
+    for cliente, erro in erros:
+        print(f"  ERRO {cliente}: {erro}")
+    print(f"{len(resultados)} relatórios em {decorrido:.2f}s "
+          f"({len(resultados) / decorrido:.1f} clientes/s)")
+    return 1 if erros else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,709 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import allocation
+import batch_report
+import discovery
+import disk_cache
+import figures
+import heatmap
+import incremental
+import keyword_match
+import kpis
+import montecarlo
+import negatives
+import query_index
+import scenarios
+import schema
+import streaming
+import synthetic
+import text_search
+from parsing import (
+    MESES_PT, clean_currency_value, clean_number, clean_percentage,
+    parse_currency, parse_number, parse_percentage,
+)
+
+# Benchmarks do pipeline de dados do dashboard.
+# Uso: python benchmark.py --linhas 2000000
+
+
+# Gera colunas sintéticas no formato exportado pelo Google Ads
+def gerar_colunas(n_linhas, seed=42):
+    rng = np.random.default_rng(seed)
+    # Cauda longa: a maioria dos termos tem poucos cliques e custo baixo
+    centavos = (rng.pareto(1.5, n_linhas) * 150).astype(np.int64)
+    cliques = (rng.pareto(1.2, n_linhas) * 3).astype(np.int64)
+    ctr = rng.integers(0, 10000, n_linhas)
+
+    def milhar(v):
+        return f"{int(v):,}".replace(',', '.')
+
+    return pd.DataFrame({
+        'Custo': [_formatar_moeda(c) for c in centavos],
+        'Cliques': [milhar(v) for v in cliques],
+        'CTR': [f"{v // 100},{v % 100:02d}%" for v in ctr],
+    })
+
+
+# Gera um relatório Pesquisas(Pesquisar) sintético com n_linhas termos
+def gerar_pesquisas(n_linhas, seed=42):
+    rng = np.random.default_rng(seed)
+    base = gerar_colunas(n_linhas, seed)
+    impressoes = (rng.pareto(1.0, n_linhas) * 20).astype(np.int64)
+    conversoes = rng.binomial(1, 0.01, n_linhas)
+    return pd.DataFrame({
+        'Pesquisar': [f"termo de pesquisa {i}" for i in range(n_linhas)],
+        'Custo': base['Custo'],
+        'Cliques': base['Cliques'],
+        'Impressões': [f"{int(v):,}".replace(',', '.') for v in impressoes],
+        'Conversões': [f"{v},00" for v in conversoes],
+    })
+
+
+def _formatar_moeda(centavos):
+    reais, cent = divmod(int(centavos), 100)
+    return f"R$ {reais:,}".replace(',', '.') + f",{cent:02d}"
+
+
+# Identificação da execução, para comparar resultados de JSON entre versões
+def ambiente():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'cpus': os.cpu_count(),
+    }
+
+
+def cronometrar(func, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def benchmark_parsing(args):
+    n_linhas = args.linhas
+    df = gerar_colunas(n_linhas)
+    casos = [
+        ('Custo', clean_currency_value, parse_currency),
+        ('Cliques', clean_number, parse_number),
+        ('CTR', clean_percentage, parse_percentage),
+    ]
+    print(f"Parsing pt-BR - {n_linhas:,} linhas")
+    resultado = {'linhas': n_linhas}
+    for coluna, escalar, vetorizado in casos:
+        esperado = df[coluna].apply(escalar)
+        obtido = vetorizado(df[coluna])
+        assert np.allclose(esperado.to_numpy(), obtido.to_numpy()), coluna
+
+        t_apply = cronometrar(lambda: df[coluna].apply(escalar), repeticoes=1)
+        t_vetor = cronometrar(lambda: vetorizado(df[coluna]))
+        print(f"  {coluna:<8} apply: {t_apply:8.3f}s  vetorizado: {t_vetor:8.3f}s  "
+              f"ganho: {t_apply / t_vetor:6.1f}x")
+        resultado[coluna] = {'apply': t_apply, 'vetorizado': t_vetor}
+    return resultado
+
+
+# Partida fria (CSV -> limpeza) vs partida quente (cache Feather em disco)
+def benchmark_cache(args):
+    n_linhas = args.linhas
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'Pesquisas(Pesquisar_2025.01.01-2025.12.31).csv')
+        gerar_pesquisas(n_linhas).to_csv(caminho, index=False)
+
+        print(f"Cache em disco - {n_linhas:,} linhas")
+        if disk_cache.feather is None:
+            print("  pyarrow não instalado: cache em disco desativado")
+            return None
+
+        t_frio = cronometrar(lambda: schema.load_report('pesquisas', caminho), repeticoes=1)
+        t_hash = cronometrar(lambda: (disk_cache._hash_memo.clear(), disk_cache.file_hash(caminho)), repeticoes=1)
+        t_grava = cronometrar(lambda: disk_cache.load_cached('pesquisas', caminho, schema.load_report), repeticoes=1)
+        t_quente = cronometrar(lambda: disk_cache.load_cached('pesquisas', caminho, schema.load_report))
+        print(f"  frio (parse CSV): {t_frio:8.3f}s")
+        print(f"  primeira carga (parse + gravação): {t_grava:8.3f}s")
+        print(f"  quente (Feather mmap): {t_quente:8.3f}s  ganho: {t_frio / t_quente:6.1f}x")
+        print(f"  hash do CSV (novo processo): {t_hash:8.3f}s")
+    return {'linhas': n_linhas, 'frio': t_frio, 'primeira_carga': t_grava, 'quente': t_quente, 'hash': t_hash}
+
+
+# Vazão do gerador de relatórios: N clientes com as exportações de exemplo
+def benchmark_relatorios(args):
+    exportacoes = [nome for nome in os.listdir('.') if discovery.parse_filename(nome)]
+    with tempfile.TemporaryDirectory() as pasta:
+        clientes = []
+        for i in range(args.clientes):
+            base_dir = os.path.join(pasta, 'clientes', f"cliente-{i:04d}")
+            os.makedirs(base_dir)
+            for nome in exportacoes:
+                shutil.copy(nome, base_dir)
+            clientes.append((f"cliente-{i:04d}", base_dir))
+
+        print(f"Relatórios em lote - {args.clientes} clientes")
+        resultado = {'clientes': args.clientes, 'processos': {}}
+        for processos in (1, args.processos):
+            saida = os.path.join(pasta, f"saida-{processos}")
+            inicio = time.perf_counter()
+            resultados, erros = batch_report.render_batch(clientes, saida, processos)
+            decorrido = time.perf_counter() - inicio
+            assert not erros, erros
+            print(f"  {processos or os.cpu_count():>3} processos: {decorrido:8.2f}s  "
+                  f"{len(resultados) / decorrido:8.1f} clientes/s")
+            resultado['processos'][processos or os.cpu_count()] = decorrido
+            # Limpa o cache em disco para a próxima rodada também partir do zero
+            for _, base_dir in clientes:
+                shutil.rmtree(os.path.join(base_dir, disk_cache.CACHE_DIR), ignore_errors=True)
+    return resultado
+
+
+# Pico de memória do processo atual, em MB (ru_maxrss vem em KB no Linux e em bytes no macOS)
+def pico_memoria_mb():
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+_MODOS_STREAMING = {
+    'importações': lambda caminho: None,
+    'read_csv inteiro': lambda caminho: schema.load_report('pesquisas', caminho),
+    'carga em blocos': lambda caminho: streaming.load_report_chunked('pesquisas', caminho),
+    'carga do dashboard': lambda caminho: streaming.load_report_folded('pesquisas', caminho),
+    'agregação em blocos': lambda caminho: streaming.fold_report('pesquisas', caminho, max_termos=100_000),
+}
+
+
+# Executado em um processo novo, para que o pico de memória seja só o do modo medido
+def _medir_streaming(modo, caminho):
+    inicio = time.perf_counter()
+    _MODOS_STREAMING[modo](caminho)
+    return time.perf_counter() - inicio, pico_memoria_mb()
+
+
+def _gravar_pesquisas(caminho, n_linhas):
+    gerar_pesquisas(n_linhas).to_csv(caminho, index=False)
+
+
+# Leitura inteira vs em blocos de um Pesquisas(Pesquisar) grande: tempo, vazão e pico de RSS
+def benchmark_streaming(args):
+    n_linhas = args.linhas
+    contexto = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'Pesquisas(Pesquisar_2025.01.01-2025.12.31).csv')
+        # O pico de RSS sobrevive ao fork + exec: o CSV é gerado em outro processo
+        # para que os processos de medição não herdem a memória do gerador
+        with contexto.Pool(1) as pool:
+            pool.apply(_gravar_pesquisas, (caminho, n_linhas))
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+
+        print(f"Ingestão em blocos - {n_linhas:,} linhas ({tamanho_mb:.0f} MB)")
+        resultado = {'linhas': n_linhas, 'tamanho_mb': tamanho_mb, 'modos': {}}
+        for modo in _MODOS_STREAMING:
+            with contexto.Pool(1) as pool:
+                segundos, pico = pool.apply(_medir_streaming, (modo, caminho))
+            vazao = f"{n_linhas / segundos:12,.0f} linhas/s" if segundos > 0.01 else ''
+            print(f"  {modo:<20} {segundos:8.2f}s  pico RSS: {pico:8.0f} MB  {vazao}")
+            resultado['modos'][modo] = {'segundos': segundos, 'pico_rss_mb': pico}
+    return resultado
+
+
+# Memória por relatório: CSV limpo (com as strings), forma expandida e forma compacta
+def benchmark_memoria(args):
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome in os.listdir('.'):
+            if discovery.parse_filename(nome) and not nome.startswith('Pesquisas('):
+                shutil.copy(nome, pasta)
+        caminho = os.path.join(pasta, 'Pesquisas(Pesquisar_2025.04.10-2025.10.17).csv')
+        gerar_pesquisas(args.linhas).to_csv(caminho, index=False)
+        exportacoes = discovery.discover(pasta)
+
+        brutos = {nome: schema.load_report(nome, exps[-1].path) for nome, exps in exportacoes.items()}
+        compactos = {nome: discovery.load_consolidated(nome, exps) for nome, exps in exportacoes.items()}
+        expandidos = {nome: schema.expand(nome, df) for nome, df in compactos.items()}
+
+    tabela = schema.memory_report(brutos).rename(columns={'Memória (KB)': 'CSV limpo'})
+    tabela['Expandido'] = schema.memory_report(expandidos)['Memória (KB)']
+    tabela['Compacto'] = schema.memory_report(compactos)['Memória (KB)']
+    print(f"Memória por relatório (KB) - Pesquisas com {args.linhas:,} linhas")
+    print(tabela.to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+    total = tabela[['CSV limpo', 'Expandido', 'Compacto']].sum()
+    print(f"  total: CSV limpo {total['CSV limpo']:,.0f} KB  expandido {total['Expandido']:,.0f} KB  "
+          f"compacto {total['Compacto']:,.0f} KB  redução: {total['CSV limpo'] / total['Compacto']:.1f}x")
+    return {'linhas': args.linhas, 'memoria_kb': tabela.set_index('Relatório').to_dict('index')}
+
+
+# Gera uma Série_temporal sintética com n_semanas a partir de 2000-01-03
+def gerar_serie_temporal(n_semanas, seed=42):
+    rng = np.random.default_rng(seed)
+    meses = {numero: nome for nome, numero in MESES_PT.items()}
+    semanas = pd.date_range('2000-01-03', periods=n_semanas, freq='W-MON')
+    cliques = (rng.pareto(1.5, n_semanas) * 50).astype(np.int64)
+    return pd.DataFrame({
+        'Semana': [f"Semana de {d.day} de {meses[d.month]}. de {d.year}" for d in semanas],
+        'Cliques': [f"{int(v):,}".replace(',', '.') for v in cliques],
+        'Impressões': [f"{int(v) * 30:,}".replace(',', '.') for v in cliques],
+        'CPC méd.': [_formatar_moeda(90) for _ in cliques],
+        'Custo': [_formatar_moeda(v * 90) for v in cliques],
+    })
+
+
+# Nova exportação semanal da Série temporal: recarga completa vs só a diferença
+def benchmark_incremental(args):
+    n_semanas = args.linhas
+    serie = gerar_serie_temporal(n_semanas + 1)
+    with tempfile.TemporaryDirectory() as pasta:
+        anterior = os.path.join(pasta, 'Série_temporal(2000.01.03-2025.01.01).csv')
+        nova = os.path.join(pasta, 'Série_temporal(2000.01.03-2025.01.08).csv')
+        serie.iloc[:-1].to_csv(anterior, index=False)
+        serie.to_csv(nova, index=False)
+        exportacoes = discovery.discover(pasta)['serie_temporal']
+
+        print(f"Atualização incremental - {n_semanas:,} semanas + 1 nova")
+        t_completa = cronometrar(lambda: discovery.consolidate(
+            'serie_temporal', [schema.load_report('serie_temporal', e.path) for e in exportacoes]), repeticoes=1)
+
+        def atualizar():
+            incremental._estados.clear()
+            shutil.rmtree(os.path.join(pasta, disk_cache.CACHE_DIR), ignore_errors=True)
+            incremental.refresh('serie_temporal', exportacoes[:1])
+            inicio = time.perf_counter()
+            agregados = incremental.refresh('serie_temporal', exportacoes)['agregados']
+            return time.perf_counter() - inicio, agregados
+
+        t_incremental, agregados = min(atualizar() for _ in range(3))
+        esperado = incremental.week_aggregates(schema.load_report('serie_temporal', nova)['Cliques_num'])
+        assert agregados == esperado, (agregados, esperado)
+        print(f"  recarga completa: {t_completa:8.3f}s")
+        print(f"  incremental:      {t_incremental:8.3f}s  ganho: {t_completa / t_incremental:6.1f}x")
+    return {'semanas': n_semanas, 'recarga_completa': t_completa, 'incremental': t_incremental}
+
+
+# Mapa de calor de vários clientes: repivotar os DataFrames vs somar as matrizes 7x24
+def benchmark_mapa_calor(args):
+    rng = np.random.default_rng(42)
+    dias, horas = np.meshgrid(np.arange(len(heatmap.DIAS)), heatmap.HORAS, indexing='ij')
+    frames = [
+        pd.DataFrame({
+            'Dia': np.array(heatmap.DIAS)[dias.ravel()],
+            'Hora de início': horas.ravel(),
+            'Impressões_num': rng.integers(0, 10_000, dias.size).astype('float64'),
+        })
+        for _ in range(args.clientes)
+    ]
+    matrizes = [heatmap.build_matrix(df) for df in frames]
+
+    def repivotar():
+        return (pd.concat(frames).pivot_table(index='Dia', columns='Hora de início', values='Impressões_num',
+                                              aggfunc='sum').reindex(heatmap.DIAS).to_numpy())
+
+    assert np.allclose(repivotar(), heatmap.combine(matrizes))
+    t_pivot = cronometrar(repivotar)
+    t_matrizes = cronometrar(lambda: heatmap.combine(matrizes))
+    print(f"Mapa de calor - {args.clientes} clientes")
+    print(f"  concat + pivot_table: {t_pivot * 1000:8.2f}ms")
+    print(f"  soma das matrizes:    {t_matrizes * 1000:8.2f}ms  ganho: {t_pivot / t_matrizes:6.1f}x")
+    return {'clientes': args.clientes, 'pivot_table': t_pivot, 'soma_matrizes': t_matrizes}
+
+
+# Consultas com vocabulário de cauda longa (Zipf), como nos termos de pesquisa reais
+def gerar_consultas(n_linhas, vocabulario=20_000, seed=42):
+    rng = np.random.default_rng(seed)
+    # Palavras inventadas de 2 a 4 sílabas, para os trigramas variarem como em texto real
+    silabas = np.array([c + v for c in 'bcdfglmnprstv' for v in 'aeiou'], dtype=object)
+    palavras = pd.unique(np.array([''.join(rng.choice(silabas, rng.integers(2, 5)))
+                                   for _ in range(vocabulario)], dtype=object))
+    vocabulario = len(palavras)
+    tamanhos = rng.integers(1, 6, n_linhas)
+    sorteadas = palavras[np.minimum(rng.zipf(1.3, tamanhos.sum()), vocabulario) - 1]
+    consultas = [' '.join(p) for p in np.split(sorteadas, np.cumsum(tamanhos)[:-1])]
+    return pd.DataFrame({
+        'Pesquisar': consultas,
+        'Custo_num': rng.pareto(1.5, n_linhas) * 1.5,
+        'Cliques_num': (rng.pareto(1.2, n_linhas) * 3).astype(np.int64).astype('float64'),
+    })
+
+
+# Busca de termos: varrer a coluna com str.contains a cada consulta vs o índice invertido
+def benchmark_indice_pesquisas(args):
+    n_linhas = min(args.linhas, 1_000_000)
+    df = gerar_consultas(n_linhas)
+    inicio = time.perf_counter()
+    indice = query_index.build_index(df)
+    t_indice = time.perf_counter() - inicio
+    palavras = df['Pesquisar'].str.split().explode().value_counts().index
+    buscas = [palavras[0], palavras[50], palavras[3000], f"{palavras[0]} {palavras[1]}"]
+
+    def varrer():
+        for texto in buscas:
+            df[df['Pesquisar'].str.contains(rf"\b{texto}\b", regex=True)]['Custo_num'].sum()
+
+    def consultar():
+        for texto in buscas:
+            query_index.queries_containing(indice, df, texto)['Custo_num'].sum()
+
+    t_varrer = cronometrar(varrer, repeticoes=1)
+    t_consultar = cronometrar(consultar)
+    print(f"Índice de pesquisas - {n_linhas:,} consultas, {len(indice['termos']):,} termos, {len(buscas)} buscas")
+    print(f"  montagem do índice:  {t_indice:8.3f}s")
+    print(f"  str.contains:        {t_varrer:8.3f}s")
+    print(f"  índice:              {t_consultar:8.3f}s  ganho: {t_varrer / t_consultar:6.1f}x")
+    return {'linhas': n_linhas, 'montagem_indice': t_indice, 'str_contains': t_varrer, 'indice': t_consultar}
+
+
+# Busca na lista de palavras-chave: str.contains a cada tecla vs índice de trigramas
+def benchmark_busca(args):
+    n_linhas = min(args.linhas, 1_000_000)
+    df = gerar_consultas(n_linhas, seed=7)
+    inicio = time.perf_counter()
+    indice = text_search.build_trigram_index(df, 'Pesquisar')
+    t_indice = time.perf_counter() - inicio
+    palavras = df['Pesquisar'].str.split().explode().value_counts().index
+    # Palavra inteira, começo de palavra, erro de digitação (letra trocada) e trecho no meio
+    erro = palavras[500][:2] + 'x' + palavras[500][3:]
+    buscas = [palavras[10], palavras[100][:4], erro, palavras[1000][1:] + ' ' + palavras[3][:2]]
+    normalizados = df['Pesquisar'].str.lower()
+
+    t_varrer = cronometrar(lambda: [df[normalizados.str.contains(texto, regex=False)] for texto in buscas])
+    print(f"Busca - {n_linhas:,} linhas, {len(buscas)} buscas")
+    print(f"  montagem do índice:  {t_indice:8.3f}s")
+    print(f"  str.contains:        {t_varrer * 1000:8.1f}ms (só trecho exato)")
+    resultado = {'linhas': n_linhas, 'montagem_indice': t_indice, 'str_contains': t_varrer, 'buscas': {}}
+    for texto in buscas:
+        t_busca = cronometrar(lambda: text_search.search(indice, df, texto))
+        encontradas = text_search.search(indice, df, texto, limite=None)
+        print(f"  índice '{texto}': {t_busca * 1000:8.1f}ms  {len(encontradas):,} linhas")
+        resultado['buscas'][texto] = {'segundos': t_busca, 'linhas': len(encontradas)}
+    return resultado
+
+
+# Mineração de negativas sobre o índice já montado e exportação do CSV
+def benchmark_negativas(args):
+    rng = np.random.default_rng(3)
+    df = gerar_consultas(args.linhas)
+    df['Impressões_num'] = df['Cliques_num'] * rng.integers(5, 40, len(df))
+    df['Conversões_num'] = rng.binomial(1, 0.02, len(df)).astype('float64')
+    inicio = time.perf_counter()
+    indice = query_index.build_index(df)
+    t_indice = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    resultado = negatives.mine_negatives(df, indice)
+    t_negativas = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    csv = negatives.export_csv(resultado)
+    t_csv = time.perf_counter() - inicio
+    print(f"Negativas - {args.linhas:,} pesquisas")
+    print(f"  índice de pesquisas: {t_indice:8.3f}s")
+    print(f"  candidatas:          {t_negativas:8.3f}s  {len(resultado['termos']):,} termos, "
+          f"{len(resultado['palavras']):,} palavras")
+    print(f"  CSV:                 {t_csv:8.3f}s  {len(csv) / 1024 / 1024:.1f} MB")
+    return {'linhas': args.linhas, 'indice_pesquisas': t_indice, 'candidatas': t_negativas, 'csv': t_csv,
+            'termos': len(resultado['termos'])}
+
+
+# Palavras-chave distintas tiradas de trechos das consultas (1 a 4 palavras, a
+# maioria com 2 ou 3), com tipos de correspondência sorteados
+def gerar_palavras_chave(consultas, n_palavras, seed=42):
+    rng = np.random.default_rng(seed)
+    palavras = consultas['Pesquisar'].sample(n_palavras * 2, replace=True, random_state=seed).str.split()
+    tamanhos = rng.choice([1, 2, 3, 4], len(palavras), p=[0.05, 0.45, 0.35, 0.15])
+    textos = pd.unique(np.array([' '.join(p[:t]) for p, t in zip(palavras, tamanhos)], dtype=object))[:n_palavras]
+    return pd.DataFrame({
+        'Palavra-chave da rede de pesquisa': textos,
+        'Tipo de corresp.': rng.choice(['Corresp. exata', 'Corresp. de frase', 'Corresp. ampla'], len(textos),
+                                       p=[0.2, 0.6, 0.2]),
+        'Status do critério': 'Ativado',
+        'Cliques_num': rng.integers(0, 200, len(textos)).astype('float64'),
+    })
+
+
+# Correspondência palavras-chave x pesquisas: laço ingênuo (em uma amostra das
+# palavras-chave, extrapolado) vs interseção das listas do índice
+def benchmark_correspondencia(args):
+    n_linhas = min(args.linhas, 2_000_000)
+    df = gerar_consultas(n_linhas)
+    palavras_chave = gerar_palavras_chave(df, args.palavras_chave)
+    indice = query_index.build_index(df)
+    inicio = time.perf_counter()
+    resultado = keyword_match.match_keywords(palavras_chave, df, indice)
+    t_indice = time.perf_counter() - inicio
+
+    amostra = palavras_chave.head(20)
+    textos = query_index.normalize_phrase(df['Pesquisar'].to_numpy()).to_numpy(dtype=object)
+
+    def ingenuo():
+        for texto, tipo in zip(query_index.normalize_phrase(amostra['Palavra-chave da rede de pesquisa'].to_numpy()),
+                               keyword_match.match_type(amostra['Tipo de corresp.'])):
+            palavras = set(texto.split())
+            if tipo == 'Exata':
+                [t == texto for t in textos]
+            elif tipo == 'Frase':
+                [f" {texto} " in f" {t} " for t in textos]
+            else:
+                [palavras <= set(t.split()) for t in textos]
+
+    t_ingenuo = cronometrar(ingenuo, repeticoes=1) * len(palavras_chave) / len(amostra)
+    print(f"Correspondência - {len(palavras_chave):,} palavras-chave x {n_linhas:,} pesquisas")
+    print(f"  laço ingênuo (estimado): {t_ingenuo:10.1f}s")
+    print(f"  índice:                  {t_indice:10.3f}s  ganho: {t_ingenuo / t_indice:6.0f}x")
+    print(f"  {len(resultado['pares']):,} correspondências, cobertura {resultado['cobertura_pesquisas']:.1f}% "
+          f"das pesquisas, {resultado['pesquisas_sobrepostas']:,} com mais de uma palavra-chave")
+    return {'linhas': n_linhas, 'palavras_chave': len(palavras_chave), 'laco_estimado': t_ingenuo,
+            'indice': t_indice, 'correspondencias': len(resultado['pares'])}
+
+
+
+# Grade de cenários do simulador (taxa x ticket x orçamento) por broadcasting,
+# contra um laço sobre cada combinação
+def benchmark_cenarios(args):
+    taxas = np.linspace(0.5, 10.0, 100)
+    tickets = np.linspace(100.0, 2000.0, 100)
+    variacoes = np.linspace(-50.0, 200.0, 100)
+    cliques, custo = 2260.0, 1988.83
+
+    def laco():
+        return [cliques * (1 + v / 100) * t / 100 * k for t in taxas for k in tickets for v in variacoes]
+
+    projecao = scenarios.project(cliques, custo, taxas, tickets, variacoes)
+    assert np.allclose(np.array(laco()).reshape(projecao['faturamento'].shape), projecao['faturamento'])
+    t_laco = cronometrar(laco, repeticoes=1)
+    t_grade = cronometrar(lambda: scenarios.project(cliques, custo, taxas, tickets, variacoes))
+    t_mapa = cronometrar(lambda: scenarios.grid(cliques, custo))
+    print(f"Cenários - {projecao['faturamento'].size:,} combinações")
+    print(f"  laço:          {t_laco * 1000:8.1f}ms")
+    print(f"  broadcasting:  {t_grade * 1000:8.1f}ms  ganho: {t_laco / t_grade:6.1f}x")
+    print(f"  mapa de calor: {t_mapa * 1000:8.2f}ms  ({scenarios.PONTOS_GRADE}x{scenarios.PONTOS_GRADE})")
+    return {'combinacoes': projecao['faturamento'].size, 'laco': t_laco, 'broadcasting': t_grade,
+            'mapa_calor': t_mapa}
+
+
+# Monte Carlo vetorizado (1M de sorteios) contra um laço sorteio a sorteio
+# com o módulo random, estimado a partir de uma amostra
+def benchmark_monte_carlo(args):
+    import random
+
+    # CPC semanal da conta de exemplo
+    ajuste = montecarlo.fit_history(discovery.load_dataset('.')['serie_temporal'])
+    simulacao = montecarlo.simulate(ajuste)
+    t_vetorizado = cronometrar(lambda: montecarlo.simulate(ajuste))
+
+    alfa, beta = montecarlo._beta_parameters(ajuste, scenarios.FAIXA_TAXAS)
+    amostra = 20_000
+
+    def laco():
+        gerador = random.Random(42)
+        faturamentos = []
+        for _ in range(amostra):
+            cpc = gerador.lognormvariate(ajuste['cpc_log_media'], ajuste['cpc_log_desvio'])
+            taxa = gerador.betavariate(alfa, beta)
+            ticket = gerador.lognormvariate(np.log(scenarios.TICKET_MEDIO), 0.3)
+            faturamentos.append(simulacao['orcamento'] / cpc * taxa * ticket)
+        return sorted(faturamentos)
+
+    t_laco = cronometrar(laco, repeticoes=1) * montecarlo.SORTEIOS / amostra
+    print(f"Monte Carlo - {montecarlo.SORTEIOS:,} sorteios")
+    print(f"  laço (estimado): {t_laco:8.3f}s")
+    print(f"  vetorizado:      {t_vetorizado:8.3f}s  ganho: {t_laco / t_vetorizado:6.1f}x")
+    print(f"  ROAS P5/P50/P95: " + " / ".join(f"{simulacao['percentis'].loc['ROAS (%)', p]:,.0f}%"
+                                              for p in ('P5', 'P50', 'P95')))
+    return {'sorteios': montecarlo.SORTEIOS, 'laco_estimado': t_laco, 'vetorizado': t_vetorizado}
+
+
+# Distribuição do orçamento: uma conta, contas uma a uma, todas vetorizadas e
+# em lotes no pool de processos. Contas sintéticas com até 8 segmentos.
+def benchmark_alocacao(args, n_contas=1000, n_segmentos=8):
+    rng = np.random.default_rng(5)
+    custos = rng.pareto(1.2, (n_contas, n_segmentos)) * 100
+    custos[rng.random(custos.shape) < 0.2] = 0.0
+    cliques = custos / rng.uniform(0.3, 3.0, custos.shape)
+    elasticidades = rng.uniform(0.3, 0.9, n_contas)
+
+    conta = discovery.load_dataset('.')
+    t_conta = cronometrar(lambda: allocation.optimize(conta))
+    vetorizado = allocation.allocate_batch(custos, cliques, elasticidades)
+    t_laco = cronometrar(lambda: [allocation.allocate_batch(custos[i:i + 1], cliques[i:i + 1], elasticidades[i])
+                                  for i in range(n_contas)], repeticoes=1)
+    t_vetorizado = cronometrar(lambda: allocation.allocate_batch(custos, cliques, elasticidades))
+    t_pool = cronometrar(lambda: allocation.allocate_accounts(custos, cliques, elasticidades,
+                                                              processos=args.processos), repeticoes=1)
+    assert np.allclose(vetorizado.sum(1), custos.sum(1))
+    print(f"Alocação de orçamento - {n_contas:,} contas x {n_segmentos} segmentos")
+    print(f"  conta de exemplo (dispositivos, redes, horas): {t_conta * 1000:8.2f}ms")
+    print(f"  conta a conta:  {t_laco * 1000:8.1f}ms")
+    print(f"  vetorizado:     {t_vetorizado * 1000:8.1f}ms  ganho: {t_laco / t_vetorizado:6.1f}x")
+    print(f"  pool ({args.processos or os.cpu_count()} proc.): {t_pool * 1000:8.1f}ms")
+    return {'contas': n_contas, 'segmentos': n_segmentos, 'conta_exemplo': t_conta, 'conta_a_conta': t_laco,
+            'vetorizado': t_vetorizado, 'pool': t_pool}
+
+
+# Executado em um processo novo com ADS_CLIENTES_DIR apontando para o cliente
+# sintético: primeira execução do dashboard (carga fria + aba inicial) e a
+# troca para cada uma das outras abas
+def _medir_pagina():
+    from streamlit.testing.v1 import AppTest
+
+    # Os avisos do Streamlit (um por gráfico) encobririam os resultados; erros
+    # do dashboard continuam chegando pelas asserções abaixo
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stderr.fileno())
+
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ads4.py'),
+                            default_timeout=3600)
+    inicio = time.perf_counter()
+    app.run()
+    tempos = {'primeira_execucao': time.perf_counter() - inicio}
+    assert not app.exception, [e.value for e in app.exception]
+    for aba in [t.label for t in app.tabs][1:]:
+        app.session_state['aba_atual'] = aba
+        inicio = time.perf_counter()
+        app.run()
+        assert not app.exception, (aba, [e.value for e in app.exception])
+        tempos[aba] = time.perf_counter() - inicio
+    return tempos, pico_memoria_mb()
+
+
+def _etapa(resultado, nome, func):
+    inicio = time.perf_counter()
+    retorno = func()
+    resultado[nome] = time.perf_counter() - inicio
+    return retorno
+
+
+# Pipeline completo sobre exportações sintéticas (synthetic.py) em várias
+# escalas da conta de exemplo: parse dos CSVs, carga consolidada (fria e com
+# cache em disco), agregações das abas, construção e serialização dos gráficos
+# e a página do Streamlit renderizada aba por aba
+def benchmark_pipeline(args):
+    resultados = []
+    contexto = multiprocessing.get_context('spawn')
+    for escala in args.escalas:
+        with tempfile.TemporaryDirectory() as pasta:
+            base_dir = os.path.join(pasta, 'clientes', f"escala-{escala}")
+            resultado = {'escala': escala}
+            linhas = _etapa(resultado, 'geracao', lambda: synthetic.generate_client(base_dir, escala))
+            resultado['linhas'] = linhas
+            print(f"Pipeline - escala {escala:,}x ({sum(linhas.values()):,} linhas)")
+
+            exportacoes = discovery.discover(base_dir)
+            resultado['parse'] = {
+                nome: cronometrar(lambda: [schema.load_report(nome, e.path) for e in exps], repeticoes=1)
+                for nome, exps in exportacoes.items()
+            }
+            # Carga consolidada de todos os relatórios (LazyReports carrega ao acessar)
+            carregar = lambda: {nome: discovery.load_dataset(base_dir)[nome] for nome in exportacoes}
+            _etapa(resultado, 'carga_fria', carregar)
+            _etapa(resultado, 'carga_cache_disco', carregar)
+            data = discovery.load_dataset(base_dir)
+
+            agregacao = {}
+            kpi = _etapa(agregacao, 'kpis', lambda: kpis.compute_kpis(data, discovery.week_aggregates(base_dir)))
+            _etapa(agregacao, 'mapa_calor', lambda: heatmap.build_matrix(data['dia_hora_detalhado']))
+            indice = _etapa(agregacao, 'indice_pesquisas', lambda: query_index.build_index(data['pesquisas']))
+            _etapa(agregacao, 'indice_busca', lambda: text_search.build_trigram_index(
+                data['palavras_chave'], keyword_match.COLUNA_PALAVRA))
+            _etapa(agregacao, 'negativas', lambda: negatives.mine_negatives(
+                data['pesquisas'], indice, data['palavras_chave']))
+            _etapa(agregacao, 'correspondencia', lambda: keyword_match.match_keywords(
+                data['palavras_chave'], data['pesquisas'], indice))
+            resultado['agregacao'] = agregacao
+
+            parametros = dict(batch_report._PARAMETROS,
+                              radar_benchmarks={'custo_por_conversao': kpi['total_custo']})
+            graficos, serializacao = {}, {}
+            for _, nomes in batch_report.SECOES:
+                for nome in nomes:
+                    fig = _etapa(graficos, nome, lambda: figures.build(nome, data, kpi, **parametros.get(nome, {})))
+                    if fig is not None:
+                        _etapa(serializacao, nome, fig.to_json)
+            resultado['graficos'] = graficos
+            resultado['serializacao_graficos'] = serializacao
+
+            if args.pagina:
+                anterior = os.environ.get('ADS_CLIENTES_DIR')
+                os.environ['ADS_CLIENTES_DIR'] = os.path.dirname(base_dir)
+                try:
+                    with contexto.Pool(1) as pool:
+                        resultado['pagina'], resultado['pico_memoria_pagina_mb'] = pool.apply(_medir_pagina)
+                finally:
+                    if anterior is None:
+                        del os.environ['ADS_CLIENTES_DIR']
+                    else:
+                        os.environ['ADS_CLIENTES_DIR'] = anterior
+
+            print(f"  geração:             {resultado['geracao']:8.3f}s")
+            print(f"  parse dos CSVs:      {sum(resultado['parse'].values()):8.3f}s")
+            print(f"  carga fria:          {resultado['carga_fria']:8.3f}s")
+            print(f"  carga (cache disco): {resultado['carga_cache_disco']:8.3f}s")
+            for nome, segundos in agregacao.items():
+                print(f"  {nome + ':':<20} {segundos:8.3f}s")
+            print(f"  gráficos:            {sum(graficos.values()):8.3f}s  "
+                  f"(+ {sum(serializacao.values()):.3f}s serialização)")
+            for aba, segundos in resultado.get('pagina', {}).items():
+                print(f"  página ({aba}): {segundos:8.3f}s")
+            resultados.append(resultado)
+    return resultados
+
+
+BENCHMARKS = {
+    'parsing': benchmark_parsing,
+    'cache': benchmark_cache,
+    'relatorios': benchmark_relatorios,
+    'streaming': benchmark_streaming,
+    'memoria': benchmark_memoria,
+    'incremental': benchmark_incremental,
+    'mapa_calor': benchmark_mapa_calor,
+    'indice_pesquisas': benchmark_indice_pesquisas,
+    'busca': benchmark_busca,
+    'negativas': benchmark_negativas,
+    'correspondencia': benchmark_correspondencia,
+    'cenarios': benchmark_cenarios,
+    'monte_carlo': benchmark_monte_carlo,
+    'alocacao': benchmark_alocacao,
+    'pipeline': benchmark_pipeline,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks do dashboard de campanhas')
+    parser.add_argument('benchmarks', nargs='*', help=f"padrão: todos ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--linhas', type=int, default=2_000_000)
+    parser.add_argument('--clientes', type=int, default=32)
+    parser.add_argument('--palavras-chave', type=int, default=50_000)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 100, 10_000],
+                        help='escalas da conta de exemplo no benchmark pipeline')
+    parser.add_argument('--sem-pagina', dest='pagina', action='store_false',
+                        help='não renderiza o dashboard no benchmark pipeline')
+    parser.add_argument('--json', help='grava os resultados em JSON neste arquivo')
+    args = parser.parse_args()
+    desconhecidos = set(args.benchmarks) - set(BENCHMARKS)
+    if desconhecidos:
+        parser.error(f"benchmark desconhecido: {', '.join(sorted(desconhecidos))}")
+    resultados = {}
+    for nome in args.benchmarks or BENCHMARKS:
+        resultado = BENCHMARKS[nome](args)
+        if resultado is not None:
+            resultados[nome] = resultado
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(ambiente() | {'argumentos': vars(args), 'resultados': resultados}, f,
+                      ensure_ascii=False, indent=2)
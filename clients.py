@@ -0,0 +1,32 @@
+import os
+
+# Armazenamento particionado por cliente: cada conta do Google Ads tem o seu
+# diretório com as exportações (e o seu .cache em disco), ex.
+#   clientes/
+#       balao-aquidauana/Campanhas(2025.04.10-2025.10.17).csv
+#       pousada-bonito/Campanhas(2025.04.10-2025.10.17).csv
+# Sem o diretório de clientes o dashboard usa as exportações da raiz do projeto.
+
+CLIENTES_DIR = os.environ.get('ADS_CLIENTES_DIR', 'clientes')
+
+# Nome exibido quando não há diretório de clientes
+CLIENTE_PADRAO = 'Voo de Balão em Aquidauana'
+
+# Quantos clientes ficam em memória ao mesmo tempo no servidor
+MAX_CLIENTES_EM_CACHE = int(os.environ.get('ADS_MAX_CLIENTES_EM_CACHE', '8'))
+
+
+def list_clients(base_dir=CLIENTES_DIR):
+    if not os.path.isdir(base_dir):
+        return []
+    with os.scandir(base_dir) as entradas:
+        return sorted(
+            entrada.name for entrada in entradas
+            if entrada.is_dir() and not entrada.name.startswith('.')
+        )
+
+
+def client_dir(cliente, base_dir=CLIENTES_DIR):
+    if cliente not in list_clients(base_dir):
+        raise KeyError(f"Cliente desconhecido: {cliente}")
+    return os.path.join(base_dir, cliente)
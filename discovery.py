@@ -0,0 +1,231 @@
+import os
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import disk_cache
+import incremental
+import streaming
+from metrics import add_derived_metrics
+from schema import (
+    REPORTS, SOMA, ULTIMO, RAZAO, PARTICIPACAO, CTR_IMPLICITO, LazyReports,
+    compact, consolidated_columns, expand, load_report,
+)
+
+# Descoberta das exportações do Google Ads em um diretório. O tipo de relatório
+# e o período saem do nome do arquivo, ex. "Dia_e_hora(Hora_2025.04.10-2025.10.17).csv",
+# e exportações de vários períodos são consolidadas em um único DataFrame.
+
+Exportacao = namedtuple('Exportacao', ['relatorio', 'inicio', 'fim', 'path'])
+
+_PADRAO_ARQUIVO = re.compile(
+    r'^(?P<prefixo>[^()]+)\('
+    r'(?:(?P<variante>[^()]+?)_)?'
+    r'(?P<inicio>\d{4}\.\d{2}\.\d{2})-(?P<fim>\d{4}\.\d{2}\.\d{2})'
+    r'\)\.csv$'
+)
+
+_RELATORIO_POR_EXPORTACAO = {spec['exportacao']: nome for nome, spec in REPORTS.items()}
+
+
+def _data(texto):
+    ano, mes, dia = texto.split('.')
+    return date(int(ano), int(mes), int(dia))
+
+
+# Retorna (relatorio, inicio, fim) ou None se o arquivo não for uma exportação conhecida
+def parse_filename(nome_arquivo):
+    # Sistemas de arquivos do macOS devolvem nomes acentuados decompostos (NFD)
+    nome_arquivo = unicodedata.normalize('NFC', nome_arquivo)
+    m = _PADRAO_ARQUIVO.match(nome_arquivo)
+    if not m:
+        return None
+    relatorio = _RELATORIO_POR_EXPORTACAO.get((m['prefixo'], m['variante']))
+    if relatorio is None:
+        return None
+    return relatorio, _data(m['inicio']), _data(m['fim'])
+
+
+# Lista as exportações de um diretório: {relatorio: [Exportacao, ...]} em ordem cronológica.
+# Só lê os nomes dos arquivos, o conteúdo é carregado depois e sob demanda.
+def discover(base_dir='.'):
+    encontrados = {}
+    with os.scandir(base_dir) as entradas:
+        for entrada in entradas:
+            if not entrada.is_file():
+                continue
+            info = parse_filename(entrada.name)
+            if info:
+                encontrados.setdefault(info[0], []).append(Exportacao(*info, entrada.path))
+    return {
+        relatorio: sorted(lista, key=lambda e: (e.inicio, e.fim))
+        for relatorio, lista in encontrados.items()
+    }
+
+
+# Versão de um conjunto de exportações, usada como chave de cache
+def dataset_version(exportacoes):
+    return tuple(disk_cache.file_hash(e.path) for e in exportacoes)
+
+
+# Escolhe as exportações que entram na consolidação. Relatórios somados não podem
+# ter períodos sobrepostos (os valores seriam contados duas vezes): a partir da
+# exportação mais recente, ignora as que se sobrepõem a um período já escolhido.
+# As exportações somadas trazem totais do período, não linhas por dia, então a
+# parte sobreposta não pode ser recortada: ver ignored_exports.
+def select_exports(exportacoes, agregacao):
+    if agregacao == ULTIMO:
+        return list(exportacoes)
+
+    escolhidas = []
+    recentes = sorted(exportacoes, key=lambda e: (e.fim, e.fim - e.inicio), reverse=True)
+    for exp in recentes:
+        if all(exp.fim < e.inicio or exp.inicio > e.fim for e in escolhidas):
+            escolhidas.append(exp)
+    return sorted(escolhidas, key=lambda e: (e.inicio, e.fim))
+
+
+# Dias de uma exportação que nenhuma das escolhidas cobre, como intervalos [(inicio, fim), ...]
+def _uncovered_days(exp, escolhidas):
+    intervalos = []
+    dia = exp.inicio
+    while dia <= exp.fim:
+        if not any(e.inicio <= dia <= e.fim for e in escolhidas):
+            if intervalos and intervalos[-1][1] == dia - timedelta(days=1):
+                intervalos[-1] = (intervalos[-1][0], dia)
+            else:
+                intervalos.append((dia, dia))
+        dia += timedelta(days=1)
+    return intervalos
+
+
+# Exportações de relatórios somados deixadas de fora por sobreposição e que tinham
+# dias fora dos períodos escolhidos: [(relatorio, Exportacao, dias_sem_dados), ...].
+# Esses dias ficam sem dados no painel, que avisa o usuário para reexportar sem sobreposição.
+def ignored_exports(base_dir='.'):
+    ignoradas = []
+    for nome, exportacoes in discover(base_dir).items():
+        if REPORTS[nome]['agregacao'] != SOMA:
+            continue
+        escolhidas = select_exports(exportacoes, SOMA)
+        for exp in exportacoes:
+            if exp in escolhidas:
+                continue
+            dias = _uncovered_days(exp, escolhidas)
+            if dias:
+                ignoradas.append((nome, exp, dias))
+    return ignoradas
+
+
+# Junta os DataFrames de vários períodos (do mais antigo ao mais recente).
+# As colunas de texto das métricas ("R$ 1.988,83") são descartadas: depois da
+# soma elas não correspondem mais aos valores, só as colunas *_num são mantidas.
+def consolidate(nome, frames):
+    spec = REPORTS[nome]
+    chave, textos, derivadas = consolidated_columns(nome)
+    df = pd.concat([f[chave + textos + derivadas] for f in frames], ignore_index=True)
+    if len(frames) == 1:
+        return df
+
+    if spec['agregacao'] == ULTIMO:
+        return df.drop_duplicates(chave, keep='last').reset_index(drop=True)
+
+    recalculo = spec.get('recalculo', {})
+    agregacoes = {col: 'sum' for col in derivadas if col not in recalculo}
+    agregacoes.update({col: 'last' for col in textos})
+    for col, regra in recalculo.items():
+        if regra[0] == CTR_IMPLICITO:
+            # Sem coluna de impressões: reconstrói as impressões de cada período
+            cliques = df[regra[1]]
+            df[f'_impressoes_{col}'] = np.where(df[col] > 0, cliques * 100 / df[col].where(df[col] > 0, 1), 0.0)
+            agregacoes[f'_impressoes_{col}'] = 'sum'
+
+    out = df.groupby(chave, sort=False, dropna=False, as_index=False).agg(agregacoes)
+    for col, regra in recalculo.items():
+        if regra[0] == RAZAO:
+            _, numerador, denominador = regra
+            out[col] = (out[numerador] / out[denominador].replace(0, np.nan)).fillna(0.0)
+        elif regra[0] == PARTICIPACAO:
+            # Aproximação: o "total conhecido" do Google não vem na exportação,
+            # então a participação é recalculada sobre as linhas do relatório
+            total = out[regra[1]].sum()
+            out[col] = out[regra[1]] / total * 100 if total > 0 else 0.0
+        elif regra[0] == CTR_IMPLICITO:
+            impressoes = out.pop(f'_impressoes_{col}')
+            out[col] = (out[regra[1]] / impressoes.replace(0, np.nan) * 100).fillna(0.0)
+    return out[chave + textos + derivadas]
+
+
+# Um CSV já limpo, só com as colunas mantidas na consolidação e na forma compacta.
+# Exportações muito grandes de termos de pesquisa são lidas em blocos e já
+# somadas por termo, sem manter todas as linhas em memória.
+def _load_export(nome, path):
+    if streaming.should_stream(nome, path):
+        df = streaming.load_report_folded(nome, path)
+    else:
+        chave, textos, derivadas = consolidated_columns(nome)
+        df = load_report(nome, path)[chave + textos + derivadas]
+    return compact(nome, df)
+
+
+# Relatórios de um diretório limitados a streaming.MAX_TERMOS termos por
+# exportação (só quando o limite está ligado e o arquivo é lido em blocos)
+def capped_reports(base_dir='.'):
+    if not streaming.MAX_TERMOS:
+        return []
+    return [nome for nome, exps in discover(base_dir).items()
+            if any(streaming.should_stream(nome, e.path) for e in exps)]
+
+
+# Carrega o relatório consolidado de todas as exportações encontradas, na forma
+# compacta (schema.compact) e com as métricas derivadas que as abas usam
+# (REPORTS[nome]['metricas']) já calculadas. Cada CSV e o resultado da
+# consolidação ficam no cache em disco, então uma nova exportação semanal só
+# custa o parse dela mesma mais a junção.
+def load_consolidated(nome, exportacoes):
+    if not exportacoes:
+        raise FileNotFoundError(f"Nenhuma exportação encontrada para o relatório '{nome}'")
+    selecionadas = select_exports(exportacoes, REPORTS[nome]['agregacao'])
+    metricas = REPORTS[nome].get('metricas', ())
+    if REPORTS[nome].get('incremental'):
+        return compact(nome, add_derived_metrics(incremental.load_incremental(nome, selecionadas), metricas))
+    paths = [e.path for e in selecionadas]
+
+    # Os caches guardam a forma compacta; a soma é feita sobre a forma expandida
+    # (contagens em int8 estourariam nas contas da consolidação)
+    def build():
+        frames = [expand(nome, disk_cache.load_cached(nome, path, _load_export)) for path in paths]
+        return compact(nome, add_derived_metrics(consolidate(nome, frames), metricas))
+
+    if len(paths) == 1:
+        return build()
+    return disk_cache.load_combined_cached(nome, paths, build)
+
+
+# Todos os relatórios de um diretório, carregados sob demanda. loader(nome,
+# exportacoes, versao) permite envolver o carregamento em outro cache, que
+# guarda a forma compacta (com as métricas derivadas); `data[nome]` devolve a
+# forma expandida.
+def load_dataset(base_dir='.', loader=None):
+    exportacoes = discover(base_dir)
+    versoes = {nome: dataset_version(exps) for nome, exps in exportacoes.items()}
+    if loader is None:
+        loader = lambda nome, exps, versao: load_consolidated(nome, exps)
+    return LazyReports(
+        lambda nome: expand(nome, loader(nome, exportacoes[nome], versoes[nome])),
+        nomes=exportacoes,
+        versao=tuple(sorted(versoes.items())),
+    )
+
+
+# Agregados semanais mantidos pela atualização incremental da Série temporal
+# (None se o diretório não tiver a exportação)
+def week_aggregates(base_dir='.'):
+    exportacoes = discover(base_dir).get('serie_temporal')
+    if not exportacoes:
+        return None
+    return incremental.refresh('serie_temporal', select_exports(exportacoes, ULTIMO))['agregados']
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+
+from schema import SCHEMA_VERSION
+
+# Cache em disco (Feather/Arrow) dos relatórios já limpos. A chave é o hash
+# do conteúdo do CSV + a versão do schema, então um CSV alterado ou uma mudança
+# nas colunas derivadas invalida o arquivo automaticamente.
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow é opcional: sem ele, o cache em disco fica desligado
+    pa = None
+    feather = None
+
+CACHE_DIR = '.cache'
+
+# (caminho, tamanho, mtime) -> hash, para não reler o CSV a cada rerun
+_hash_memo = {}
+
+
+def file_hash(path):
+    stat = os.stat(path)
+    chave = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if chave not in _hash_memo:
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+        _hash_memo[chave] = h.hexdigest()
+    return _hash_memo[chave]
+
+
+def _cache_dir(path):
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+
+
+# Cada CSV tem a sua entrada: várias exportações do mesmo relatório
+# (períodos diferentes) convivem no cache sem se sobrescrever
+def cache_path(nome, path):
+    origem = hashlib.blake2b(os.path.basename(path).encode('utf-8'), digest_size=4).hexdigest()
+    return os.path.join(_cache_dir(path), f"{nome}-{origem}-{file_hash(path)}-v{SCHEMA_VERSION}.feather")
+
+
+# Entrada da consolidação de vários CSVs: a chave muda se qualquer um deles mudar
+def combined_cache_path(nome, paths):
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(paths):
+        h.update(file_hash(path).encode('ascii'))
+    return os.path.join(_cache_dir(paths[0]), f"{nome}-consolidado-{h.hexdigest()}-v{SCHEMA_VERSION}.feather")
+
+
+# Remove versões antigas da mesma entrada (CSV alterado ou schema novo)
+def _remove_stale(atual):
+    pasta, nome_arquivo = os.path.split(atual)
+    prefixo = nome_arquivo.rsplit('-', 2)[0] + '-'
+    for arquivo in os.listdir(pasta):
+        caminho = os.path.join(pasta, arquivo)
+        if arquivo.startswith(prefixo) and arquivo.endswith('.feather') and caminho != atual:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+
+# Arquivo temporário da gravação: as sessões do Streamlit são threads do mesmo
+# processo, então o pid sozinho não separa duas gravações da mesma entrada
+def temporary_path(destino):
+    return f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _read_or_build(destino, build):
+    if os.path.exists(destino):
+        # Feather sem compressão permite mapear as colunas direto do disco
+        return feather.read_table(destino, memory_map=True).to_pandas()
+
+    df = build()
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = temporary_path(destino)
+    feather.write_feather(df, temporario, compression='uncompressed')
+    os.replace(temporario, destino)
+    _remove_stale(destino)
+    return df
+
+
+# Carrega o relatório do cache em disco ou, se não existir, chama
+# loader(nome, path) e grava o resultado para os próximos processos
+def load_cached(nome, path, loader):
+    if feather is None:
+        return loader(nome, path)
+    return _read_or_build(cache_path(nome, path), lambda: loader(nome, path))
+
+
+# Mesmo que load_cached, para um resultado que depende de vários CSVs
+def load_combined_cached(nome, paths, build):
+    if feather is None:
+        return build()
+    return _read_or_build(combined_cache_path(nome, paths), build)
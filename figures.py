@@ -0,0 +1,438 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import allocation
+import heatmap
+import scenarios
+import timeseries
+
+# Construção dos gráficos do dashboard, sem dependência do Streamlit: o app e o
+# gerador de relatórios usam as mesmas funções. Cada gráfico é uma função de
+# (data, kpi, parâmetros) e devolve um go.Figure, ou None quando não há dados.
+
+# Benchmarks da indústria usados no comparativo
+BENCHMARKS_SETOR = {
+    'Métrica': ['CTR', 'CPC (R$)', 'Taxa de Conversão', 'Custo por Conversão (R$)', 'ROAS'],
+    'Média do Setor': [2.5, 1.20, 3.0, 80, 350],
+    'Top Performers': [5.0, 0.80, 8.0, 40, 600],
+}
+
+
+# Semanas (ou meses/trimestres somados) com cliques, em ordem cronológica
+def _semanas_ativas(data, agrupamento='Semana'):
+    serie = timeseries.resample(data['serie_temporal'], timeseries.AGRUPAMENTOS[agrupamento])
+    return serie[serie['Cliques_num'] > 0]
+
+
+def _palavras_ativas(data):
+    return data['palavras_chave'][data['palavras_chave']['Cliques_num'] > 0]
+
+
+# Visão geral
+
+def cliques_semana(data, kpi, agrupamento='Semana'):
+    semanas_ativas = _semanas_ativas(data, agrupamento)
+    if semanas_ativas.empty:
+        return None
+    fig = px.line(semanas_ativas, x='Semana', y='Cliques_num',
+                 title=f'Evolução de Cliques por {agrupamento}',
+                 markers=True)
+    fig.update_layout(xaxis_title=agrupamento, yaxis_title='Cliques', xaxis_tickangle=45)
+    return fig
+
+
+def custo_semana(data, kpi, agrupamento='Semana'):
+    semanas_ativas = _semanas_ativas(data, agrupamento)
+    if semanas_ativas.empty:
+        return None
+    fig = px.bar(semanas_ativas, x='Semana', y='Custo_num',
+                title=f'Custo por {agrupamento} (R$)',
+                color='Custo_num',
+                color_continuous_scale='reds')
+    fig.update_layout(xaxis_title=agrupamento, yaxis_title='Custo (R$)', xaxis_tickangle=45)
+    return fig
+
+
+def impressoes_hora(data, kpi):
+    fig = px.bar(data['hora'], x='Hora de início', y='Impressões_num',
+                title='Distribuição de Impressões por Hora do Dia',
+                color='Impressões_num',
+                color_continuous_scale='blues')
+    fig.update_layout(xaxis_title='Hora', yaxis_title='Impressões')
+    return fig
+
+
+def impressoes_dia(data, kpi):
+    return px.bar(data['dia_hora'], x='Dia', y='Impressões_num',
+                 title='Impressões por Dia da Semana',
+                 color='Impressões_num',
+                 color_continuous_scale='greens')
+
+
+# Dia da semana x hora: usa a matriz 7x24 já pivotada nos KPIs
+
+_ROTULOS_NORMALIZACAO = {'absoluto': 'Impressões', 'dia': '% do dia', 'semana': '% da semana'}
+
+
+def heatmap_figure(matriz, normalizacao='absoluto', titulo='Impressões por Dia da Semana e Hora'):
+    valores = heatmap.normalize(matriz, normalizacao)
+    fig = go.Figure(go.Heatmap(
+        z=valores, x=heatmap.HORAS, y=heatmap.DIAS,
+        colorscale='blues',
+        colorbar=dict(title=_ROTULOS_NORMALIZACAO[normalizacao]),
+        hovertemplate='%{y} %{x}h: %{z:,.2f}<extra></extra>',
+    ))
+    fig.update_layout(title=titulo, xaxis_title='Hora', yaxis_title='Dia',
+                      xaxis=dict(dtick=1), yaxis=dict(autorange='reversed'))
+    return fig
+
+
+def heatmap_dia_hora(data, kpi, normalizacao='absoluto'):
+    if kpi.get('matriz_dia_hora') is None:
+        return None
+    return heatmap_figure(kpi['matriz_dia_hora'], normalizacao)
+
+
+def day_profile_figure(matriz, dia, normalizacao='absoluto'):
+    perfil = heatmap.day_profile(heatmap.normalize(matriz, normalizacao), dia)
+    fig = px.bar(x=heatmap.HORAS, y=perfil,
+                title=f'{dia}: Impressões por Hora',
+                labels={'x': 'Hora', 'y': _ROTULOS_NORMALIZACAO[normalizacao]})
+    fig.update_layout(xaxis=dict(dtick=1))
+    return fig
+
+
+def horas_do_dia(data, kpi, dia='Segunda-feira', normalizacao='absoluto'):
+    if kpi.get('matriz_dia_hora') is None:
+        return None
+    return day_profile_figure(kpi['matriz_dia_hora'], dia, normalizacao)
+
+
+# Público-alvo
+
+def distribuicao_idade(data, kpi):
+    return px.pie(data['idade'], values='Impressões_num', names='Faixa de idade',
+                 title='Distribuição por Faixa Etária',
+                 hole=0.4)
+
+
+def distribuicao_sexo(data, kpi):
+    return px.pie(data['sexo'], values='Impressões_num', names='Sexo',
+                 title='Distribuição por Sexo',
+                 hole=0.4)
+
+
+def impressoes_sexo_idade(data, kpi):
+    fig = px.bar(data['sexo_idade'], x='Faixa de idade', y='Impressões_num', color='Sexo',
+                title='Impressões por Sexo e Faixa Etária',
+                barmode='group')
+    fig.update_layout(xaxis_title='Faixa Etária', yaxis_title='Impressões')
+    return fig
+
+
+# Palavras-chave
+
+def top_palavras_ctr(data, kpi, n=10):
+    palavras_ativas = _palavras_ativas(data)
+    if palavras_ativas.empty:
+        return None
+    fig = px.bar(palavras_ativas.nlargest(n, 'CTR_num'),
+                x='Palavra-chave da rede de pesquisa', y='CTR_num',
+                title=f'Top {n} Palavras-chave por CTR (%)',
+                color='CTR_num',
+                color_continuous_scale='viridis')
+    fig.update_layout(yaxis_title='CTR (%)', xaxis_tickangle=45)
+    return fig
+
+
+def top_palavras_cliques(data, kpi, n=10):
+    palavras_ativas = _palavras_ativas(data)
+    if palavras_ativas.empty:
+        return None
+    fig = px.bar(palavras_ativas.nlargest(n, 'Cliques_num'),
+                x='Palavra-chave da rede de pesquisa', y='Cliques_num',
+                title=f'Top {n} Palavras-chave por Cliques',
+                color='Cliques_num',
+                color_continuous_scale='blues')
+    fig.update_layout(yaxis_title='Cliques', xaxis_tickangle=45)
+    return fig
+
+
+def eficiencia_palavras(data, kpi):
+    palavras_ativas = _palavras_ativas(data)
+    if palavras_ativas.empty:
+        return None
+    return px.scatter(palavras_ativas, x='CPC_num', y='CTR_num',
+                     size='Cliques_num', color='Custo_num',
+                     hover_name='Palavra-chave da rede de pesquisa',
+                     title='Relação Custo/Clique vs CTR',
+                     labels={'CPC_num': 'Custo por Clique (R$)', 'CTR_num': 'CTR (%)'})
+
+
+def top_pesquisas(data, kpi, n=10):
+    if 'Cliques_num' not in data['pesquisas'].columns:
+        return None
+    fig = px.bar(data['pesquisas'].nlargest(n, 'Cliques_num'), x='Pesquisar', y='Cliques_num',
+                title=f'Top {n} Pesquisas por Cliques',
+                color='Cliques_num',
+                color_continuous_scale='purples')
+    fig.update_layout(xaxis_tickangle=45)
+    return fig
+
+
+def custo_palavras_pesquisa(data, kpi, n=15):
+    if 'pesquisas_palavra' not in data or data['pesquisas_palavra'].empty:
+        return None
+    fig = px.bar(data['pesquisas_palavra'].nlargest(n, 'Custo_num'), x='Palavra', y='Custo_num',
+                title=f'Top {n} Palavras das Pesquisas por Custo (R$)',
+                color='Cliques_num',
+                color_continuous_scale='reds',
+                hover_data=['Principais consultas com a palavra'])
+    fig.update_layout(yaxis_title='Custo (R$)', xaxis_tickangle=45)
+    return fig
+
+
+# Dispositivos e redes
+
+def impressoes_dispositivo(data, kpi):
+    return px.pie(data['dispositivos'], values='Impressões_num', names='Dispositivo',
+                 title='Distribuição por Dispositivo - Impressões')
+
+
+def custo_dispositivo(data, kpi):
+    return px.bar(data['dispositivos'], x='Dispositivo', y='Custo_num',
+                 title='Custo por Dispositivo (R$)',
+                 color='Custo_num',
+                 color_continuous_scale='greens')
+
+
+def cliques_rede(data, kpi):
+    return px.bar(data['redes'], x='Rede', y='Cliques_num',
+                 title='Cliques por Rede',
+                 color='Cliques_num',
+                 color_continuous_scale='purples')
+
+
+def cpc_rede(data, kpi):
+    return px.bar(data['redes'], x='Rede', y='CPC_num',
+                 title='CPC Médio por Rede (R$)',
+                 color='CPC_num',
+                 color_continuous_scale='oranges')
+
+
+def eficiencia_dispositivo(data, kpi):
+    return px.scatter(data['dispositivos'], x='CPC_num', y='CTR_num',
+                     size='Impressões_num', color='Dispositivo',
+                     title='Eficiência: Custo por Clique vs CTR por Dispositivo',
+                     labels={'CPC_num': 'Custo por Clique (R$)', 'CTR_num': 'CTR (%)'})
+
+
+# Custo atual x sugerido por segmento (resultado de allocation.optimize)
+def allocation_figure(resultado):
+    partes = [
+        pd.DataFrame({
+            'Dimensão': dimensao,
+            'Segmento': resultado[dimensao][dimensao],
+            'Atual': resultado[dimensao]['Custo atual'],
+            'Sugerido': resultado[dimensao]['Custo sugerido'],
+        })
+        for dimensao in allocation.DIMENSOES if dimensao in resultado
+    ]
+    if not partes:
+        return None
+    custos = pd.concat(partes).melt(id_vars=['Dimensão', 'Segmento'], var_name='Custo', value_name='R$')
+    fig = px.bar(custos, x='Segmento', y='R$', color='Custo', barmode='group', facet_col='Dimensão',
+                 title='Distribuição do Orçamento: Atual vs Sugerida (R$)')
+    fig.update_xaxes(matches=None, title_text='')
+    fig.for_each_annotation(lambda anotacao: anotacao.update(text=anotacao.text.split('=')[-1]))
+    return fig
+
+
+def alocacao_orcamento(data, kpi, orcamento=None, variacao_maxima=allocation.VARIACAO_MAXIMA):
+    return allocation_figure(allocation.optimize(data, orcamento, variacao_maxima))
+
+
+# Conversões
+
+def _funil(kpi):
+    return pd.DataFrame({
+        'Estágio': ['Impressões', 'Cliques', 'Visitantes Site', 'Leads', 'Clientes'],
+        'Quantidade': [kpi['total_impressoes'], kpi['total_cliques'], 0, 0, 0],
+        'Taxa Conversão': [100, kpi['ctr_medio'], 0, 0, 0]
+    })
+
+
+def funil_quantidade(data, kpi):
+    return px.funnel(_funil(kpi), x='Quantidade', y='Estágio',
+                    title='Funil de Conversão - Quantidade',
+                    color='Estágio')
+
+
+def funil_taxa(data, kpi):
+    return px.bar(_funil(kpi), x='Taxa Conversão', y='Estágio',
+                 title='Taxa de Conversão por Estágio (%)',
+                 orientation='h',
+                 color='Estágio')
+
+
+# Grade de cenários taxa de conversão x ticket médio sobre os cliques e o
+# custo reais, colorida pelo faturamento, ROAS ou lucro projetado
+def cenarios(data, kpi, metrica='faturamento', faixa_taxas=scenarios.FAIXA_TAXAS,
+             ticket=scenarios.TICKET_MEDIO, variacao=0.0):
+    if kpi['total_cliques'] <= 0:
+        return None
+    grade = scenarios.grid(kpi['total_cliques'], kpi['total_custo'], faixa_taxas, ticket, variacao)
+    rotulo, formato = scenarios.METRICAS[metrica]
+    fig = go.Figure(go.Heatmap(
+        z=grade[metrica], x=grade['tickets'], y=grade['taxas'],
+        colorscale='greens',
+        colorbar=dict(title=rotulo),
+        hovertemplate='Ticket: R$ %{x:,.0f}<br>Conversão: %{y:.2f}%<br>' + formato + '<extra></extra>',
+    ))
+    fig.update_layout(
+        title=f"{rotulo} por Taxa de Conversão e Ticket Médio (orçamento {variacao:+.0f}%)",
+        xaxis_title='Ticket médio (R$)',
+        yaxis_title='Taxa de conversão (%)',
+    )
+    return fig
+
+
+# Distribuição simulada (montecarlo.simulate) com as faixas P5-P95 e P25-P75
+# e a mediana. No ROAS, a linha de 100% marca o retorno do investimento.
+def monte_carlo_figure(simulacao, metrica='roas'):
+    rotulo = {'roas': 'ROAS (%)', 'faturamento': 'Faturamento (R$)'}[metrica]
+    contagem, bordas = simulacao[f'histograma_{metrica}']
+    percentis = simulacao['percentis'].loc[rotulo]
+    fig = go.Figure(go.Bar(
+        x=(bordas[:-1] + bordas[1:]) / 2, y=contagem / simulacao['sorteios'] * 100,
+        width=bordas[1:] - bordas[:-1],
+        marker_color='steelblue',
+        hovertemplate='%{x:,.0f}: %{y:.2f}% dos sorteios<extra></extra>',
+    ))
+    fig.add_vrect(x0=percentis['P5'], x1=percentis['P95'], fillcolor='orange', opacity=0.12, line_width=0,
+                  annotation_text='P5-P95', annotation_position='top left')
+    fig.add_vrect(x0=percentis['P25'], x1=percentis['P75'], fillcolor='orange', opacity=0.25, line_width=0,
+                  annotation_text='P25-P75', annotation_position='bottom left')
+    fig.add_vline(x=percentis['P50'], line_dash='dash', line_color='black', annotation_text='Mediana')
+    if metrica == 'roas':
+        fig.add_vline(x=100, line_color='red', annotation_text='Retorno = investimento')
+    fig.update_layout(
+        title=f"Distribuição Simulada - {rotulo} ({simulacao['sorteios']:,} sorteios)",
+        xaxis_title=rotulo,
+        yaxis_title='% dos sorteios',
+        bargap=0,
+    )
+    return fig
+
+
+# Comparativo
+
+def radar_benchmarks(data, kpi, custo_por_conversao=0.0):
+    df_benchmarks = pd.DataFrame(BENCHMARKS_SETOR)
+    df_benchmarks.insert(1, 'Nossa Campanha', [3.41, kpi['cpc_medio'], 0, custo_por_conversao, 0])
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatterpolar(
+        r=df_benchmarks['Nossa Campanha'].tolist(),
+        theta=df_benchmarks['Métrica'].tolist(),
+        fill='toself',
+        name='Nossa Campanha',
+        line_color='blue'
+    ))
+
+    fig.add_trace(go.Scatterpolar(
+        r=df_benchmarks['Média do Setor'].tolist(),
+        theta=df_benchmarks['Métrica'].tolist(),
+        fill='toself',
+        name='Média do Setor',
+        line_color='orange'
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, max(df_benchmarks[['Nossa Campanha', 'Média do Setor']].max().max(), 600)]
+            )),
+        showlegend=True,
+        title="Comparativo de Performance vs Benchmarks"
+    )
+    return fig
+
+
+def cliques_custo_rede(data, kpi):
+    if data['redes'].empty:
+        return None
+    fig = px.bar(data['redes'], x='Rede', y=['Cliques_num', 'Custo_num'],
+                title='Comparativo: Cliques vs Custo por Rede',
+                barmode='group',
+                labels={'value': 'Quantidade', 'variable': 'Métrica'})
+    fig.update_layout(xaxis_title='Rede', yaxis_title='Quantidade')
+    return fig
+
+
+def cliques_vs_metas(data, kpi, meta_cliques=1.2):
+    semanas_ativas = _semanas_ativas(data)
+    if semanas_ativas.empty:
+        return None
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=semanas_ativas['Semana'],
+        y=semanas_ativas['Cliques_num'],
+        name='Cliques Reais',
+        line=dict(color='blue', width=3)
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=semanas_ativas['Semana'],
+        y=semanas_ativas['Cliques_num'] * meta_cliques,
+        name='Meta Cliques',
+        line=dict(color='green', width=2, dash='dash')
+    ))
+
+    fig.update_layout(
+        title='Evolução de Cliques vs Metas',
+        xaxis_title='Semana',
+        yaxis_title='Cliques',
+        xaxis_tickangle=45
+    )
+    return fig
+
+
+# Registro: nome do gráfico -> função construtora
+FIGURES = {
+    'cliques_semana': cliques_semana,
+    'custo_semana': custo_semana,
+    'impressoes_hora': impressoes_hora,
+    'impressoes_dia': impressoes_dia,
+    'heatmap_dia_hora': heatmap_dia_hora,
+    'horas_do_dia': horas_do_dia,
+    'distribuicao_idade': distribuicao_idade,
+    'distribuicao_sexo': distribuicao_sexo,
+    'impressoes_sexo_idade': impressoes_sexo_idade,
+    'top_palavras_ctr': top_palavras_ctr,
+    'top_palavras_cliques': top_palavras_cliques,
+    'eficiencia_palavras': eficiencia_palavras,
+    'top_pesquisas': top_pesquisas,
+    'custo_palavras_pesquisa': custo_palavras_pesquisa,
+    'impressoes_dispositivo': impressoes_dispositivo,
+    'custo_dispositivo': custo_dispositivo,
+    'cliques_rede': cliques_rede,
+    'cpc_rede': cpc_rede,
+    'eficiencia_dispositivo': eficiencia_dispositivo,
+    'alocacao_orcamento': alocacao_orcamento,
+    'funil_quantidade': funil_quantidade,
+    'funil_taxa': funil_taxa,
+    'cenarios': cenarios,
+    'radar_benchmarks': radar_benchmarks,
+    'cliques_custo_rede': cliques_custo_rede,
+    'cliques_vs_metas': cliques_vs_metas,
+}
+
+
+def build(nome, data, kpi, **params):
+    return FIGURES[nome](data, kpi, **params)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from metrics import add_shares
+from schema import LazyReports
+
+# Filtros da sidebar. Para cada relatório filtrável é montado, uma vez por versão
+# dos dados, um índice com a posição das linhas de cada categoria (códigos
+# categóricos ordenados) e as datas ordenadas da série temporal. Aplicar um
+# filtro é então juntar fatias de posições pré-ordenadas, sem comparar strings
+# linha a linha a cada rerun.
+
+# id do filtro -> (relatório, coluna, rótulo na sidebar)
+FILTROS = {
+    'campanha': ('campanhas', 'Nome da campanha', 'Campanha'),
+    'dispositivo': ('dispositivos', 'Dispositivo', 'Dispositivo'),
+    'rede': ('redes', 'Rede', 'Rede'),
+    'tipo_correspondencia': ('palavras_chave', 'Tipo de corresp.', 'Tipo de correspondência'),
+    'status_criterio': ('palavras_chave', 'Status do critério', 'Status do critério'),
+}
+
+# Relatório e coluna com a data da semana usada no filtro de período
+FILTRO_DATAS = ('serie_temporal', 'Data')
+
+
+# Índice de uma coluna: categorias ordenadas e, para cada uma, as posições das
+# suas linhas (em ordem crescente)
+def _category_index(coluna):
+    codes, categorias = pd.factorize(coluna, sort=True, use_na_sentinel=True)
+    ordem = np.argsort(codes, kind='stable')
+    limites = np.searchsorted(codes[ordem], np.arange(len(categorias) + 1))
+    posicoes = {cat: ordem[limites[i]:limites[i + 1]] for i, cat in enumerate(categorias)}
+    return list(categorias), posicoes
+
+
+def build_index(nome, df):
+    indice = {'n_linhas': len(df), 'colunas': {}}
+    for filtro, (relatorio, coluna, _) in FILTROS.items():
+        if relatorio == nome and coluna in df.columns:
+            indice['colunas'][filtro] = _category_index(df[coluna])
+    if nome == FILTRO_DATAS[0]:
+        datas = df[FILTRO_DATAS[1]].to_numpy(dtype='datetime64[ns]')
+        ordem = np.argsort(datas, kind='stable')
+        indice['datas'] = (datas[ordem], ordem)
+    return indice
+
+
+def options(indice, filtro):
+    return indice['colunas'][filtro][0]
+
+
+def date_bounds(indice):
+    datas = indice['datas'][0]
+    datas = datas[~np.isnat(datas)]
+    if len(datas) == 0:
+        return None
+    return pd.Timestamp(datas[0]).date(), pd.Timestamp(datas[-1]).date()
+
+
+# Posições (ordenadas) das linhas que passam nos filtros; None = sem filtro ativo
+def selected_positions(indice, selecao):
+    posicoes = None
+    for filtro, (categorias, por_categoria) in indice['colunas'].items():
+        escolhidas = selecao.get(filtro)
+        if not escolhidas:
+            continue
+        atual = np.sort(np.concatenate(
+            [por_categoria.get(cat, np.empty(0, dtype=np.intp)) for cat in escolhidas]
+        ))
+        posicoes = atual if posicoes is None else np.intersect1d(posicoes, atual, assume_unique=True)
+
+    periodo = selecao.get('periodo')
+    if periodo and 'datas' in indice:
+        datas, ordem = indice['datas']
+        inicio, fim = (pd.Timestamp(d).to_datetime64() for d in periodo)
+        # Datas já ordenadas: o intervalo é uma fatia encontrada por busca binária
+        atual = np.sort(ordem[np.searchsorted(datas, inicio, 'left'):np.searchsorted(datas, fim, 'right')])
+        posicoes = atual if posicoes is None else np.intersect1d(posicoes, atual, assume_unique=True)
+    return posicoes
+
+
+def apply(df, indice, selecao):
+    posicoes = selected_positions(indice, selecao)
+    if posicoes is None or len(posicoes) == indice['n_linhas']:
+        return df
+    return df.take(posicoes).reset_index(drop=True)
+
+
+# Seleção normalizada e ordenada, usada como parte da chave dos caches
+def selection_key(selecao):
+    return tuple(sorted(
+        (filtro, tuple(sorted(valor)) if filtro in FILTROS else tuple(str(d) for d in valor))
+        for filtro, valor in selecao.items() if valor
+    ))
+
+
+# Versão de um relatório depois dos filtros: a do relatório mais a parte da
+# seleção que se aplica a ele. Chave dos caches montados sobre o relatório
+# filtrado (índices de busca, correspondência, negativas).
+def report_version(nome, versao, selecao):
+    aplicaveis = {filtro: valor for filtro, valor in selecao.items()
+                  if FILTROS.get(filtro, FILTRO_DATAS)[0] == nome}
+    chave = selection_key(aplicaveis)
+    return (versao, chave) if chave else versao
+
+
+# Versão filtrada de um LazyReports. Sem filtro ativo devolve os próprios dados,
+# e com filtro a versão inclui a seleção para não misturar os caches.
+def filter_reports(data, selecao, load_index):
+    chave = selection_key(selecao)
+    if not chave:
+        return data
+    relatorios = {relatorio for relatorio, _, _ in FILTROS.values()} | {FILTRO_DATAS[0]}
+
+    def loader(nome):
+        df = data[nome]
+        if nome not in relatorios:
+            return df
+        # Participações no total recalculadas sobre as linhas filtradas
+        return add_shares(apply(df, load_index(nome), selecao))
+
+    return LazyReports(loader, nomes=list(data), versao=(data.versao, chave))
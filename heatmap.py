@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# Mapa de calor dia da semana x hora a partir do relatório Dia_e_hora(Dia_Hora).
+# O relatório é pivotado uma vez por versão dos dados em uma matriz densa 7x24;
+# normalizações, detalhamento por dia e a soma de vários clientes operam
+# direto sobre as matrizes, sem voltar aos DataFrames.
+
+DIAS = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+HORAS = list(range(24))
+
+# Rótulo na interface -> normalização
+NORMALIZACOES = {
+    'Impressões': 'absoluto',
+    '% do dia': 'dia',
+    '% da semana': 'semana',
+}
+
+
+def build_matrix(df, coluna='Impressões_num'):
+    matriz = np.zeros((len(DIAS), len(HORAS)))
+    dias = pd.Categorical(df['Dia'], categories=DIAS).codes
+    horas = df['Hora de início'].to_numpy(dtype='int64')
+    validas = (dias >= 0) & (horas >= 0) & (horas < len(HORAS))
+    # add.at acumula linhas repetidas do mesmo (dia, hora)
+    np.add.at(matriz, (dias[validas], horas[validas]), df[coluna].to_numpy(dtype='float64')[validas])
+    return matriz
+
+
+# Soma as matrizes de vários clientes
+def combine(matrizes):
+    if not matrizes:
+        return np.zeros((len(DIAS), len(HORAS)))
+    return np.sum(np.stack(matrizes), axis=0)
+
+
+def _share(matriz, totais):
+    return np.divide(matriz * 100, totais, out=np.zeros_like(matriz), where=totais > 0)
+
+
+# absoluto: valores da matriz; dia: % do total de cada dia; semana: % do total geral
+def normalize(matriz, modo='absoluto'):
+    if modo == 'dia':
+        return _share(matriz, matriz.sum(axis=1, keepdims=True))
+    if modo == 'semana':
+        return _share(matriz, np.full_like(matriz, matriz.sum()))
+    return matriz
+
+
+# Perfil por hora de um dia (detalhamento a partir do mapa)
+def day_profile(matriz, dia):
+    return matriz[DIAS.index(dia)]
@@ -0,0 +1,200 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import disk_cache
+from schema import REPORTS, SCHEMA_VERSION, consolidated_columns, derive_columns, read_raw
+
+# Atualização incremental de relatórios que reenviam todo o histórico a cada
+# exportação (Série_temporal). As semanas já processadas ficam guardadas com a
+# assinatura da linha crua; de uma nova exportação só as semanas novas ou
+# alteradas são convertidas, e os agregados semanais (semanas ativas, média e
+# pico de cliques) são corrigidos pela diferença, sem recalcular o histórico.
+
+ASSINATURA = '_assinatura'
+
+# Últimas linhas de cada exportação que o Google ainda pode revisar (conversões
+# atrasadas). O resto do arquivo é tratado como prefixo fixo: se a próxima
+# exportação começar com os mesmos bytes, só o que vem depois é lido.
+LINHAS_REVISAVEIS = 4
+
+# Estado já carregado por arquivo de estado, para não reler o disco a cada rerun
+_estados = {}
+
+
+def _state_paths(nome, paths):
+    base = os.path.join(disk_cache._cache_dir(paths[0]), f"{nome}-incremental-v{SCHEMA_VERSION}")
+    return f"{base}.feather", f"{base}.json"
+
+
+# Agregados semanais calculados do zero (estado inicial e correção do pico)
+def week_aggregates(cliques):
+    cliques = np.asarray(cliques, dtype='float64')
+    ativas = cliques[cliques > 0]
+    return {
+        'total_semanas': int(len(cliques)),
+        'semanas_ativas': int(len(ativas)),
+        'soma_cliques_ativas': float(ativas.sum()),
+        'pico_cliques': float(ativas.max()) if len(ativas) else 0.0,
+    }
+
+
+def _empty_state(nome):
+    chave, textos, derivadas = consolidated_columns(nome)
+    vazio = pd.DataFrame({col: pd.Series(dtype=str) for col in REPORTS[nome]['colunas']})
+    semanas = derive_columns(nome, vazio)[chave + textos + derivadas]
+    semanas[ASSINATURA] = pd.Series(dtype='uint64')
+    return {'semanas': semanas, 'exportacoes': [], 'ultima': None, 'prefixo': None,
+            'agregados': week_aggregates([])}
+
+
+def _load_state(nome, paths):
+    arquivo, metadados = _state_paths(nome, paths)
+    if arquivo in _estados:
+        return _estados[arquivo]
+    if disk_cache.feather is not None and os.path.exists(arquivo) and os.path.exists(metadados):
+        with open(metadados, encoding='utf-8') as f:
+            estado = json.load(f)
+        estado['semanas'] = disk_cache.feather.read_feather(arquivo)
+        _estados[arquivo] = estado
+        return estado
+    return _empty_state(nome)
+
+
+def _save_state(nome, paths, estado):
+    arquivo, metadados = _state_paths(nome, paths)
+    _estados[arquivo] = estado
+    if disk_cache.feather is None:
+        return
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    for destino, gravar in (
+        (arquivo, lambda tmp: disk_cache.feather.write_feather(estado['semanas'], tmp, compression='uncompressed')),
+        (metadados, lambda tmp: _write_json(tmp, {k: v for k, v in estado.items() if k != 'semanas'})),
+    ):
+        temporario = disk_cache.temporary_path(destino)
+        gravar(temporario)
+        os.replace(temporario, destino)
+
+
+def _write_json(path, conteudo):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(conteudo, f)
+
+
+# Corrige os agregados trocando os cliques antigos das semanas alteradas pelos
+# novos. O pico só é recalculado se a semana que o detinha diminuiu.
+def _update_aggregates(agregados, antigos, novos, n_novas, cliques):
+    agregados = dict(agregados)
+    agregados['total_semanas'] += n_novas
+    agregados['semanas_ativas'] += int((novos > 0).sum() - (antigos > 0).sum())
+    agregados['soma_cliques_ativas'] += float(novos[novos > 0].sum() - antigos[antigos > 0].sum())
+    pico_novo = float(novos.max()) if len(novos) else 0.0
+    if pico_novo >= agregados['pico_cliques']:
+        agregados['pico_cliques'] = pico_novo
+    elif (antigos == agregados['pico_cliques']).any():
+        agregados['pico_cliques'] = week_aggregates(cliques)['pico_cliques']
+    return agregados
+
+
+def _digest(conteudo):
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+
+# Prefixo da exportação que não deve mudar nas próximas: tudo antes das
+# últimas LINHAS_REVISAVEIS linhas
+def _fixed_prefix(conteudo):
+    fim = len(conteudo.rstrip(b'\r\n'))
+    for _ in range(LINHAS_REVISAVEIS):
+        fim = conteudo.rfind(b'\n', 0, fim)
+        if fim < 0:
+            return None
+    return {'bytes': fim + 1, 'hash': _digest(conteudo[:fim + 1])}
+
+
+# Cabeçalho + linhas depois do prefixo já aplicado, ou o arquivo inteiro se o
+# início da exportação mudou
+def _unread_part(conteudo, prefixo):
+    if prefixo and len(conteudo) >= prefixo['bytes'] and _digest(conteudo[:prefixo['bytes']]) == prefixo['hash']:
+        cabecalho = conteudo[:conteudo.index(b'\n') + 1]
+        if len(cabecalho) < prefixo['bytes']:
+            return cabecalho + conteudo[prefixo['bytes']:]
+    return conteudo
+
+
+# Aplica uma exportação ao estado: só as linhas novas ou alteradas são convertidas
+def _apply_export(nome, estado, path):
+    chave, textos, derivadas = consolidated_columns(nome)
+    with open(path, 'rb') as f:
+        conteudo = f.read()
+    bruto = read_raw(nome, io.BytesIO(_unread_part(conteudo, estado['prefixo'])))
+    bruto = bruto.drop_duplicates(chave, keep='last').reset_index(drop=True)
+    estado = dict(estado, prefixo=_fixed_prefix(conteudo))
+    assinaturas = pd.util.hash_pandas_object(bruto, index=False).to_numpy()
+
+    semanas = estado['semanas']
+    indice = pd.MultiIndex.from_frame(semanas[chave]) if len(chave) > 1 else pd.Index(semanas[chave[0]])
+    chaves = pd.MultiIndex.from_frame(bruto[chave]) if len(chave) > 1 else pd.Index(bruto[chave[0]])
+    posicoes = indice.get_indexer(chaves)
+    existentes = posicoes >= 0
+    alteradas = ~existentes
+    alteradas[existentes] = semanas[ASSINATURA].to_numpy()[posicoes[existentes]] != assinaturas[existentes]
+    if not alteradas.any():
+        return estado
+
+    convertidas = derive_columns(nome, bruto[alteradas].copy())
+    convertidas[ASSINATURA] = assinaturas[alteradas]
+    convertidas = convertidas[chave + textos + derivadas + [ASSINATURA]].reset_index(drop=True)
+    posicoes = posicoes[alteradas]
+    atualizadas = posicoes >= 0
+
+    cliques = semanas['Cliques_num'].to_numpy(dtype='float64')
+    antigos = np.concatenate([cliques[posicoes[atualizadas]], np.zeros(int((~atualizadas).sum()))])
+    novos = convertidas['Cliques_num'].to_numpy(dtype='float64')
+    novos = np.concatenate([novos[atualizadas], novos[~atualizadas]])
+
+    # Semanas alteradas são atualizadas no lugar e as novas entram no fim
+    semanas = semanas.copy()
+    for col in convertidas.columns:
+        semanas.iloc[posicoes[atualizadas], semanas.columns.get_loc(col)] = convertidas[col].to_numpy()[atualizadas]
+    semanas = pd.concat([semanas, convertidas[~atualizadas]], ignore_index=True)
+
+    agregados = _update_aggregates(
+        estado['agregados'], antigos, novos, int((~atualizadas).sum()), semanas['Cliques_num'].to_numpy()
+    )
+    return dict(estado, semanas=semanas, agregados=agregados)
+
+
+def _order(exp):
+    return [exp.inicio.isoformat(), exp.fim.isoformat()]
+
+
+# Atualiza o estado com as exportações (discovery.Exportacao, em ordem cronológica)
+# ainda não aplicadas. Exportações antigas apagadas do diretório não mudam o
+# estado (as novas reenviam o histórico), mas uma exportação mais antiga que a
+# última aplicada exige refazer tudo para manter a semântica de "mais recente vence".
+def refresh(nome, exportacoes):
+    paths = [e.path for e in exportacoes]
+    estado = _load_state(nome, paths)
+    hashes = [disk_cache.file_hash(path) for path in paths]
+    pendentes = [(exp, h) for exp, h in zip(exportacoes, hashes) if h not in estado['exportacoes']]
+    if not pendentes:
+        return estado
+    if estado['exportacoes'] and _order(pendentes[0][0]) < estado['ultima']:
+        estado = _empty_state(nome)
+        pendentes = list(zip(exportacoes, hashes))
+
+    for exp, h in pendentes:
+        estado = _apply_export(nome, estado, exp.path)
+        estado = dict(estado, exportacoes=estado['exportacoes'] + [h], ultima=_order(exp))
+    _save_state(nome, paths, estado)
+    return estado
+
+
+# Relatório consolidado a partir do estado incremental (mesmas colunas de consolidate)
+def load_incremental(nome, exportacoes):
+    chave, textos, derivadas = consolidated_columns(nome)
+    return refresh(nome, exportacoes)['semanas'][chave + textos + derivadas]
@@ -0,0 +1,143 @@
+import cProfile
+import functools
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+# Medições de uma execução do dashboard (um rerun do Streamlit): tempo da
+# carga, de cada aba e de cada gráfico, e chamadas/falhas de cada cache. Cada
+# sessão executa o script na própria thread, então a execução corrente fica em
+# um threading.local. Fora de uma execução (batch_report, benchmark) os
+# timers e contadores não registram nada.
+
+# Arquivo JSON lines com uma linha por execução; sem a variável nada é gravado
+ARQUIVO_METRICAS = os.environ.get('ADS_ARQUIVO_METRICAS')
+
+# Funções mostradas no resumo do perfil
+LINHAS_PERFIL = 40
+
+_local = threading.local()
+_gravacao = threading.Lock()
+
+
+def start_run(**contexto):
+    _local.execucao = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        **contexto,
+        'inicio': time.perf_counter(),
+        'tempos': [],
+        'caches': {},
+    }
+    return _local.execucao
+
+
+def current():
+    return getattr(_local, 'execucao', None)
+
+
+# Encerra a execução corrente, grava a linha no arquivo de métricas e devolve o registro
+def finish_run():
+    execucao = current()
+    if execucao is None:
+        return None
+    _local.execucao = None
+    registro = {chave: valor for chave, valor in execucao.items() if chave != 'inicio'}
+    registro['total_ms'] = (time.perf_counter() - execucao['inicio']) * 1000
+    if ARQUIVO_METRICAS:
+        linha = json.dumps(registro, ensure_ascii=False, default=str)
+        with _gravacao:
+            os.makedirs(os.path.dirname(os.path.abspath(ARQUIVO_METRICAS)), exist_ok=True)
+            with open(ARQUIVO_METRICAS, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(linha + '\n')
+    return registro
+
+
+@contextmanager
+def timer(nome, categoria):
+    execucao = current()
+    if execucao is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        execucao['tempos'].append({
+            'categoria': categoria,
+            'nome': nome,
+            'ms': (time.perf_counter() - inicio) * 1000,
+        })
+
+
+def count(cache, falha=False):
+    execucao = current()
+    if execucao is None:
+        return
+    contagem = execucao['caches'].setdefault(cache, {'chamadas': 0, 'falhas': 0})
+    contagem['chamadas'] += 1
+    contagem['falhas'] += falha
+
+
+# Aplica o decorador de cache do Streamlit (st.cache_data(...)/st.cache_resource(...))
+# contando as chamadas e as falhas: o corpo da função só executa quando o
+# valor não está no cache. Mantém a assinatura, então os argumentos com
+# "_" continuam fora da chave.
+def cached(decorador_cache, cache):
+    def decorador(func):
+        @functools.wraps(func)
+        def calcular(*args, **kwargs):
+            execucao = current()
+            if execucao is not None:
+                execucao['caches'][cache]['falhas'] += 1
+            return func(*args, **kwargs)
+
+        em_cache = decorador_cache(calcular)
+
+        @functools.wraps(func)
+        def chamar(*args, **kwargs):
+            count(cache)
+            with timer(cache, 'cache'):
+                return em_cache(*args, **kwargs)
+
+        chamar.clear = em_cache.clear
+        return chamar
+    return decorador
+
+
+# Tempos somados por etapa (do mais lento ao mais rápido) e acertos/falhas
+# dos caches de um registro de finish_run, prontos para exibir
+def summary(execucao):
+    tempos = pd.DataFrame(execucao['tempos'], columns=['categoria', 'nome', 'ms'])
+    tempos = tempos.groupby(['categoria', 'nome'], sort=False)['ms'].agg(['size', 'sum']).reset_index()
+    tempos.columns = ['Etapa', 'Nome', 'Vezes', 'Tempo (ms)']
+    caches = pd.DataFrame([
+        {'Cache': nome, 'Chamadas': c['chamadas'], 'Acertos': c['chamadas'] - c['falhas'], 'Falhas': c['falhas']}
+        for nome, c in execucao['caches'].items()
+    ], columns=['Cache', 'Chamadas', 'Acertos', 'Falhas'])
+    return tempos.sort_values('Tempo (ms)', ascending=False, kind='stable'), caches
+
+
+# Perfil (cProfile) de uma única execução, ligado só quando pedido: o
+# profiler pesa em todas as chamadas de função
+def start_profile():
+    perfil = cProfile.Profile()
+    perfil.enable()
+    return perfil
+
+
+# Devolve o resumo por tempo acumulado e o arquivo .prof (abre no snakeviz,
+# no pstats ou no tuna)
+def stop_profile(perfil, linhas=LINHAS_PERFIL):
+    perfil.disable()
+    texto = io.StringIO()
+    pstats.Stats(perfil, stream=texto).strip_dirs().sort_stats('cumulative').print_stats(linhas)
+    perfil.create_stats()
+    return {'resumo': texto.getvalue(), 'arquivo': marshal.dumps(perfil.stats)}
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+import query_index
+
+# Liga cada termo de pesquisa às palavras-chave que poderiam tê-lo acionado,
+# pela semântica de cada tipo de correspondência (sobre o texto normalizado,
+# sem as variações próximas que o Google também aceita):
+#   exata: a pesquisa é a palavra-chave
+#   frase: as palavras da palavra-chave aparecem juntas e em ordem na pesquisa
+#   ampla: todas as palavras da palavra-chave aparecem na pesquisa, em qualquer ordem
+# As candidatas de cada palavra-chave saem da interseção das listas do índice
+# de pesquisas (palavras ou pares de palavras), nunca de palavras-chave x pesquisas.
+
+COLUNA_PALAVRA = 'Palavra-chave da rede de pesquisa'
+
+# Ordem de preferência na atribuição: a exata vence a de frase, que vence a ampla
+CORRESPONDENCIAS = ['Exata', 'Frase', 'Ampla']
+
+
+# "Corresp. exata" / "Corresp. de frase" / "Corresp. ampla" -> Exata/Frase/Ampla
+def match_type(tipos):
+    tipos = pd.Series(tipos, dtype=str).fillna('').str.lower()
+    return np.select([tipos.str.contains('exata'), tipos.str.contains('frase')], ['Exata', 'Frase'], 'Ampla')
+
+
+# Interseção de listas ordenadas: as linhas da menor são procuradas nas outras
+# por busca binária, sem reordenar as listas grandes (como faria intersect1d)
+def _intersect(listas):
+    listas = sorted(listas, key=len)
+    linhas = listas[0]
+    for outra in listas[1:]:
+        if len(linhas) == 0:
+            break
+        posicoes = np.minimum(np.searchsorted(outra, linhas), len(outra) - 1)
+        linhas = linhas[outra[posicoes] == linhas]
+    return linhas
+
+
+# Termos do índice que cada palavra-chave precisa: os pares consecutivos (frase
+# com duas palavras ou mais) ou as palavras (ampla, ou frase de uma palavra)
+def _required_terms(palavras, correspondencia):
+    if correspondencia == 'Frase' and len(palavras) > 1:
+        return [f"{a} {b}" for a, b in zip(palavras[:-1], palavras[1:])]
+    return list(dict.fromkeys(palavras))
+
+
+# Pares (palavra-chave, pesquisa) de todas as correspondências possíveis
+def _match_pairs(textos_palavras, correspondencias, textos_pesquisas, indice):
+    pares_palavra, pares_pesquisa = [], []
+
+    # Exata: junção pelo texto normalizado
+    exatas = np.flatnonzero(correspondencias == 'Exata')
+    juncao = pd.DataFrame({'texto': textos_palavras[exatas], 'palavra': exatas}).merge(
+        pd.DataFrame({'texto': textos_pesquisas, 'pesquisa': np.arange(len(textos_pesquisas))}), on='texto')
+    pares_palavra.append(juncao['palavra'].to_numpy())
+    pares_pesquisa.append(juncao['pesquisa'].to_numpy())
+
+    # Frase e ampla: interseção das listas do índice, com uma única busca de
+    # todos os termos necessários
+    outras = np.flatnonzero(correspondencias != 'Exata')
+    necessarios = [_required_terms(textos_palavras[i].split(), correspondencias[i]) for i in outras]
+    termos = pd.Index(pd.unique(np.array([t for ts in necessarios for t in ts], dtype=object)))
+    posicoes = indice['termos'].get_indexer(termos)
+    listas = {
+        termo: indice['posicoes'][indice['inicio'][p]:indice['inicio'][p + 1]] if p >= 0 else np.empty(0, dtype=np.intp)
+        for termo, p in zip(termos, posicoes)
+    }
+    for i, termos_palavra in zip(outras, necessarios):
+        if not termos_palavra:
+            continue
+        linhas = _intersect([listas[t] for t in termos_palavra])
+        # Três palavras ou mais: os pares estão na pesquisa, falta confirmar a sequência
+        if correspondencias[i] == 'Frase' and len(termos_palavra) > 1 and len(linhas):
+            frase = f" {textos_palavras[i]} "
+            linhas = linhas[[frase in f" {t} " for t in textos_pesquisas[linhas]]]
+        pares_palavra.append(np.full(len(linhas), i))
+        pares_pesquisa.append(linhas)
+
+    return np.concatenate(pares_palavra).astype(np.int64), np.concatenate(pares_pesquisa).astype(np.int64)
+
+
+# palavras_chave: relatório Palavras-chave_de_pesquisa; pesquisas: Pesquisas(Pesquisar);
+# indice: query_index.build_index das pesquisas (montado aqui se não vier)
+def match_keywords(palavras_chave, pesquisas, indice=None):
+    pesquisas = pesquisas.reset_index(drop=True)
+    palavras_chave = palavras_chave.reset_index(drop=True)
+    if indice is None:
+        indice = query_index.build_index(pesquisas)
+    textos_palavras = query_index.normalize_phrase(palavras_chave[COLUNA_PALAVRA].to_numpy()).to_numpy(dtype=object)
+    textos_pesquisas = query_index.normalize_phrase(pesquisas[indice['coluna']].to_numpy()).to_numpy(dtype=object)
+    correspondencias = match_type(palavras_chave['Tipo de corresp.'])
+
+    palavra, pesquisa = _match_pairs(textos_palavras, correspondencias, textos_pesquisas, indice)
+    pares = pd.DataFrame({
+        'palavra': palavra,
+        'pesquisa': pesquisa,
+        'Correspondência': pd.Categorical.from_codes(
+            pd.Categorical(correspondencias, categories=CORRESPONDENCIAS).codes[palavra], CORRESPONDENCIAS),
+    })
+
+    # Atribuição: correspondência mais forte, depois a palavra-chave mais
+    # longa (mais específica), depois a de mais cliques. Cada palavra-chave
+    # recebe uma posição nessa ordem e a pesquisa fica com a de menor posição.
+    n_palavras = np.array([len(t.split()) for t in textos_palavras], dtype=np.int64)
+    ordem = np.lexsort((-palavras_chave['Cliques_num'].to_numpy(dtype='float64'), -n_palavras,
+                        pd.Categorical(correspondencias, categories=CORRESPONDENCIAS).codes))
+    posicao = np.empty(len(ordem), dtype=np.int64)
+    posicao[ordem] = np.arange(len(ordem))
+    melhor = np.full(len(pesquisas), len(ordem), dtype=np.int64)
+    np.minimum.at(melhor, pesquisa, posicao[palavra])
+    cobertas = melhor < len(ordem)
+    atribuida = np.full(len(pesquisas), -1, dtype=np.int64)
+    atribuida[cobertas] = ordem[melhor[cobertas]]
+
+    custo = pesquisas['Custo_num'].to_numpy(dtype='float64')
+    possiveis = np.bincount(pesquisa, minlength=len(pesquisas))
+    nomes = palavras_chave[COLUNA_PALAVRA].to_numpy(dtype=object)
+    # Só as pesquisas cobertas têm palavra-chave (e pode não haver nenhuma palavra-chave)
+    nomes_atribuidos = np.full(len(pesquisas), None, dtype=object)
+    nomes_atribuidos[cobertas] = nomes[atribuida[cobertas]]
+    resultado_pesquisas = pesquisas.assign(**{
+        'Palavra-chave atribuída': nomes_atribuidos,
+        'Palavras-chave possíveis': possiveis,
+    })
+
+    compartilhadas = possiveis[pesquisa] > 1
+    resultado_palavras = palavras_chave[[COLUNA_PALAVRA, 'Tipo de corresp.', 'Status do critério']].assign(**{
+        'Pesquisas possíveis': np.bincount(palavra, minlength=len(palavras_chave)),
+        'Pesquisas atribuídas': np.bincount(atribuida[cobertas], minlength=len(palavras_chave)),
+        'Custo atribuído': np.bincount(atribuida[cobertas], weights=custo[cobertas], minlength=len(palavras_chave)),
+        'Pesquisas compartilhadas': np.bincount(palavra[compartilhadas], minlength=len(palavras_chave)),
+    })
+
+    custo_total = custo.sum()
+    return {
+        'pares': pares,
+        'pesquisas': resultado_pesquisas,
+        'palavras_chave': resultado_palavras.sort_values('Custo atribuído', ascending=False, kind='stable'),
+        'sem_palavra_chave': resultado_pesquisas[~cobertas].sort_values('Custo_num', ascending=False, kind='stable'),
+        'sobreposicao': _overlap(palavra, pesquisa, atribuida, nomes, custo),
+        'cobertura_pesquisas': float(cobertas.mean() * 100) if len(cobertas) else 0.0,
+        'cobertura_custo': float(custo[cobertas].sum() / custo_total * 100) if custo_total > 0 else 0.0,
+        'pesquisas_sobrepostas': int((possiveis > 1).sum()),
+    }
+
+
+# Palavras-chave que também correspondiam a pesquisas atribuídas a outra,
+# pelo custo em disputa. Cada par (pesquisa, palavra-chave perdedora) conta uma
+# vez, então o custo cresce com o número de pares e não com o quadrado.
+def _overlap(palavra, pesquisa, atribuida, nomes, custo):
+    vencedora = atribuida[pesquisa]
+    perdedoras = palavra != vencedora
+    disputas = pd.DataFrame({
+        'vencedora': vencedora[perdedoras],
+        'perdedora': palavra[perdedoras],
+        'custo': custo[pesquisa[perdedoras]],
+    })
+    grupos = disputas.groupby(['vencedora', 'perdedora'], sort=False)['custo'].agg(['size', 'sum']).reset_index()
+    return pd.DataFrame({
+        'Palavra-chave atribuída': nomes[grupos['vencedora'].to_numpy()],
+        'Também correspondia': nomes[grupos['perdedora'].to_numpy()],
+        'Pesquisas em comum': grupos['size'].to_numpy(),
+        'Custo em comum': grupos['sum'].to_numpy(),
+    }).sort_values('Custo em comum', ascending=False, kind='stable').reset_index(drop=True)
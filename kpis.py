@@ -0,0 +1,88 @@
+import numpy as np
+
+import heatmap
+import incremental
+import timeseries
+
+# Métricas de cabeçalho do dashboard, calculadas uma única vez por versão dos
+# dados. As abas e a sidebar leem os valores deste dicionário em vez de
+# refazer as reduções sobre os DataFrames a cada rerun.
+
+
+def _ratio(numerador, denominador, fator=1.0):
+    return float(numerador) / float(denominador) * fator if denominador > 0 else 0.0
+
+
+# Métricas por valor de uma dimensão (dispositivo, rede) com participação no total
+def _breakdown(df, dimensao, colunas):
+    totais = {col: float(df[col].sum()) for col in colunas}
+    agrupado = df.groupby(dimensao, sort=False)[list(colunas)].sum()
+    resultado = {}
+    for valor, linha in agrupado.iterrows():
+        item = {col: float(linha[col]) for col in colunas}
+        item.update({f'participacao_{col}': _ratio(linha[col], totais[col], 100) for col in colunas})
+        resultado[valor] = item
+    return resultado
+
+
+# semanas: agregados semanais já mantidos pela atualização incremental
+# (incremental.week_aggregates); sem eles, são calculados da Série temporal
+def compute_kpis(data, semanas=None):
+    campanhas = data['campanhas']
+    serie = data['serie_temporal']
+    palavras = data['palavras_chave']
+
+    total_impressoes = float(data['dia_hora']['Impressões_num'].sum())
+    total_cliques = float(campanhas['Cliques_num'].sum())
+    total_custo = float(campanhas['Custo_num'].sum())
+
+    if semanas is None:
+        semanas = incremental.week_aggregates(serie['Cliques_num'])
+    datas = timeseries.time_indexed(serie)
+    datas_ativas = datas.index[datas['Cliques_num'] > 0]
+    cliques_palavras = palavras['Cliques_num'].to_numpy()
+
+    dispositivos = _breakdown(data['dispositivos'], 'Dispositivo', ('Impressões_num', 'Cliques_num', 'Custo_num'))
+    for item in dispositivos.values():
+        item['ctr'] = _ratio(item['Cliques_num'], item['Impressões_num'], 100)
+        item['cpc'] = _ratio(item['Custo_num'], item['Cliques_num'])
+        # Participação sobre o total de impressões da campanha (relatório Dia_e_hora)
+        item['participacao_impressoes_total'] = _ratio(item['Impressões_num'], total_impressoes, 100)
+        item['participacao_custo_total'] = _ratio(item['Custo_num'], total_custo, 100)
+
+    redes = _breakdown(data['redes'], 'Rede', ('Cliques_num', 'Custo_num'))
+    for item in redes.values():
+        item['cpc'] = _ratio(item['Custo_num'], item['Cliques_num'])
+
+    return {
+        'total_impressoes': total_impressoes,
+        'total_cliques': total_cliques,
+        'total_custo': total_custo,
+        'ctr_medio': _ratio(total_cliques, total_impressoes, 100),
+        'cpc_medio': _ratio(total_custo, total_cliques),
+        'total_semanas': semanas['total_semanas'],
+        'semanas_ativas': semanas['semanas_ativas'],
+        'semanas_sem_dados': semanas['total_semanas'] - semanas['semanas_ativas'],
+        'media_cliques_semana': _ratio(semanas['soma_cliques_ativas'], semanas['semanas_ativas']),
+        'pico_cliques': semanas['pico_cliques'],
+        'inicio_serie': datas.index[0] if len(datas) else None,
+        'fim_serie': datas.index[-1] if len(datas) else None,
+        'primeira_semana_ativa': datas_ativas[0] if len(datas_ativas) else None,
+        'total_palavras': int(len(cliques_palavras)),
+        'palavras_com_cliques': int(np.count_nonzero(cliques_palavras > 0)),
+        'palavras_sem_cliques': int(np.count_nonzero(cliques_palavras == 0)),
+        'taxa_sem_cliques': _ratio(np.count_nonzero(cliques_palavras == 0), len(cliques_palavras), 100),
+        'dispositivos': dispositivos,
+        'redes': redes,
+        # Impressões por dia da semana x hora, pivotadas uma vez por versão
+        'matriz_dia_hora': heatmap.build_matrix(data['dia_hora_detalhado']) if 'dia_hora_detalhado' in data else None,
+    }
+
+
+# Métricas de um dispositivo (zeros se ele não aparecer na exportação)
+def device(kpis, nome):
+    return kpis['dispositivos'].get(nome, {
+        'Impressões_num': 0.0, 'Cliques_num': 0.0, 'Custo_num': 0.0,
+        'participacao_Impressões_num': 0.0, 'participacao_Cliques_num': 0.0, 'participacao_Custo_num': 0.0,
+        'ctr': 0.0, 'cpc': 0.0, 'participacao_impressoes_total': 0.0, 'participacao_custo_total': 0.0,
+    })
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Métricas derivadas dos relatórios (CPC, CPM, CTR, taxa de conversão, custo
+# por conversão e participação no total), calculadas em uma passada vetorizada
+# na consolidação, sobre as colunas *_num que o relatório tiver. Só as que as
+# abas usam (schema.REPORTS[...]['metricas']) são guardadas com o relatório
+# nos caches; abas e gráficos só as selecionam, sem recalcular nem alterar os
+# DataFrames. Divisões por zero dão 0.
+
+# coluna derivada -> (numerador, denominador, fator). Colunas que já vêm da
+# exportação (CTR das palavras-chave, CPC das redes) são mantidas.
+RAZOES = {
+    'CPC_num': ('Custo_num', 'Cliques_num', 1),
+    'CPM_num': ('Custo_num', 'Impressões_num', 1000),
+    'CTR_num': ('Cliques_num', 'Impressões_num', 100),
+    'Taxa_conversao_num': ('Conversões_num', 'Cliques_num', 100),
+    'Custo_conversao_num': ('Custo_num', 'Conversões_num', 1),
+}
+
+# métrica -> participação da linha no total do relatório (%)
+PARTICIPACOES = {
+    'Custo_num': 'Participacao_custo_num',
+    'Cliques_num': 'Participacao_cliques_num',
+    'Impressões_num': 'Participacao_impressoes_num',
+}
+
+_ORIGENS = set(PARTICIPACOES) | {col for num, den, _ in RAZOES.values() for col in (num, den)}
+
+
+def _ratio(numerador, denominador, fator):
+    return np.divide(numerador * fator, denominador, out=np.zeros(len(numerador)), where=denominador > 0)
+
+
+def _shares(df, valores, totais=None):
+    novas = {}
+    for metrica, coluna in PARTICIPACOES.items():
+        if metrica in valores:
+            total = np.full(len(df), (totais or {}).get(metrica, valores[metrica].sum()))
+            novas[coluna] = _ratio(valores[metrica], total, 100)
+    return novas
+
+
+# Devolve df com as colunas derivadas (sem alterar o recebido); colunas
+# restringe às informadas (padrão: todas). As participações são sempre
+# recalculadas, sobre as linhas de df ou, para um recorte (resultado de uma
+# busca), sobre os totais {métrica: total} do relatório inteiro.
+def add_derived_metrics(df, colunas=None, totais=None):
+    valores = {col: df[col].to_numpy(dtype='float64') for col in _ORIGENS if col in df.columns}
+    novas = {}
+    for coluna, (numerador, denominador, fator) in RAZOES.items():
+        if coluna not in df.columns and numerador in valores and denominador in valores:
+            novas[coluna] = _ratio(valores[numerador], valores[denominador], fator)
+    novas.update(_shares(df, valores, totais))
+    if colunas is not None:
+        novas = {coluna: valor for coluna, valor in novas.items() if coluna in colunas}
+    return df.assign(**novas) if novas else df
+
+
+# Só as participações que df já tem, sobre as linhas de df: as razões de cada
+# linha não mudam com um filtro, o total sim
+def add_shares(df):
+    valores = {col: df[col].to_numpy(dtype='float64') for col, participacao in PARTICIPACOES.items()
+               if col in df.columns and participacao in df.columns}
+    novas = _shares(df, valores)
+    return df.assign(**novas) if novas else df
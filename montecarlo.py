@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+import scenarios
+
+# Simulação de Monte Carlo do faturamento e do ROAS de um orçamento. Em vez de
+# três taxas fixas, cada sorteio tira um CPC, uma taxa de conversão e um ticket
+# médio de distribuições ajustadas à conta e devolve as faixas de percentis:
+#   CPC: lognormal ajustada ao CPC semanal da Série temporal (pesos = cliques)
+#   taxa de conversão: Beta a posteriori das conversões da conta quando elas
+#     são rastreadas; senão, Beta com média no meio da faixa informada e a
+#     faixa cobrindo ~95% da distribuição
+#   ticket médio: lognormal com a média informada e coeficiente de variação CV_TICKET
+# Os sorteios são vetorizados (um array por variável), então 1M de sorteios
+# leva uma fração de segundo.
+
+SORTEIOS = 1_000_000
+PERCENTIS = [5, 25, 50, 75, 95]
+CV_TICKET = 0.3
+SEMANAS = 4
+SEED = 42
+
+# Barras dos histogramas (o último 0,5% fica de fora do eixo)
+BARRAS = 60
+
+
+# Parâmetros ajustados à conta: semanas com cliques da Série temporal e, se
+# houver, as conversões e os cliques do relatório que as rastreia
+def fit_history(serie, conversoes=0.0, cliques_conversoes=0.0):
+    ativas = serie[serie['Cliques_num'] > 0]
+    cliques = ativas['Cliques_num'].to_numpy(dtype='float64')
+    custo = ativas['Custo_num'].to_numpy(dtype='float64')
+    pagas = custo > 0
+    if pagas.any():
+        log_cpc = np.log(custo[pagas] / cliques[pagas])
+        media = float(np.average(log_cpc, weights=cliques[pagas]))
+        desvio = float(np.sqrt(np.average((log_cpc - media) ** 2, weights=cliques[pagas])))
+    else:
+        media, desvio = 0.0, 0.0
+    return {
+        'semanas': int(len(ativas)),
+        'custo_semanal': float(custo.mean()) if len(custo) else 0.0,
+        'cpc_log_media': media,
+        'cpc_log_desvio': desvio,
+        'conversoes': float(conversoes),
+        'cliques_conversoes': float(cliques_conversoes),
+    }
+
+
+# (alfa, beta) da taxa de conversão (fração)
+def _beta_parameters(ajuste, faixa_taxas):
+    if ajuste['conversoes'] > 0 and ajuste['cliques_conversoes'] > ajuste['conversoes']:
+        return ajuste['conversoes'] + 1, ajuste['cliques_conversoes'] - ajuste['conversoes'] + 1
+    minimo, maximo = sorted(faixa_taxas)
+    media = (minimo + maximo) / 200
+    desvio = max((maximo - minimo) / 400, media * 0.01)
+    concentracao = max(media * (1 - media) / desvio ** 2 - 1, 1.0)
+    return media * concentracao, (1 - media) * concentracao
+
+
+# Percentis pelo valor mais próximo, com um único partition (np.percentile
+# interpola e particiona o array uma vez por ponto)
+def _percentiles(valores, percentis):
+    posicoes = np.round(np.asarray(percentis) / 100 * (len(valores) - 1)).astype(np.intp)
+    return np.partition(valores, posicoes)[posicoes].astype('float64')
+
+
+# Percentis de uma contagem inteira pela distribuição acumulada (bincount)
+def _count_percentiles(contagens, percentis):
+    acumulado = np.cumsum(np.bincount(contagens))
+    return np.searchsorted(acumulado, np.asarray(percentis) / 100 * len(contagens)).astype('float64')
+
+
+def _lognormal(rng, media, desvio, n):
+    return np.exp(media + desvio * rng.standard_normal(n, dtype=np.float32))
+
+
+# Beta como razão de duas gamas, em float32 como os demais sorteios
+def _beta(rng, alfa, beta, n):
+    x = rng.standard_gamma(alfa, n, dtype=np.float32)
+    return x / (x + rng.standard_gamma(beta, n, dtype=np.float32))
+
+
+# Orçamento do horizonte: o custo semanal médio da conta x semanas, com a
+# variação (%) aplicada. O mesmo CPC sorteado vale para o horizonte todo.
+def simulate(ajuste, faixa_taxas=scenarios.FAIXA_TAXAS, ticket=scenarios.TICKET_MEDIO, variacao=0.0,
+             semanas=SEMANAS, cv_ticket=CV_TICKET, sorteios=SORTEIOS, seed=SEED):
+    rng = np.random.default_rng(seed)
+    orcamento = ajuste['custo_semanal'] * semanas * max(1 + variacao / 100, 0.0)
+
+    cpc = _lognormal(rng, ajuste['cpc_log_media'], ajuste['cpc_log_desvio'], sorteios)
+    taxa = _beta(rng, *_beta_parameters(ajuste, faixa_taxas), sorteios)
+    sigma = np.sqrt(np.log1p(cv_ticket ** 2))
+    tickets = _lognormal(rng, np.log(ticket) - sigma ** 2 / 2, sigma, sorteios)
+
+    conversoes = rng.poisson((orcamento / cpc * taxa).astype('float64'))
+    faturamento = conversoes * tickets
+    # ROAS é o faturamento escalado pelo orçamento: mesmos percentis e histograma
+    escala_roas = 100 / orcamento if orcamento > 0 else 0.0
+
+    p_faturamento = _percentiles(faturamento, PERCENTIS + [99.5])
+    p_conversoes = _count_percentiles(conversoes, PERCENTIS)
+    percentis = pd.DataFrame({
+        'Faturamento (R$)': p_faturamento[:-1],
+        'ROAS (%)': p_faturamento[:-1] * escala_roas,
+        'Conversões': p_conversoes,
+        # O custo por conversão cai quando as conversões sobem: o percentil p
+        # dele é o orçamento sobre o percentil 100 - p das conversões
+        'Custo por conversão (R$)': np.divide(orcamento, p_conversoes[::-1],
+                                              out=np.full(len(PERCENTIS), np.nan), where=p_conversoes[::-1] > 0),
+    }, index=[f"P{p}" for p in PERCENTIS]).T
+
+    contagem, bordas = np.histogram(faturamento, BARRAS, (0, p_faturamento[-1] or 1))
+    return {
+        'orcamento': orcamento,
+        'sorteios': sorteios,
+        'percentis': percentis,
+        'media_faturamento': float(faturamento.mean(dtype='float64')),
+        'prob_retorno': float((faturamento * escala_roas >= 100).mean() * 100),
+        'prob_sem_conversao': float((conversoes == 0).mean() * 100),
+        'taxa_rastreada': ajuste['conversoes'] > 0,
+        'histograma_faturamento': (contagem, bordas),
+        'histograma_roas': (contagem, bordas * escala_roas),
+    }
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+import query_index
+
+# Candidatas a palavras-chave negativas: termos de pesquisa (e palavras/pares
+# de palavras desses termos) que gastaram sem nenhuma conversão, ordenados
+# pelo custo desperdiçado. Palavras que fazem parte das palavras-chave da
+# conta ficam de fora, para não sugerir negativar o próprio negócio.
+
+# Tipo de correspondência da negativa -> (abre, fecha) no formato do Google Ads Editor
+FORMATOS = {
+    'Exata': ('[', ']'),
+    'Frase': ('"', '"'),
+    'Ampla': ('', ''),
+}
+
+
+def _format_negatives(termos, correspondencia):
+    abre, fecha = FORMATOS[correspondencia]
+    return abre + termos.astype(str) + fecha
+
+
+def _protected_terms(palavras_chave):
+    if palavras_chave is None or palavras_chave.empty:
+        return set(), set()
+    textos = query_index.normalize_phrase(palavras_chave['Palavra-chave da rede de pesquisa'].to_numpy())
+    termos, _, _, _ = query_index._postings(textos)
+    return set(textos.to_numpy(dtype=object)), set(termos)
+
+
+# isin sobre object: no dtype str do pandas cada valor do conjunto vira um
+# escalar do pyarrow, o que leva segundos com centenas de milhares de palavras-chave
+def _isin(textos, conjunto):
+    return pd.Index(np.asarray(textos, dtype=object), dtype=object).isin(list(conjunto))
+
+
+def _share(custo, total):
+    return custo / total * 100 if total > 0 else custo * 0.0
+
+
+# pesquisas: relatório Pesquisas(Pesquisar); indice: query_index.build_index do
+# mesmo relatório (montado aqui se não vier); palavras_chave: as palavras-chave
+# da conta, que nunca são sugeridas como negativas.
+def mine_negatives(pesquisas, indice=None, palavras_chave=None, custo_minimo=0.0):
+    if indice is None:
+        indice = query_index.build_index(pesquisas)
+    textos_protegidos, termos_protegidos = _protected_terms(palavras_chave)
+    custo_total = float(pesquisas['Custo_num'].sum())
+
+    desperdicio = (pesquisas['Conversões_num'].to_numpy() == 0) & (pesquisas['Custo_num'].to_numpy() > 0)
+    custo_desperdicado = float(pesquisas['Custo_num'].to_numpy()[desperdicio].sum())
+
+    # Termos de pesquisa inteiros -> negativa exata
+    candidatos = desperdicio & (pesquisas['Custo_num'].to_numpy() >= custo_minimo)
+    if textos_protegidos:
+        normalizados = query_index.normalize_phrase(pesquisas['Pesquisar'].to_numpy()[candidatos])
+        candidatos[candidatos] = ~_isin(normalizados, textos_protegidos)
+    termos = pesquisas.loc[candidatos, ['Pesquisar', 'Custo_num', 'Cliques_num', 'Impressões_num']]
+    termos = termos.sort_values('Custo_num', ascending=False, kind='stable').reset_index(drop=True)
+    termos['% do custo'] = _share(termos['Custo_num'], custo_total)
+    termos['Negativa sugerida'] = _format_negatives(termos['Pesquisar'], 'Exata')
+
+    # Palavras e pares de palavras sem conversão em nenhuma pesquisa -> ampla/frase
+    estatisticas = indice['estatisticas']
+    candidatas = ((estatisticas['Conversões_num'] == 0) & (estatisticas['Custo_num'] > 0)
+                  & (estatisticas['Custo_num'] >= custo_minimo) & ~_isin(estatisticas['Termo'], termos_protegidos))
+    palavras = estatisticas.loc[candidatas, ['Termo', 'N-grama', 'Pesquisas', 'Custo_num', 'Cliques_num',
+                                             'Impressões_num']]
+    palavras = palavras.sort_values('Custo_num', ascending=False, kind='stable').reset_index(drop=True)
+    palavras['% do custo'] = _share(palavras['Custo_num'], custo_total)
+    palavras['Negativa sugerida'] = _format_negatives(palavras['Termo'], 'Frase').where(
+        palavras['N-grama'] > 1, _format_negatives(palavras['Termo'], 'Ampla'))
+
+    return {
+        'termos': termos,
+        'palavras': palavras,
+        'custo_total': custo_total,
+        'custo_desperdicado': custo_desperdicado,
+        # Sem nenhuma conversão na conta, tudo que gastou vira candidato: o
+        # problema provavelmente é o rastreamento, não os termos
+        'conta_sem_conversoes': bool(pesquisas['Conversões_num'].sum() == 0),
+    }
+
+
+# Lista única para exportação (termos e palavras), pronta para revisar e colar
+# no Google Ads Editor
+def export_csv(negativas):
+    termos = negativas['termos'].assign(Origem='Termo de pesquisa', Correspondência='Exata')
+    palavras = negativas['palavras'].assign(
+        Origem=np.where(negativas['palavras']['N-grama'] == 1, 'Palavra', 'Par de palavras'),
+        Correspondência=np.where(negativas['palavras']['N-grama'] == 1, 'Ampla', 'Frase'),
+    ).rename(columns={'Termo': 'Pesquisar'})
+    colunas = ['Negativa sugerida', 'Correspondência', 'Origem', 'Pesquisar', 'Custo_num', 'Cliques_num',
+               'Impressões_num', '% do custo']
+    lista = pd.concat([termos[colunas], palavras[colunas]], ignore_index=True)
+    lista = lista.rename(columns={'Pesquisar': 'Termo', 'Custo_num': 'Custo', 'Cliques_num': 'Cliques',
+                                  'Impressões_num': 'Impressões'})
+    # Contagens como inteiros: a formatação de float domina o tempo do to_csv
+    lista = lista.astype({'Cliques': 'int64', 'Impressões': 'int64'}).round(2)
+    return lista.to_csv(index=False).encode('utf-8-sig')
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+# Conversão vetorizada dos formatos pt-BR exportados pelo Google Ads
+# ("R$ 1.988,83", "64.469", "3,41%"). Mesma semântica das funções clean_*:
+# qualquer valor que não possa ser convertido vira 0.0.
+
+
+# Função para limpar valores monetários (versão escalar, célula a célula)
+def clean_currency_value(value):
+    if isinstance(value, str):
+        # Remove R$, espaços não quebráveis (\xa0) e pontos de milhar
+        cleaned = value.replace('R$', '').replace('\xa0', '').replace(' ', '').replace('.', '')
+        # Substitui vírgula decimal por ponto
+        cleaned = cleaned.replace(',', '.')
+        try:
+            return float(cleaned)
+        except ValueError:
+            return 0.0
+    return float(value) if pd.notna(value) else 0.0
+
+# Função para limpar porcentagens (versão escalar)
+def clean_percentage(value):
+    if isinstance(value, str):
+        cleaned = value.replace('%', '').replace(',', '.')
+        try:
+            return float(cleaned)
+        except ValueError:
+            return 0.0
+    return float(value) if pd.notna(value) else 0.0
+
+# Função para limpar números com separadores de milhar (versão escalar)
+def clean_number(value):
+    if isinstance(value, str):
+        cleaned = value.replace('.', '').replace(',', '.')
+        try:
+            return float(cleaned)
+        except ValueError:
+            return 0.0
+    return float(value) if pd.notna(value) else 0.0
+
+
+# Padrões removidos antes da troca da vírgula decimal por ponto
+_CURRENCY_STRIP = r'R\$|\xa0| |\.'
+_NUMBER_STRIP = r'\.'
+_PERCENT_STRIP = r'%'
+
+
+def _parse_series(series, strip_pattern):
+    series = pd.Series(series)
+    if is_numeric_dtype(series.dtype):
+        return series.astype('float64').fillna(0.0)
+
+    # Exportações repetem muito os mesmos valores ("0", "R$ 0,00"):
+    # limpa só os valores distintos e depois espalha pelos códigos.
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(0.0, index=series.index, name=series.name, dtype='float64')
+    uniques = pd.Series(uniques, dtype=object)
+    is_text = uniques.map(type).eq(str).to_numpy()
+
+    parsed = np.zeros(len(uniques), dtype='float64')
+    if is_text.any():
+        text = uniques[is_text].astype(str)
+        text = text.str.replace(strip_pattern, '', regex=True).str.replace(',', '.', regex=False)
+        parsed[is_text] = pd.to_numeric(text, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    if (~is_text).any():
+        parsed[~is_text] = pd.to_numeric(uniques[~is_text], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    parsed = np.nan_to_num(parsed, nan=0.0)
+
+    # Código -1 indica valor ausente (NaN): vira 0.0 como nas funções clean_*
+    values = np.where(codes >= 0, parsed[codes], 0.0)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def parse_currency(series):
+    return _parse_series(series, _CURRENCY_STRIP)
+
+
+def parse_number(series):
+    return _parse_series(series, _NUMBER_STRIP)
+
+
+def parse_percentage(series):
+    return _parse_series(series, _PERCENT_STRIP)
+
+
+# Meses abreviados como aparecem nas exportações ("Semana de 7 de abr. de 2025")
+MESES_PT = {
+    'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12,
+}
+
+# Nomes por extenso, para exibir datas ("14 de Julho 2025")
+MESES_EXTENSO = {
+    1: 'Janeiro', 2: 'Fevereiro', 3: 'Março', 4: 'Abril', 5: 'Maio', 6: 'Junho',
+    7: 'Julho', 8: 'Agosto', 9: 'Setembro', 10: 'Outubro', 11: 'Novembro', 12: 'Dezembro',
+}
+
+_PADRAO_DATA = r'(\d{1,2}) de ([a-zç]{3})[a-zç]*\.? de (\d{4})'
+
+
+# Converte rótulos com datas pt-BR ("Semana de 7 de abr. de 2025") em datetime64.
+# Rótulos que não seguem o padrão viram NaT.
+def parse_week_label(series):
+    series = pd.Series(series)
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(uniques) == 0:
+        return pd.Series(pd.NaT, index=series.index, name=series.name, dtype='datetime64[ns]')
+
+    partes = pd.Series(uniques, dtype=object).astype(str).str.lower().str.extract(_PADRAO_DATA)
+    datas = pd.to_datetime(
+        pd.DataFrame({
+            'year': pd.to_numeric(partes[2], errors='coerce'),
+            'month': partes[1].map(MESES_PT),
+            'day': pd.to_numeric(partes[0], errors='coerce'),
+        }),
+        errors='coerce',
+    ).to_numpy(dtype='datetime64[ns]')
+
+    valores = np.where(codes >= 0, datas[codes], np.datetime64('NaT'))
+    return pd.Series(valores, index=series.index, name=series.name, dtype='datetime64[ns]')
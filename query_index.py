@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+# Índice invertido dos termos de pesquisa: cada palavra (e cada par de palavras
+# consecutivas) aponta para as linhas das consultas que a contêm, com custo,
+# cliques, impressões e conversões já somados por termo. Montado uma vez por
+# versão dos dados; consultas como "quais palavras puxam o custo" ou "pesquisas
+# com 'balonismo'" viram uma busca no índice em vez de regex sobre a coluna.
+
+METRICAS = ['Custo_num', 'Cliques_num', 'Impressões_num', 'Conversões_num']
+
+# Tamanho do termo -> rótulo na interface
+NGRAMAS = {1: 'Palavras', 2: 'Pares de palavras'}
+
+
+# Separa as consultas ao juntar todas em um texto só para um único split
+_SEPARADOR = '\x02'
+
+
+# Minúsculas e sem acentos ("Balão" e "balao" são o mesmo termo). Só as linhas
+# com caracteres fora do ASCII passam pela decomposição Unicode.
+def normalize_text(series):
+    textos = pd.Series(series, dtype=str).fillna('').str.lower()
+    acentuados = textos.str.contains(r'[^\x00-\x7f]', regex=True)
+    if acentuados.any():
+        textos[acentuados] = (textos[acentuados].str.normalize('NFKD')
+                              .str.replace(r'[^\x00-\x7f]', '', regex=True))
+    return textos
+
+
+# Consultas inteiras normalizadas, com um espaço entre as palavras
+def normalize_phrase(series):
+    textos = normalize_text(series)
+    irregulares = textos.str.contains(r'\s\s|^\s|\s$|[^\S ]', regex=True)
+    if irregulares.any():
+        textos[irregulares] = [' '.join(t.split()) for t in textos[irregulares]]
+    return textos
+
+
+def tokenize(texto):
+    return normalize_text([texto]).iloc[0].split()
+
+
+# Palavras de todas as consultas e a linha de cada uma. Um split sobre o texto
+# inteiro é bem mais rápido que str.split + explode em milhões de linhas.
+def _tokens(consultas):
+    normalizados = normalize_text(consultas)
+    if normalizados.empty:
+        return np.empty(0, dtype=object), np.empty(0, dtype=np.intp)
+    tokens = np.array(f' {_SEPARADOR} '.join(normalizados.to_numpy()).split(), dtype=object)
+    separadores = tokens == _SEPARADOR
+    return tokens[~separadores], np.cumsum(separadores)[~separadores]
+
+
+# Termos (palavras e depois pares de palavras consecutivas) e os pares
+# (termo, linha) sem repetição, ordenados por termo e linha. Os pares de
+# palavras são montados sobre os códigos inteiros das palavras, e só os pares
+# distintos viram texto.
+def _postings(consultas):
+    palavras, linhas = _tokens(consultas)
+    codigos, vocabulario = pd.factorize(palavras)
+    n_palavras = len(vocabulario)
+
+    mesma_consulta = linhas[:-1] == linhas[1:]
+    codigos_pares, pares = pd.factorize(codigos[:-1][mesma_consulta].astype(np.int64) * n_palavras
+                                        + codigos[1:][mesma_consulta])
+    vocabulario = np.asarray(vocabulario, dtype=object)
+    termos = np.concatenate([vocabulario, vocabulario[pares // n_palavras] + ' ' + vocabulario[pares % n_palavras]])
+    n_grama = np.repeat(np.array([1, 2], dtype=np.int8), [n_palavras, len(pares)])
+
+    codigos = np.concatenate([codigos, codigos_pares + n_palavras]).astype(np.int64)
+    linhas = np.concatenate([linhas, linhas[:-1][mesma_consulta]]).astype(np.int64)
+    n_linhas = int(linhas.max()) + 1 if len(linhas) else 1
+    chaves = np.sort(codigos * n_linhas + linhas)
+    chaves = chaves[np.concatenate([[True], chaves[1:] != chaves[:-1]])] if len(chaves) else chaves
+    return termos, n_grama, chaves // n_linhas, chaves % n_linhas
+
+
+# df: relatório de pesquisas (ou Pesquisas por palavra) com as colunas *_num
+def build_index(df, coluna='Pesquisar'):
+    df = df.reset_index(drop=True)
+    termos, n_grama, codigos, linhas = _postings(df[coluna])
+
+    # Formato CSR: as linhas do termo i ficam em posicoes[inicio[i]:inicio[i + 1]]
+    inicio = np.searchsorted(codigos, np.arange(len(termos) + 1))
+
+    estatisticas = pd.DataFrame({
+        'Termo': termos,
+        'N-grama': n_grama,
+        'Pesquisas': np.diff(inicio),
+    })
+    for metrica in METRICAS:
+        if metrica in df.columns:
+            valores = df[metrica].to_numpy(dtype='float64')[linhas]
+            estatisticas[metrica] = np.bincount(codigos, weights=valores, minlength=len(termos))
+
+    return {
+        'coluna': coluna,
+        'termos': pd.Index(termos),
+        'inicio': inicio,
+        'posicoes': linhas,
+        'estatisticas': estatisticas,
+    }
+
+
+def _term_rows(indice, termo):
+    i = indice['termos'].get_indexer([termo])[0]
+    if i < 0:
+        return np.empty(0, dtype=np.intp)
+    return indice['posicoes'][indice['inicio'][i]:indice['inicio'][i + 1]]
+
+
+# Termos que mais gastam (ou com mais cliques...), por tamanho de n-grama
+def top_terms(indice, n=20, ngrama=1, por='Custo_num'):
+    estatisticas = indice['estatisticas']
+    return estatisticas[estatisticas['N-grama'] == ngrama].nlargest(n, por)
+
+
+# Linhas (ordenadas) das consultas que contêm todas as palavras do texto em
+# sequência. Frases longas usam os pares do índice e só confirmam a ordem das
+# poucas candidatas restantes.
+def rows_containing(indice, texto, df=None):
+    palavras = tokenize(texto)
+    if not palavras:
+        return np.empty(0, dtype=np.intp)
+    if len(palavras) <= 2:
+        return np.sort(_term_rows(indice, ' '.join(palavras)))
+
+    candidatas = None
+    for a, b in zip(palavras[:-1], palavras[1:]):
+        linhas = _term_rows(indice, f"{a} {b}")
+        candidatas = linhas if candidatas is None else np.intersect1d(candidatas, linhas)
+        if len(candidatas) == 0:
+            return candidatas
+    candidatas = np.sort(candidatas)
+    if df is None:
+        return candidatas
+    frase = f" {' '.join(palavras)} "
+    textos = ' ' + normalize_phrase(df[indice['coluna']].to_numpy()[candidatas]) + ' '
+    return candidatas[textos.str.contains(frase, regex=False).to_numpy()]
+
+
+# Consultas que contêm o texto, com as métricas, ordenadas por custo
+def queries_containing(indice, df, texto, por='Custo_num'):
+    linhas = rows_containing(indice, texto, df)
+    return df.take(linhas).sort_values(por, ascending=False, kind='stable')
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# Projeções de conversões, faturamento e ROAS a partir dos cliques e do custo
+# reais da conta (os KPIs, já com os filtros) e de premissas do usuário: taxa
+# de conversão, ticket médio e variação do orçamento. A grade inteira de
+# cenários (taxa x ticket x orçamento) sai de uma só operação com broadcasting,
+# rápida o bastante para ser refeita a cada movimento dos sliders.
+
+TICKET_MEDIO = 600.0
+
+# Faixa de taxas de conversão (%) de turismo/experiências
+FAIXA_TAXAS = (2.0, 5.0)
+
+# Cenário -> taxa de conversão (%)
+CENARIOS = {
+    'Conservador': 1.0,
+    'Realista': 2.0,
+    'Otimista': 5.0,
+}
+
+# Pontos de cada eixo da grade do mapa de calor
+PONTOS_GRADE = 41
+
+# Os cliques crescem com o orçamento na potência ELASTICIDADE: 1 mantém o CPC
+# constante; abaixo de 1 cada clique adicional fica mais caro
+ELASTICIDADE = 1.0
+
+# Métrica -> (rótulo, formato) no mapa de calor
+METRICAS = {
+    'faturamento': ('Faturamento (R$)', 'R$ %{z:,.0f}'),
+    'roas': ('ROAS (%)', '%{z:.0f}%'),
+    'lucro': ('Faturamento - investimento (R$)', 'R$ %{z:,.0f}'),
+}
+
+
+# taxas (%), tickets (R$) e variações do orçamento (%) formam os três eixos;
+# cada resultado tem a forma (taxas, tickets, variações)
+def project(cliques, custo, taxas, tickets, variacoes=0.0, elasticidade=ELASTICIDADE):
+    taxas = np.atleast_1d(np.asarray(taxas, dtype='float64'))
+    tickets = np.atleast_1d(np.asarray(tickets, dtype='float64'))
+    variacoes = np.atleast_1d(np.asarray(variacoes, dtype='float64'))
+    forma = (len(taxas), len(tickets), len(variacoes))
+
+    fator = np.maximum(1 + variacoes / 100, 0.0)[None, None, :]
+    investimento = custo * fator
+    cliques_projetados = cliques * fator ** elasticidade
+    conversoes = cliques_projetados * taxas[:, None, None] / 100
+    faturamento = conversoes * tickets[None, :, None]
+    investimento = np.broadcast_to(investimento, forma)
+    conversoes = np.broadcast_to(conversoes, forma)
+    return {
+        'taxas': taxas,
+        'tickets': tickets,
+        'variacoes': variacoes,
+        'investimento': investimento,
+        'cliques': np.broadcast_to(cliques_projetados, forma),
+        'conversoes': conversoes,
+        'faturamento': faturamento,
+        'lucro': faturamento - investimento,
+        'roas': np.divide(faturamento * 100, investimento, out=np.zeros(forma), where=investimento > 0),
+        'custo_por_conversao': np.divide(investimento, conversoes, out=np.zeros(forma), where=conversoes > 0),
+    }
+
+
+# Grade taxa x ticket (de metade a uma vez e meia o ticket informado) para
+# uma variação de orçamento
+def grid(cliques, custo, faixa_taxas=FAIXA_TAXAS, ticket=TICKET_MEDIO, variacao=0.0, pontos=PONTOS_GRADE):
+    taxas = np.linspace(faixa_taxas[0], faixa_taxas[1], pontos)
+    tickets = np.linspace(ticket * 0.5, ticket * 1.5, pontos)
+    projecao = project(cliques, custo, taxas, tickets, variacao)
+    return {chave: valor[:, :, 0] if np.ndim(valor) == 3 else valor for chave, valor in projecao.items()}
+
+
+# Uma linha por cenário nomeado (CENARIOS ou outro {nome: taxa})
+def scenario_table(cliques, custo, ticket=TICKET_MEDIO, variacao=0.0, cenarios=None):
+    cenarios = cenarios or CENARIOS
+    projecao = project(cliques, custo, list(cenarios.values()), ticket, variacao)
+    return pd.DataFrame({
+        'Cenário': list(cenarios),
+        'Taxa de conversão (%)': projecao['taxas'],
+        'Conversões': projecao['conversoes'][:, 0, 0],
+        'Faturamento': projecao['faturamento'][:, 0, 0],
+        'ROAS (%)': projecao['roas'][:, 0, 0],
+        'Custo por conversão': projecao['custo_por_conversao'][:, 0, 0],
+    })
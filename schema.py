@@ -0,0 +1,358 @@
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from parsing import parse_currency, parse_number, parse_percentage, parse_week_label
+
+# Registro declarativo das exportações do Google Ads usadas pelo dashboard.
+# Cada relatório descreve o nome da exportação, as colunas lidas (com o tipo e
+# o nome da coluna numérica derivada) e como consolidar vários períodos. Cada
+# aba carrega só os relatórios que acessa (LazyReports).
+
+SCHEMA_VERSION = 5
+
+# Tipos de coluna
+TEXTO = 'texto'
+INTEIRO = 'inteiro'
+MOEDA = 'moeda'
+CONTAGEM = 'contagem'
+PORCENTAGEM = 'porcentagem'
+SEMANA = 'semana'  # rótulo "Semana de 7 de abr. de 2025", derivado em datetime64
+
+# Como consolidar exportações de períodos diferentes
+SOMA = 'soma'        # períodos sem sobreposição são somados por chave
+ULTIMO = 'ultimo'    # cada chave fica com a linha da exportação mais recente
+
+# Colunas derivadas que não são aditivas e são recalculadas após a soma
+RAZAO = 'razao'                  # numerador / denominador
+PARTICIPACAO = 'participacao'    # % do total da coluna
+CTR_IMPLICITO = 'ctr_implicito'  # CTR sem coluna de impressões: cliques / (cliques / CTR)
+
+_PARSERS = {
+    MOEDA: parse_currency,
+    CONTAGEM: parse_number,
+    PORCENTAGEM: parse_percentage,
+    SEMANA: parse_week_label,
+}
+
+# exportacao: (prefixo, variante) do nome do arquivo, ex. "Dia_e_hora(Dia_...)"
+# colunas: nome na exportação -> (tipo, coluna numérica derivada ou None)
+# metricas: colunas de metrics usadas pelas abas, guardadas com o relatório
+REPORTS = {
+    'campanhas': {
+        'exportacao': ('Campanhas', None),
+        'chave': ('Nome da campanha',),
+        'agregacao': SOMA,
+        'recalculo': {'CTR_num': (CTR_IMPLICITO, 'Cliques_num')},
+        'colunas': {
+            'Nome da campanha': (TEXTO, None),
+            'Status da campanha': (TEXTO, None),
+            'Custo': (MOEDA, 'Custo_num'),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+            'CTR': (PORCENTAGEM, 'CTR_num'),
+        },
+    },
+    'dispositivos': {
+        'exportacao': ('Dispositivos', None),
+        'chave': ('Dispositivo',),
+        'agregacao': SOMA,
+        'colunas': {
+            'Dispositivo': (TEXTO, None),
+            'Custo': (MOEDA, 'Custo_num'),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+        },
+        'metricas': ('CPC_num', 'CTR_num'),
+    },
+    'idade': {
+        'exportacao': ('Informações_demográficas', 'Idade'),
+        'chave': ('Faixa de idade',),
+        'agregacao': SOMA,
+        'recalculo': {'Porcentagem_num': (PARTICIPACAO, 'Impressões_num')},
+        'colunas': {
+            'Faixa de idade': (TEXTO, None),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'Porcentagem do total conhecido': (PORCENTAGEM, 'Porcentagem_num'),
+        },
+    },
+    'sexo': {
+        'exportacao': ('Informações_demográficas', 'Sexo'),
+        'chave': ('Sexo',),
+        'agregacao': SOMA,
+        'recalculo': {'Porcentagem_num': (PARTICIPACAO, 'Impressões_num')},
+        'colunas': {
+            'Sexo': (TEXTO, None),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'Porcentagem do total conhecido': (PORCENTAGEM, 'Porcentagem_num'),
+        },
+    },
+    'sexo_idade': {
+        'exportacao': ('Informações_demográficas', 'Sexo_Idade'),
+        'chave': ('Sexo', 'Faixa de idade'),
+        'agregacao': SOMA,
+        'recalculo': {'Porcentagem_num': (PARTICIPACAO, 'Impressões_num')},
+        'colunas': {
+            'Sexo': (TEXTO, None),
+            'Faixa de idade': (TEXTO, None),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'Porcentagem do total conhecido': (PORCENTAGEM, 'Porcentagem_num'),
+        },
+    },
+    'palavras_chave': {
+        'exportacao': ('Palavras-chave_de_pesquisa', None),
+        'chave': ('Palavra-chave da rede de pesquisa', 'Tipo de corresp.'),
+        'agregacao': SOMA,
+        'recalculo': {'CTR_num': (CTR_IMPLICITO, 'Cliques_num')},
+        'colunas': {
+            'Palavra-chave da rede de pesquisa': (TEXTO, None),
+            'Tipo de corresp.': (TEXTO, None),
+            'Status do critério': (TEXTO, None),
+            'Custo': (MOEDA, 'Custo_num'),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+            'CTR': (PORCENTAGEM, 'CTR_num'),
+        },
+        'metricas': ('CPC_num',),
+    },
+    'pesquisas': {
+        'exportacao': ('Pesquisas', 'Pesquisar'),
+        'chave': ('Pesquisar',),
+        'agregacao': SOMA,
+        'colunas': {
+            'Pesquisar': (TEXTO, None),
+            'Custo': (MOEDA, 'Custo_num'),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'Conversões': (CONTAGEM, 'Conversões_num'),
+        },
+    },
+    'pesquisas_palavra': {
+        'exportacao': ('Pesquisas', 'Palavra'),
+        'chave': ('Palavra',),
+        'agregacao': SOMA,
+        'colunas': {
+            'Palavra': (TEXTO, None),
+            'Custo': (MOEDA, 'Custo_num'),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'Conversões': (CONTAGEM, 'Conversões_num'),
+            'Principais consultas com a palavra': (TEXTO, None),
+        },
+    },
+    'serie_temporal': {
+        'exportacao': ('Série_temporal', None),
+        'chave': ('Semana',),
+        'agregacao': ULTIMO,
+        # Cada exportação reenvia todo o histórico: só semanas novas ou alteradas são processadas
+        'incremental': True,
+        'colunas': {
+            'Semana': (SEMANA, 'Data'),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+            'CPC méd.': (MOEDA, 'CPC_num'),
+            'Custo': (MOEDA, 'Custo_num'),
+        },
+    },
+    'redes': {
+        'exportacao': ('Redes', None),
+        'chave': ('Rede',),
+        'agregacao': SOMA,
+        'recalculo': {'CPC_num': (RAZAO, 'Custo_num', 'Cliques_num')},
+        'colunas': {
+            'Rede': (TEXTO, None),
+            'Cliques': (CONTAGEM, 'Cliques_num'),
+            'Custo': (MOEDA, 'Custo_num'),
+            'CPC méd.': (MOEDA, 'CPC_num'),
+        },
+    },
+    'dia_hora': {
+        'exportacao': ('Dia_e_hora', 'Dia'),
+        'chave': ('Dia',),
+        'agregacao': SOMA,
+        'colunas': {
+            'Dia': (TEXTO, None),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+        },
+    },
+    'hora': {
+        'exportacao': ('Dia_e_hora', 'Hora'),
+        'chave': ('Hora de início',),
+        'agregacao': SOMA,
+        'colunas': {
+            'Hora de início': (INTEIRO, None),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+        },
+    },
+    'dia_hora_detalhado': {
+        'exportacao': ('Dia_e_hora', 'Dia_Hora'),
+        'chave': ('Dia', 'Hora de início'),
+        'agregacao': SOMA,
+        'colunas': {
+            'Dia': (TEXTO, None),
+            'Hora de início': (INTEIRO, None),
+            'Impressões': (CONTAGEM, 'Impressões_num'),
+        },
+    },
+    'otimizacao': {
+        'exportacao': ('Pontuação_de_otimização', None),
+        'chave': ('Nome da campanha',),
+        'agregacao': ULTIMO,
+        'colunas': {
+            'Pontuação de otimização': (PORCENTAGEM, 'Pontuação_num'),
+            'Nome da campanha': (TEXTO, None),
+        },
+    },
+}
+
+
+def _read_options(nome):
+    colunas = REPORTS[nome]['colunas']
+    # Tudo é lido como texto: o separador de milhar pt-BR ("2.260") seria
+    # interpretado como decimal se o pandas inferisse o tipo sozinho.
+    dtype = {col: ('int64' if tipo == INTEIRO else str) for col, (tipo, _) in colunas.items()}
+    return {'usecols': list(colunas), 'dtype': dtype}
+
+
+# Deriva as colunas *_num a partir das colunas de texto lidas do CSV
+def derive_columns(nome, df):
+    for col, (tipo, derivada) in REPORTS[nome]['colunas'].items():
+        if derivada:
+            df[derivada] = _PARSERS[tipo](df[col])
+    return df
+
+
+# Lê as colunas declaradas de um relatório, ainda como texto
+def read_raw(nome, path):
+    return pd.read_csv(path, **_read_options(nome))
+
+
+# Lê um relatório apenas com as colunas declaradas e deriva as colunas *_num
+def load_report(nome, path):
+    return derive_columns(nome, read_raw(nome, path))
+
+
+# Mesma leitura em blocos de `chunksize` linhas, cada bloco já limpo
+def iter_report(nome, path, chunksize):
+    with pd.read_csv(path, chunksize=chunksize, **_read_options(nome)) as leitor:
+        for bloco in leitor:
+            yield derive_columns(nome, bloco)
+
+
+# Colunas mantidas depois da consolidação: chave, textos e colunas *_num
+def consolidated_columns(nome):
+    spec = REPORTS[nome]
+    chave = list(spec['chave'])
+    textos = [col for col, (_, derivada) in spec['colunas'].items() if derivada is None and col not in chave]
+    derivadas = [derivada for _, derivada in spec['colunas'].values() if derivada]
+    return chave, textos, derivadas
+
+
+# Tipo de cada coluna de um relatório já consolidado (textos, inteiros e *_num).
+# Colunas da chave com derivada (Semana -> Data) continuam como texto.
+def _column_types(nome):
+    chave = REPORTS[nome]['chave']
+    tipos = {}
+    for col, (tipo, derivada) in REPORTS[nome]['colunas'].items():
+        if derivada is None or col in chave:
+            tipos[col] = tipo if derivada is None else TEXTO
+        if derivada:
+            tipos[derivada] = tipo
+    return tipos
+
+
+# Texto vira categórico quando os valores se repetem (Dia, Sexo, Dispositivo...);
+# colunas quase únicas, como os termos de pesquisa, continuam como texto
+_PROPORCAO_CATEGORIA = 0.5
+
+
+def _smallest_int(valores):
+    return pd.to_numeric(valores.astype('int64'), downcast='integer')
+
+
+# Representação compacta guardada nos caches (memória e disco): dimensões como
+# categóricas, contagens no menor inteiro que comporta os valores e dinheiro em
+# centavos inteiros. Colunas recalculadas após a soma (razões) ficam em float e
+# as métricas derivadas declaradas em 'metricas' em float32.
+def compact(nome, df):
+    recalculo = REPORTS[nome].get('recalculo', {})
+    colunas = {}
+    for col, tipo in _column_types(nome).items():
+        if col not in df.columns:
+            continue
+        valores = df[col]
+        if tipo == TEXTO:
+            if len(valores) and valores.nunique(dropna=False) <= len(valores) * _PROPORCAO_CATEGORIA:
+                valores = valores.astype('category')
+        elif tipo == INTEIRO:
+            valores = _smallest_int(valores)
+        elif tipo == CONTAGEM and np.array_equal(valores, np.round(valores)):
+            valores = _smallest_int(valores)
+        elif tipo == MOEDA and col not in recalculo:
+            valores = _smallest_int(np.round(valores * 100))
+        colunas[col] = valores
+    for col in REPORTS[nome].get('metricas', ()):
+        if col in df.columns and col not in colunas:
+            colunas[col] = df[col].astype('float32')
+    return pd.DataFrame(colunas, index=df.index)
+
+
+# Volta à representação usada pelas abas e gráficos: *_num em float64 (reais,
+# não centavos) e textos com o tipo original. Não altera o DataFrame recebido.
+def expand(nome, df):
+    df = df.copy(deep=False)
+    for col, tipo in _column_types(nome).items():
+        if col not in df.columns:
+            continue
+        valores = df[col]
+        if tipo == TEXTO and isinstance(valores.dtype, pd.CategoricalDtype):
+            df[col] = valores.astype(valores.dtype.categories.dtype)
+        elif tipo == INTEIRO:
+            df[col] = valores.astype('int64')
+        elif tipo == MOEDA and pd.api.types.is_integer_dtype(valores.dtype):
+            df[col] = valores / 100
+        elif tipo in (CONTAGEM, MOEDA, PORCENTAGEM):
+            df[col] = valores.astype('float64')
+    for col in REPORTS[nome].get('metricas', ()):
+        if col in df.columns:
+            df[col] = df[col].astype('float64')
+    return df
+
+
+# Memória (deep) ocupada por cada relatório, para o painel de desempenho e o benchmark
+def memory_report(frames):
+    linhas = []
+    for nome, df in frames.items():
+        linhas.append({
+            'Relatório': nome,
+            'Linhas': len(df),
+            'Memória (KB)': df.memory_usage(deep=True).sum() / 1024,
+        })
+    return pd.DataFrame(linhas, columns=['Relatório', 'Linhas', 'Memória (KB)'])
+
+
+# Dicionário de relatórios carregados sob demanda: o arquivo só é lido
+# quando a chave é acessada pela primeira vez. `versao` identifica o conjunto
+# de exportações e serve de chave para caches derivados dos dados.
+class LazyReports(Mapping):
+    def __init__(self, loader, nomes=None, versao=None):
+        self.versao = versao
+        self._loader = loader
+        self._nomes = list(nomes or REPORTS)
+        self._carregados = {}
+
+    def __getitem__(self, nome):
+        if nome not in self._nomes:
+            raise KeyError(nome)
+        if nome not in self._carregados:
+            self._carregados[nome] = self._loader(nome)
+        return self._carregados[nome]
+
+    # Sem carregar o relatório (o __contains__ de Mapping chamaria __getitem__)
+    def __contains__(self, nome):
+        return nome in self._nomes
+
+    def __iter__(self):
+        return iter(self._nomes)
+
+    def __len__(self):
+        return len(self._nomes)
@@ -0,0 +1,112 @@
+import os
+
+import pandas as pd
+
+from schema import REPORTS, SOMA, consolidated_columns, iter_report
+
+# Ingestão em blocos das exportações de termos de pesquisa, que em contas
+# grandes passam de milhões de linhas. Cada bloco é limpo (moeda, números) e
+# somado por termo logo em seguida, então o pico de memória é de um bloco de
+# texto cru mais a tabela de termos distintos, e não o CSV inteiro.
+
+# Relatórios lidos em blocos quando o arquivo passa do limite
+RELATORIOS_STREAMING = ('pesquisas', 'pesquisas_palavra')
+LIMITE_STREAMING = int(os.environ.get('ADS_LIMITE_STREAMING_MB', '64')) * 1024 * 1024
+
+# Linhas por bloco
+CHUNK_LINHAS = 50_000
+
+# Limite opcional de termos na carga em blocos do dashboard (ADS_MAX_TERMOS):
+# ficam os de maior custo, com a memória limitada independentemente do tamanho
+# do arquivo, mas os termos da cauda ficam de fora ou subestimados
+# (fold_report) e o dashboard avisa nas abas afetadas. Sem a variável, todos
+# os termos são mantidos e as somas são exatas.
+MAX_TERMOS = int(os.environ.get('ADS_MAX_TERMOS', '0')) or None
+
+
+def should_stream(nome, path):
+    return nome in RELATORIOS_STREAMING and os.path.getsize(path) > LIMITE_STREAMING
+
+
+# Equivalente a schema.load_report, mas lendo em blocos e já descartando as
+# colunas de texto das métricas (as mesmas que a consolidação descarta). Mantém
+# todas as linhas: é a referência do benchmark para a carga agregada.
+def load_report_chunked(nome, path, chunksize=CHUNK_LINHAS):
+    chave, textos, derivadas = consolidated_columns(nome)
+    colunas = chave + textos + derivadas
+    blocos = [bloco[colunas] for bloco in iter_report(nome, path, chunksize)]
+    if not blocos:
+        return pd.DataFrame(columns=colunas)
+    return pd.concat(blocos, ignore_index=True)
+
+
+# Soma as métricas por termo; os textos ficam com o valor mais recente
+def _sum_by_key(nome, df):
+    chave, textos, derivadas = consolidated_columns(nome)
+    agregacoes = {col: 'sum' for col in derivadas}
+    agregacoes.update({col: 'last' for col in textos})
+    return df.groupby(chave, sort=False, dropna=False).agg(agregacoes)
+
+
+# Agrega um ou mais CSVs de um relatório somado em blocos: totais gerais, totais
+# por termo e os top_n termos por `ordenar_por`. Com max_termos a tabela por
+# termo é podada aos max_termos maiores a cada compactação, limitando a memória;
+# os totais gerais continuam exatos, mas termos da cauda que voltem a aparecer
+# em blocos seguintes podem ficar subestimados ('aproximado': True).
+def fold_report(nome, paths, top_n=100, ordenar_por='Cliques_num', max_termos=None, chunksize=CHUNK_LINHAS):
+    spec = REPORTS[nome]
+    if spec['agregacao'] != SOMA or spec.get('recalculo'):
+        raise ValueError(f"O relatório '{nome}' não pode ser agregado em blocos")
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    chave, textos, derivadas = consolidated_columns(nome)
+
+    totais = dict.fromkeys(derivadas, 0.0)
+    linhas = 0
+    acumulado = None
+    pendentes, linhas_pendentes = [], 0
+    aproximado = False
+    # Compacta quando as somas parciais pendentes passam deste número de linhas
+    # (ou do tamanho do acumulado, para não reagrupar a tabela inteira a cada bloco)
+    limite = max(max_termos or 0, chunksize)
+
+    def compactar():
+        nonlocal acumulado, pendentes, linhas_pendentes, aproximado
+        acumulado = _sum_by_key(nome, pd.concat(([acumulado] if acumulado is not None else []) + pendentes))
+        pendentes, linhas_pendentes = [], 0
+        if max_termos and len(acumulado) > max_termos:
+            acumulado = acumulado.nlargest(max_termos, ordenar_por)
+            aproximado = True
+
+    for path in paths:
+        for bloco in iter_report(nome, path, chunksize):
+            linhas += len(bloco)
+            for col in derivadas:
+                totais[col] += float(bloco[col].sum())
+            parcial = _sum_by_key(nome, bloco)
+            pendentes.append(parcial)
+            linhas_pendentes += len(parcial)
+            if linhas_pendentes > max(limite, len(acumulado) if acumulado is not None else 0):
+                compactar()
+    if pendentes:
+        compactar()
+
+    if acumulado is None:
+        termos = pd.DataFrame(columns=chave + textos + derivadas)
+    else:
+        termos = acumulado.sort_values(ordenar_por, ascending=False, kind='stable').reset_index()
+        termos = termos[chave + textos + derivadas]
+    return {
+        'linhas': linhas,
+        'totais': totais,
+        'termos': termos,
+        'top': termos.head(top_n),
+        'aproximado': aproximado,
+    }
+
+
+# Carga do dashboard: o relatório já somado por termo (uma linha por termo,
+# como fica depois da consolidação), agregado em blocos com memória limitada
+def load_report_folded(nome, path, max_termos=MAX_TERMOS, chunksize=CHUNK_LINHAS):
+    return fold_report(nome, path, top_n=0, ordenar_por='Custo_num', max_termos=max_termos,
+                       chunksize=chunksize)['termos']
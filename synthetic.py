@@ -0,0 +1,122 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import discovery
+from schema import CONTAGEM, MOEDA, PORCENTAGEM, REPORTS, derive_columns, read_raw
+
+# Exportações sintéticas no formato do Google Ads, geradas a partir das
+# exportações de exemplo em qualquer escala: moeda "R$ 1.234,56" (com o
+# espaço não quebrável do Google), milhar com ponto, porcentagens "3,41%",
+# mesmos nomes de arquivo, cabeçalhos e colunas extras. Usadas pelos
+# benchmarks para medir o pipeline em contas 100x ou 10.000x maiores.
+# Uso: python synthetic.py destino --escala 100
+
+# Relatórios cujo número de linhas cresce com o tamanho da conta. Os demais
+# (dias, horas, idades, dispositivos, semanas) têm domínio fixo e são copiados.
+ESCALAVEIS = ('campanhas', 'palavras_chave', 'pesquisas', 'pesquisas_palavra')
+
+_SILABAS = np.array([c + v for c in 'bcdfglmnprstv' for v in 'aeiou'], dtype=object)
+
+
+def format_currency(centavos):
+    reais, cent = np.divmod(np.asarray(centavos, dtype=np.int64), 100)
+    return [f"R$\xa0{r:,}".replace(',', '.') + f",{c:02d}" for r, c in zip(reais, cent)]
+
+
+def format_count(valores):
+    return [f"{v:,}".replace(',', '.') for v in np.asarray(valores, dtype=np.int64)]
+
+
+# Contagens fracionárias (conversões), ex. "1,00"
+def format_decimal(valores):
+    return [f"{v:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.') for v in np.asarray(valores)]
+
+
+def format_percentage(valores):
+    return [f"{v:.2f}%".replace('.', ',') for v in np.asarray(valores, dtype='float64')]
+
+
+# Palavra inventada e distinta para cada inteiro (sílabas em base 65)
+def _unique_words(numeros):
+    palavras = []
+    for n in numeros:
+        silabas = []
+        while True:
+            n, resto = divmod(int(n), len(_SILABAS))
+            silabas.append(_SILABAS[resto])
+            if n == 0:
+                break
+        palavras.append(''.join(silabas))
+    return palavras
+
+
+# Valores da amostra com ruído multiplicativo (média 1), preservando a distribuição
+def _perturb(valores, rng):
+    return valores * rng.lognormal(-0.125, 0.5, len(valores))
+
+
+def _synthetic_rows(nome, bruto, escala, rng):
+    n = len(bruto) * escala
+    origem = np.concatenate([np.arange(len(bruto)), rng.integers(0, len(bruto), n - len(bruto))])
+    linhas = bruto.iloc[origem].reset_index(drop=True)
+    extras = slice(len(bruto), None)
+
+    # As linhas além da amostra ganham uma palavra distinta na chave (termos,
+    # palavras-chave e campanhas novos, como numa conta maior)
+    chave = REPORTS[nome]['chave'][0]
+    sufixos = _unique_words(np.arange(n - len(bruto)))
+    linhas.loc[len(bruto):, chave] = [f"{t} {s}" for t, s in zip(linhas[chave].to_numpy()[extras], sufixos)]
+
+    colunas = REPORTS[nome]['colunas']
+    numericos = derive_columns(nome, linhas.iloc[len(bruto):][list(colunas)].copy())
+    for col, (tipo, derivada) in colunas.items():
+        if tipo not in (MOEDA, CONTAGEM, PORCENTAGEM):
+            continue
+        valores = _perturb(numericos[derivada].to_numpy(dtype='float64'), rng)
+        if tipo == MOEDA:
+            texto = format_currency(np.round(valores * 100))
+        elif tipo == PORCENTAGEM:
+            texto = format_percentage(np.clip(valores, 0, 100))
+        elif bruto[col].str.contains(',', regex=False).any():
+            texto = format_decimal(np.round(valores))
+        else:
+            texto = format_count(np.round(valores))
+        linhas.loc[len(bruto):, col] = texto
+    return linhas
+
+
+# Gera em `destino` as exportações de `origem` com os relatórios escaláveis
+# `escala` vezes maiores. Devolve {relatorio: linhas geradas}.
+def generate_client(destino, escala=1, origem='.', seed=42):
+    rng = np.random.default_rng(seed)
+    os.makedirs(destino, exist_ok=True)
+    linhas = {}
+    for nome, exportacoes in discovery.discover(origem).items():
+        for exp in exportacoes:
+            arquivo = os.path.join(destino, os.path.basename(exp.path))
+            if nome not in ESCALAVEIS or escala == 1:
+                shutil.copy(exp.path, arquivo)
+                linhas[nome] = linhas.get(nome, 0) + len(read_raw(nome, exp.path))
+                continue
+            # Todas as colunas como texto, para regravar o CSV como o Google exporta
+            bruto = pd.read_csv(exp.path, dtype=str, keep_default_na=False)
+            sintetico = _synthetic_rows(nome, bruto, escala, rng)
+            sintetico.to_csv(arquivo, index=False, encoding='utf-8')
+            linhas[nome] = linhas.get(nome, 0) + len(sintetico)
+    return linhas
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gera exportações sintéticas do Google Ads')
+    parser.add_argument('destino')
+    parser.add_argument('--escala', type=int, default=100)
+    parser.add_argument('--origem', default='.')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    for nome, n in generate_client(args.destino, args.escala, args.origem, args.seed).items():
+        print(f"{nome:<20} {n:>12,} linhas")
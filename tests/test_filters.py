@@ -0,0 +1,84 @@
+import pandas as pd
+
+import filters
+import keyword_match
+import negatives
+import query_index
+from schema import LazyReports
+
+
+def _dados():
+    relatorios = {
+        'palavras_chave': pd.DataFrame({
+            keyword_match.COLUNA_PALAVRA: ['voo de balao', 'balao', 'passeio bonito'],
+            'Tipo de corresp.': ['Corresp. exata', 'Corresp. ampla', 'Corresp. ampla'],
+            'Status do critério': ['Ativado', 'Removido', 'Ativado'],
+            'Cliques_num': [4.0, 2.0, 1.0],
+            'Custo_num': [10.0, 5.0, 1.0],
+            'Participacao_custo_num': [62.5, 31.25, 6.25],
+        }),
+        'pesquisas': pd.DataFrame({
+            'Pesquisar': ['voo de balao', 'balao pantanal', 'hotel bonito'],
+            'Custo_num': [10.0, 5.0, 2.0],
+            'Cliques_num': [4.0, 2.0, 1.0],
+            'Impressões_num': [40.0, 20.0, 10.0],
+            'Conversões_num': [1.0, 0.0, 0.0],
+        }),
+    }
+    return LazyReports(relatorios.__getitem__, nomes=list(relatorios), versao='v1')
+
+
+def _filtrar(selecao):
+    dados = _dados()
+    indices = {}
+
+    def load_index(nome):
+        if nome not in indices:
+            indices[nome] = filters.build_index(nome, dados[nome])
+        return indices[nome]
+
+    return filters.filter_reports(dados, selecao, load_index)
+
+
+def test_filtro_por_categoria():
+    filtrados = _filtrar({'status_criterio': ['Ativado']})
+    palavras = filtrados['palavras_chave']
+    assert palavras[keyword_match.COLUNA_PALAVRA].tolist() == ['voo de balao', 'passeio bonito']
+    # Participação recalculada sobre as linhas que ficaram
+    assert palavras['Participacao_custo_num'].tolist() == [10 / 11 * 100, 1 / 11 * 100]
+    assert filtrados.versao != 'v1'
+
+
+# Nenhuma palavra-chave exata removida: a interseção é vazia e o resto do
+# painel (correspondência e negativas) precisa seguir funcionando
+def test_intersecao_vazia():
+    filtrados = _filtrar({'tipo_correspondencia': ['Corresp. exata'], 'status_criterio': ['Removido']})
+    palavras = filtrados['palavras_chave']
+    pesquisas = filtrados['pesquisas']
+    assert palavras.empty
+    assert list(palavras.columns) == list(_dados()['palavras_chave'].columns)
+    assert len(pesquisas) == 3
+
+    indice = query_index.build_index(pesquisas)
+    correspondencia = keyword_match.match_keywords(palavras, pesquisas, indice)
+    assert correspondencia['pesquisas']['Palavra-chave atribuída'].isna().all()
+    assert correspondencia['cobertura_custo'] == 0.0
+
+    negativas = negatives.mine_negatives(pesquisas, indice, palavras)
+    assert negativas['termos']['Pesquisar'].tolist() == ['balao pantanal', 'hotel bonito']
+    assert negativas['custo_desperdicado'] == 7.0
+
+
+# Sem nenhum termo de pesquisa (ex. relatório vazio no período)
+def test_sem_pesquisas():
+    dados = _dados()
+    pesquisas = dados['pesquisas'].iloc[:0]
+    indice = query_index.build_index(pesquisas)
+
+    correspondencia = keyword_match.match_keywords(dados['palavras_chave'], pesquisas, indice)
+    assert correspondencia['pesquisas'].empty
+    assert correspondencia['cobertura_pesquisas'] == 0.0
+
+    negativas = negatives.mine_negatives(pesquisas, indice, dados['palavras_chave'])
+    assert negativas['termos'].empty and negativas['palavras'].empty
+    assert negativas['custo_total'] == 0.0
@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+
+import discovery
+import incremental
+import schema
+from parsing import MESES_PT
+
+NOME = 'serie_temporal'
+MESES = {numero: nome for nome, numero in MESES_PT.items()}
+
+
+@pytest.fixture(autouse=True)
+def _sem_estado_em_memoria():
+    incremental._estados.clear()
+    yield
+    incremental._estados.clear()
+
+
+def _semanas(cliques):
+    datas = pd.date_range('2025-01-06', periods=len(cliques), freq='W-MON')
+    return pd.DataFrame({
+        'Semana': [f"Semana de {d.day} de {MESES[d.month]}. de {d.year}" for d in datas],
+        'Cliques': [f"{c:,}".replace(',', '.') for c in cliques],
+        'Impressões': [f"{c * 30:,}".replace(',', '.') for c in cliques],
+        'CPC méd.': 'R$ 1,00',
+        'Custo': [f"R$ {c},00" for c in cliques],
+    })
+
+
+# Grava as exportações (todas desde 2025-01-06, cada uma uma semana mais longa) e devolve as Exportacao
+def _exportar(pasta, tabelas):
+    for i, tabela in enumerate(tabelas):
+        tabela.to_csv(pasta / f"Série_temporal(2025.01.06-2025.02.{10 + i:02d}).csv", index=False)
+    return discovery.discover(pasta)[NOME]
+
+
+# Conta as linhas lidas de cada exportação, para saber se só a parte nova foi lida
+def _contar_leituras(monkeypatch):
+    lidas = []
+    original = incremental.read_raw
+
+    def read_raw(nome, path):
+        bruto = original(nome, path)
+        lidas.append(len(bruto))
+        return bruto
+
+    monkeypatch.setattr(incremental, 'read_raw', read_raw)
+    return lidas
+
+
+def _conferir(estado, exportacao):
+    esperado = schema.load_report(NOME, exportacao.path)
+    assert estado['semanas']['Semana'].tolist() == esperado['Semana'].tolist()
+    assert estado['semanas']['Cliques_num'].tolist() == esperado['Cliques_num'].tolist()
+    assert estado['agregados'] == incremental.week_aggregates(esperado['Cliques_num'])
+
+
+def test_semanas_acrescentadas(tmp_path, monkeypatch):
+    cliques = [5, 0, 12, 3, 7, 1, 0, 4]
+    exportacoes = _exportar(tmp_path, [_semanas(cliques), _semanas(cliques + [9, 2])])
+    lidas = _contar_leituras(monkeypatch)
+
+    incremental.refresh(NOME, exportacoes[:1])
+    estado = incremental.refresh(NOME, exportacoes)
+
+    # Prefixo igual: só as últimas LINHAS_REVISAVEIS linhas da anterior e as duas novas são lidas
+    assert lidas == [len(cliques), incremental.LINHAS_REVISAVEIS + 2]
+    _conferir(estado, exportacoes[-1])
+
+
+# Conversões atrasadas: a última semana da exportação anterior (que tinha o pico) é revisada para baixo
+def test_semana_final_revisada(tmp_path, monkeypatch):
+    cliques = [5, 0, 12, 3, 7, 1, 0, 40]
+    revisados = cliques[:-1] + [6, 2]
+    exportacoes = _exportar(tmp_path, [_semanas(cliques), _semanas(revisados)])
+    lidas = _contar_leituras(monkeypatch)
+
+    incremental.refresh(NOME, exportacoes[:1])
+    estado = incremental.refresh(NOME, exportacoes)
+
+    assert lidas == [len(cliques), incremental.LINHAS_REVISAVEIS + 1]
+    assert estado['agregados']['pico_cliques'] == 12.0
+    _conferir(estado, exportacoes[-1])
+
+
+# Uma linha antiga mudou: o prefixo não confere e a exportação é relida inteira
+def test_prefixo_alterado(tmp_path, monkeypatch):
+    cliques = [5, 0, 12, 3, 7, 1, 0, 4]
+    alterados = [5, 8] + cliques[2:] + [9]
+    exportacoes = _exportar(tmp_path, [_semanas(cliques), _semanas(alterados)])
+    lidas = _contar_leituras(monkeypatch)
+
+    incremental.refresh(NOME, exportacoes[:1])
+    estado = incremental.refresh(NOME, exportacoes)
+
+    assert lidas == [len(cliques), len(alterados)]
+    _conferir(estado, exportacoes[-1])
+
+
+# O estado gravado em disco é reaproveitado por um processo novo
+def test_estado_persistido(tmp_path, monkeypatch):
+    cliques = [5, 0, 12, 3, 7, 1, 0, 4]
+    exportacoes = _exportar(tmp_path, [_semanas(cliques), _semanas(cliques + [9])])
+    incremental.refresh(NOME, exportacoes[:1])
+
+    incremental._estados.clear()
+    lidas = _contar_leituras(monkeypatch)
+    estado = incremental.refresh(NOME, exportacoes)
+
+    assert lidas == [incremental.LINHAS_REVISAVEIS + 1]
+    _conferir(estado, exportacoes[-1])
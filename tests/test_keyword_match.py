@@ -0,0 +1,43 @@
+import pandas as pd
+
+import keyword_match
+import query_index
+
+
+def _pesquisas():
+    return pd.DataFrame({
+        'Pesquisar': ['voo de balao', 'balao pantanal', 'hotel bonito'],
+        'Custo_num': [10.0, 5.0, 2.0],
+        'Cliques_num': [4.0, 2.0, 1.0],
+    })
+
+
+def _palavras_chave(textos, tipos):
+    return pd.DataFrame({
+        keyword_match.COLUNA_PALAVRA: textos,
+        'Tipo de corresp.': tipos,
+        'Status do critério': 'Ativado',
+        'Cliques_num': 1.0,
+    })
+
+
+def test_correspondencias():
+    palavras = _palavras_chave(['voo de balao', 'balao'], ['Corresp. exata', 'Corresp. ampla'])
+    resultado = keyword_match.match_keywords(palavras, _pesquisas())
+    atribuidas = resultado['pesquisas']['Palavra-chave atribuída']
+    assert atribuidas[:2].tolist() == ['voo de balao', 'balao']
+    assert pd.isna(atribuidas[2])
+    assert resultado['pesquisas_sobrepostas'] == 1
+
+
+# Filtros da sidebar podem não deixar nenhuma palavra-chave
+def test_sem_palavras_chave():
+    pesquisas = _pesquisas()
+    palavras = _palavras_chave([], [])
+    resultado = keyword_match.match_keywords(palavras, pesquisas, query_index.build_index(pesquisas))
+    assert resultado['pesquisas']['Palavra-chave atribuída'].isna().all()
+    assert len(resultado['sem_palavra_chave']) == len(pesquisas)
+    assert resultado['palavras_chave'].empty
+    assert resultado['sobreposicao'].empty
+    assert resultado['cobertura_pesquisas'] == 0.0
+    assert resultado['cobertura_custo'] == 0.0
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import parsing
+
+
+def test_moeda():
+    valores = pd.Series(['R$ 1.988,83', 'R$\xa00,50', 'R$ 1.234.567,00', '--', None])
+    assert parsing.parse_currency(valores).tolist() == [1988.83, 0.5, 1234567.0, 0.0, 0.0]
+
+
+# Ponto é separador de milhar, não decimal: "2.260" são 2260 cliques
+def test_numero():
+    valores = pd.Series(['2.260', '64.469', '0', '1,5', ' --', np.nan])
+    assert parsing.parse_number(valores).tolist() == [2260.0, 64469.0, 0.0, 1.5, 0.0, 0.0]
+
+
+def test_porcentagem():
+    valores = pd.Series(['3,41%', '100,00%', '< 10%', ''])
+    assert parsing.parse_percentage(valores).tolist() == [3.41, 100.0, 0.0, 0.0]
+
+
+# Colunas já numéricas (lidas pelo pandas como int/float) passam direto
+def test_coluna_numerica():
+    assert parsing.parse_number(pd.Series([3, 4])).tolist() == [3.0, 4.0]
+    assert parsing.parse_currency(pd.Series([1.5, np.nan])).tolist() == [1.5, 0.0]
+
+
+# A versão vetorizada deve concordar com as funções clean_* célula a célula
+def test_mesma_semantica_das_funcoes_escalares():
+    valores = pd.Series(['R$ 1.988,83', '2.260', '3,41%', 'abc', '', None, 7])
+    for vetorizada, escalar in (
+        (parsing.parse_currency, parsing.clean_currency_value),
+        (parsing.parse_number, parsing.clean_number),
+        (parsing.parse_percentage, parsing.clean_percentage),
+    ):
+        assert vetorizada(valores).tolist() == [escalar(v) for v in valores]
+
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from query_index import normalize_phrase
+
+# Busca por trecho e aproximada (com erros de digitação) em listas de
+# palavras-chave e termos de pesquisa. Cada texto normalizado é quebrado em
+# trigramas (" ba", "bal", "alo"...) guardados em um índice invertido montado
+# uma vez por versão dos dados; uma busca soma, por linha, quantos trigramas
+# da consulta ela tem e só confirma o trecho exato nas candidatas.
+
+# Fração mínima dos trigramas da consulta que a linha precisa ter para entrar
+# como correspondência aproximada
+SIMILARIDADE_MINIMA = 0.4
+
+# Tipo de correspondência, da mais forte para a mais fraca
+CORRESPONDENCIAS = ['Exata', 'Início', 'Contém', 'Aproximada']
+
+
+def _normalize(textos):
+    return ' ' + normalize_phrase(textos) + ' '
+
+
+# Códigos dos trigramas (3 bytes em um inteiro) e a linha de cada um
+def _trigrams(normalizados):
+    tamanhos = normalizados.str.len().to_numpy()
+    caracteres = np.frombuffer(''.join(normalizados).encode('ascii'), dtype=np.uint8).astype(np.int64)
+    if len(caracteres) < 3:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    linhas = np.repeat(np.arange(len(tamanhos)), tamanhos)
+    codigos = (caracteres[:-2] << 16) | (caracteres[1:-1] << 8) | caracteres[2:]
+    # Janelas que atravessam o fim de um texto e o início do próximo ficam de fora
+    dentro = linhas[:-2] == linhas[2:]
+    return codigos[dentro], linhas[:-2][dentro]
+
+
+# Valores distintos de um array ordenado e a posição da primeira ocorrência
+# (np.unique ordena de novo e é bem mais lento em arrays grandes)
+def _sorted_unique(ordenados):
+    if len(ordenados) == 0:
+        return ordenados, np.empty(0, dtype=np.intp)
+    primeiras = np.flatnonzero(np.concatenate([[True], ordenados[1:] != ordenados[:-1]]))
+    return ordenados[primeiras], primeiras
+
+
+def build_trigram_index(df, coluna):
+    normalizados = _normalize(df[coluna].to_numpy())
+    codigos, linhas = _trigrams(normalizados)
+    # Pares (trigrama, linha) únicos, ordenados por trigrama: formato CSR
+    n = max(len(df), 1)
+    pares, _ = _sorted_unique(np.sort(codigos * n + linhas))
+    codigos, linhas = pares // n, pares % n
+    trigramas, inicio = _sorted_unique(codigos)
+    return {
+        'coluna': coluna,
+        'normalizados': normalizados.to_numpy(dtype=object),
+        'trigramas': trigramas,
+        'inicio': np.append(inicio, len(linhas)),
+        'linhas': linhas,
+    }
+
+
+# Trigramas da consulta sem o espaço final, para que um termo ainda sendo
+# digitado ("balon") encontre "balonismo" com todos os trigramas
+def _query_trigrams(consulta):
+    codigos, _ = _trigrams(pd.Series([consulta.rstrip()]))
+    return _sorted_unique(np.sort(codigos))[0]
+
+
+# Linhas que contêm trigramas da consulta e quantos de cada linha
+def _shared_counts(indice, codigos):
+    posicoes = np.searchsorted(indice['trigramas'], codigos[np.isin(codigos, indice['trigramas'])])
+    if len(posicoes) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    linhas = np.concatenate([indice['linhas'][indice['inicio'][p]:indice['inicio'][p + 1]] for p in posicoes])
+    contagem = np.bincount(linhas)
+    candidatas = np.flatnonzero(contagem)
+    return candidatas, contagem[candidatas]
+
+
+def _classify(normalizados, consulta):
+    texto = consulta.strip()
+    tipos = np.full(len(normalizados), len(CORRESPONDENCIAS) - 1, dtype=np.int8)
+    contem = np.fromiter((texto in t for t in normalizados), dtype=bool, count=len(normalizados))
+    inicio = np.fromiter((t.startswith(' ' + texto) for t in normalizados), dtype=bool, count=len(normalizados))
+    exata = np.fromiter((t == consulta for t in normalizados), dtype=bool, count=len(normalizados))
+    tipos[contem] = CORRESPONDENCIAS.index('Contém')
+    tipos[inicio] = CORRESPONDENCIAS.index('Início')
+    tipos[exata] = CORRESPONDENCIAS.index('Exata')
+    return tipos
+
+
+# Linhas de df que correspondem ao texto, da correspondência mais forte para a
+# mais fraca e, dentro de cada tipo, por `por`. Consultas com menos de três
+# letras só procuram o trecho (não há trigramas suficientes para aproximar).
+def search(indice, df, texto, limite=50, similaridade=SIMILARIDADE_MINIMA, por='Custo_num'):
+    consulta = _normalize([texto]).iloc[0]
+    if not consulta.strip():
+        return df.iloc[:0].assign(Correspondência=pd.Series(dtype=str))
+
+    codigos = _query_trigrams(consulta)
+    if len(consulta.strip()) < 3 or len(codigos) == 0:
+        normalizados = indice['normalizados']
+        candidatas = np.flatnonzero([consulta.strip() in t for t in normalizados])
+        pontuacao = np.ones(len(candidatas))
+    else:
+        candidatas, compartilhados = _shared_counts(indice, codigos)
+        pontuacao = compartilhados / len(codigos)
+        manter = pontuacao >= similaridade
+        candidatas, pontuacao = candidatas[manter], pontuacao[manter]
+
+    tipos = _classify(indice['normalizados'][candidatas], consulta)
+    resultado = df.iloc[candidatas].assign(
+        Correspondência=np.array(CORRESPONDENCIAS, dtype=object)[tipos],
+        _tipo=tipos,
+        _pontuacao=pontuacao,
+    )
+    ordem = ['_tipo', '_pontuacao'] + ([por] if por in df.columns else [])
+    resultado = resultado.sort_values(ordem, ascending=[True, False] + [False] * (len(ordem) - 2), kind='stable')
+    return resultado.drop(columns=['_tipo', '_pontuacao']).head(limite)
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from metrics import add_derived_metrics
+from parsing import MESES_EXTENSO
+
+# Série temporal indexada pela data da semana (coluna Data, derivada do rótulo
+# "Semana de 7 de abr. de 2025"). Ordem cronológica e reamostragem
+# mensal/trimestral usam o DatetimeIndex em vez de comparar os rótulos; o
+# filtro de período (filters.py) faz busca binária nas mesmas datas.
+
+# Rótulo na interface -> frequência do pandas (None = semanas como exportadas)
+AGRUPAMENTOS = {
+    'Semana': None,
+    'Mês': 'MS',
+    'Trimestre': 'QS',
+}
+
+# Colunas somadas na reamostragem; CPC, CTR e as demais razões são
+# recalculados sobre as somas
+_SOMAVEIS = ['Cliques_num', 'Impressões_num', 'Custo_num']
+
+
+# Semanas em ordem cronológica, indexadas pela data (rótulos inválidos ficam de fora)
+def time_indexed(serie):
+    return serie.dropna(subset=['Data']).set_index('Data').sort_index(kind='stable')
+
+
+def format_date(data):
+    data = pd.Timestamp(data)
+    return f"{data.day} de {MESES_EXTENSO[data.month]} {data.year}"
+
+
+# "Abril - Outubro 2025" ou "Dezembro 2024 - Março 2025"
+def format_period(inicio, fim):
+    inicio, fim = pd.Timestamp(inicio), pd.Timestamp(fim)
+    if inicio.year == fim.year:
+        return f"{MESES_EXTENSO[inicio.month]} - {MESES_EXTENSO[fim.month]} {fim.year}"
+    return f"{MESES_EXTENSO[inicio.month]} {inicio.year} - {MESES_EXTENSO[fim.month]} {fim.year}"
+
+
+def _period_label(data, freq):
+    if freq == 'QS':
+        return f"{(data.month - 1) // 3 + 1}º tri {data.year}"
+    return f"{MESES_EXTENSO[data.month][:3]}/{data.year}"
+
+
+# Soma as semanas por mês ou trimestre. O resultado tem as mesmas colunas das
+# semanas (Semana vira o rótulo do período) para ser usado nos mesmos gráficos.
+def resample(serie, freq):
+    if freq is None:
+        return time_indexed(serie).reset_index()
+    periodos = time_indexed(serie)[_SOMAVEIS].resample(freq).sum()
+    periodos = add_derived_metrics(periodos).reset_index()
+    periodos.insert(1, 'Semana', [_period_label(d, freq) for d in periodos['Data']])
+    return periodos